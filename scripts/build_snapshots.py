@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""构建成语与诗词数据集的 SQLite 快照。
+
+快照带版本号与 SHA-256 校验和（见同名 .json 清单），
+bot 在首次查询时以只读、内存映射方式打开，启动时不再解析数据集。
+数据源未变化且快照完好时跳过构建，除非指定 --force。
+
+Usage:
+    python scripts/build_snapshots.py
+    python scripts/build_snapshots.py --only poetry --force
+    SNAPSHOT_DIR=/srv/snapshots python scripts/build_snapshots.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# allow importing from src/ when run from project root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import nonebot
+
+nonebot.init()
+
+from src.plugins.idiom.data import Idiom
+from src.plugins.poetry.data import Poetry
+
+DATASETS = {"idiom": Idiom, "poetry": Poetry}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--only", choices=sorted(DATASETS), action="append", help="只构建指定数据集"
+    )
+    parser.add_argument("--force", action="store_true", help="即使快照是最新的也重建")
+    args = parser.parse_args()
+
+    for name in args.only or sorted(DATASETS):
+        snapshot = DATASETS[name].snapshot()
+        if not args.force and snapshot.is_current() and snapshot.is_intact():
+            print(f"{name}: up to date ({snapshot.path})")
+            continue
+        path = snapshot.build()
+        print(f"{name}: {path} sha256={snapshot.checksum}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
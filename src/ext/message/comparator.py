@@ -1,10 +1,14 @@
-from collections.abc import Awaitable, Callable
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
 from io import BytesIO
 
 import imagehash
 from nonebot.adapters.onebot.v11 import Message
 from PIL import Image
 
+from src.utils.bktree import BKTree, hamming
 from src.utils.log import logger_wrapper
 from src.utils.persistence.filestore import FileStorage
 
@@ -46,7 +50,21 @@ class MessageComparator:
 
 
 class ImagePHashComparator(MessageComparator):
+    """Compare messages, treating images with close perceptual hashes as equal.
+
+    Hashes are stored in the file metadata (computed once, off the event
+    loop) and memoized per process by filename, since a stored filename
+    always refers to the same content.
+    """
+
     METADATA_KEY = "phash"
+    MEMO_SIZE = 65536
+    BACKFILL_CONCURRENCY = 8
+    FAILURE_TTL = 600
+
+    _memo: OrderedDict[str, int] = OrderedDict()
+    # filename -> time its hash last failed to compute
+    _failed: OrderedDict[str, float] = OrderedDict()
 
     def __init__(self, threshold: int = 8) -> None:
         super().__init__()
@@ -59,29 +77,122 @@ class ImagePHashComparator(MessageComparator):
             phash = imagehash.phash(img)
             return str(phash)
 
+    @classmethod
+    def _remember(cls, filename: str, value: str) -> None:
+        cls._memo[filename] = int(value, 16)
+        while len(cls._memo) > cls.MEMO_SIZE:
+            cls._memo.popitem(last=False)
+
+    @classmethod
+    def _remember_failure(cls, filename: str) -> None:
+        cls._failed.pop(filename, None)
+        cls._failed[filename] = time.monotonic()
+        while len(cls._failed) > cls.MEMO_SIZE:
+            cls._failed.popitem(last=False)
+
+    @classmethod
+    def _recently_failed(cls, filename: str) -> bool:
+        failed_at = cls._failed.get(filename)
+        return failed_at is not None and time.monotonic() - failed_at < cls.FAILURE_TTL
+
+    @classmethod
+    async def phashes(cls, *filenames: str) -> dict[str, int]:
+        """Return the 64-bit phash of each stored image.
+
+        Known hashes come from the in-process memo, the rest from a single
+        metadata query. Files stored before hashes were precomputed are
+        hashed now and the result is written back to their metadata.
+        Filenames without a stored file, or whose hash could not be computed
+        (not retried for `FAILURE_TTL` seconds), are omitted from the result.
+        """
+        missing = list(
+            {f for f in filenames if f not in cls._memo and not cls._recently_failed(f)}
+        )
+        if missing:
+            filestore = await FileStorage.get_instance()
+            stored = await filestore.load_metadata_many(missing, cls.METADATA_KEY)
+            for filename, value in stored.items():
+                cls._remember(filename, value)
+
+            semaphore = asyncio.Semaphore(cls.BACKFILL_CONCURRENCY)
+
+            async def backfill(filename: str):
+                try:
+                    async with semaphore:
+                        value = await filestore.get_or_compute_metadata(
+                            filename=filename,
+                            key=cls.METADATA_KEY,
+                            processor=cls.calculate_phash,
+                        )
+                except Exception as e:
+                    logger.warning(
+                        f"failed to compute phash of {filename}", exception=e
+                    )
+                    cls._remember_failure(filename)
+                    return
+                if value:
+                    cls._remember(filename, value)
+
+            await asyncio.gather(*(backfill(f) for f in missing if f not in stored))
+
+        return {f: cls._memo[f] for f in filenames if f in cls._memo}
+
+    @classmethod
+    async def precompute(cls, *messages: Message) -> None:
+        """Hash every image in the messages, e.g. when they are stored."""
+        filenames = [
+            seg.extract_filename()
+            for message in messages
+            for seg in map(MessageSegment.from_onebot, message)
+            if seg.is_image() or seg.is_mface()
+        ]
+        if filenames:
+            await cls.phashes(*filenames)
+
     async def image(self, seg1: MessageSegment, seg2: MessageSegment) -> bool:
         """Compare two image segments by their perceptual hash."""
-        filestore = await FileStorage.get_instance()
-
+        filename1, filename2 = seg1.extract_filename(), seg2.extract_filename()
         try:
-            hash_str1 = await filestore.get_or_compute_metadata(
-                filename=seg1.extract_filename(),
-                key=self.METADATA_KEY,
-                processor=self.calculate_phash,
-            )
-            hash_str2 = await filestore.get_or_compute_metadata(
-                filename=seg2.extract_filename(),
-                key=self.METADATA_KEY,
-                processor=self.calculate_phash,
-            )
+            hashes = await self.phashes(filename1, filename2)
         except Exception as e:
             logger.error("failed to compute image phash", exception=e)
-            hash_str1 = hash_str2 = ""
+            hashes = {}
 
-        if hash_str1 and hash_str2:
-            hash1 = imagehash.hex_to_hash(hash_str1)
-            hash2 = imagehash.hex_to_hash(hash_str2)
+        if filename1 in hashes and filename2 in hashes:
+            return hamming(hashes[filename1], hashes[filename2]) <= self.threshold
 
-            return abs(hash1 - hash2) <= self.threshold
+        return filename1 == filename2
 
-        return seg1.extract_filename() == seg2.extract_filename()
+    @staticmethod
+    def _first_image(message: Message) -> str | None:
+        for seg in message:
+            if seg.type == "image":
+                return MessageSegment.from_onebot(seg).extract_filename()
+        return None
+
+    async def find(self, message: Message, candidates: Sequence[Message]) -> list[int]:
+        """Return the indices of all candidates equal to `message`.
+
+        Candidates are narrowed with a BK-tree over the phash of their first
+        image, so only near-duplicates go through the full comparison.
+        """
+        key = self._first_image(message)
+        if key is None:
+            # no images: comparisons need no I/O
+            return [i for i, c in enumerate(candidates) if await self(message, c)]
+
+        firsts = {i: f for i, c in enumerate(candidates) if (f := self._first_image(c))}
+        try:
+            hashes = await self.phashes(key, *firsts.values())
+        except Exception as e:
+            logger.error("failed to compute image phash", exception=e)
+            hashes = {}
+
+        if key in hashes:
+            tree = BKTree[int]((hashes[f], i) for i, f in firsts.items() if f in hashes)
+            indices = [i for _, i in tree.query(hashes[key], self.threshold)]
+            # unhashable images can only match by filename
+            indices += [i for i, f in firsts.items() if f not in hashes and f == key]
+        else:
+            indices = [i for i, f in firsts.items() if f == key]
+        return sorted([i for i in indices if await self(message, candidates[i])])
@@ -10,6 +10,8 @@ from nonebot.adapters.onebot.v11 import Message
 from nonebot.adapters.onebot.v11 import MessageSegment as _MessageSegment
 from PIL import Image
 
+from src.utils.image.encode import ImageEncoder
+
 from .button import ButtonGroup
 
 
@@ -35,10 +37,7 @@ class MessageSegment(_MessageSegment):
         timeout: int | None = None,
     ) -> "MessageSegment":
         if isinstance(image, Image.Image):
-            io = BytesIO()
-            image.save(io, format="PNG")
-            io.seek(0)
-            file = io
+            file = ImageEncoder.encode(image)
         else:
             file = image
         data = {
@@ -3,6 +3,7 @@ from nonebot.params import CommandArg
 
 from src.ext import MessageSegment, get_group_member_name
 from src.utils.doc import CommandCategory, command_doc
+from src.utils.image.encode import ImageEncoder
 from src.utils.observability.wrappers import on_command
 
 from .render import AnnualReportRenderer
@@ -38,7 +39,8 @@ async def _(bot: Bot, event: GroupMessageEvent, arg_: Message = CommandArg()):
     result = await AnnualReportRenderer.render_user(
         statistics, user_id, name, event.group_id
     )
-    await annual_report.finish(MessageSegment.image(result.render().to_pil()))
+    image = await ImageEncoder.encode_async(result.render().to_pil())
+    await annual_report.finish(MessageSegment.image(image))
 
 
 @annual_report_group.handle()
@@ -60,4 +62,5 @@ async def _(bot: Bot, event: GroupMessageEvent):
     result = await AnnualReportRenderer.render_group(
         statistics, event.group_id, info["group_name"]
     )
-    await annual_report.finish(MessageSegment.image(result.render().to_pil()))
+    image = await ImageEncoder.encode_async(result.render().to_pil())
+    await annual_report.finish(MessageSegment.image(image))
@@ -1,4 +1,3 @@
-import asyncio
 import math
 import random
 from datetime import datetime
@@ -542,6 +541,10 @@ class AnnualReportRenderer:
             avatar = await Avatar.group(group_id)
         else:
             raise ValueError
+        return cls._avatar_object(avatar, size)
+
+    @classmethod
+    def _avatar_object(cls, avatar: PILImage.Image, size: int = -1):
         if size == -1:
             size = cls.AVATAR_SIZE
         return Image.from_image(
@@ -594,10 +597,13 @@ class AnnualReportRenderer:
     async def _render_top_users(cls, users: dict[int, int]):
         # users: user_id -> num
         sorted_users = sorted(users.items(), key=lambda x: -x[1])
+        # one batch of concurrent fetches instead of one round trip per user
+        shown = sorted_users[:10] if len(users) > 8 else sorted_users[:3]
+        avatar_images = await Avatar.users(user_id for user_id, _ in shown)
         top = []
-        for i, (user_id, num) in enumerate(sorted_users[:3]):
+        for i, (_, num) in enumerate(sorted_users[:3]):
             space = Spacer.of(height=cls.AVATAR_SIZE // 4)
-            avatar = await cls._render_avatar(user_id=user_id)
+            avatar = cls._avatar_object(avatar_images[i])
             caption = Paragraph.of(f"{num}", style=cls.CAPTION_STYLE)
             if i == 0:
                 # top1 is higher than others
@@ -619,12 +625,10 @@ class AnnualReportRenderer:
             spacing=cls.AVATAR_SIZE // 2,
         )
         if len(users) > 8:
-            avatars = await asyncio.gather(
-                *(
-                    cls._render_avatar(user_id=user_id, size=cls.AVATAR_SIZE // 2)
-                    for user_id, _ in sorted_users[3:10]
-                )
-            )
+            avatars = [
+                cls._avatar_object(image, size=cls.AVATAR_SIZE // 2)
+                for image in avatar_images[3:10]
+            ]
             comp_smaller = Container.from_children(
                 children=avatars,
                 direction=Direction.HORIZONTAL,
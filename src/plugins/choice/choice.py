@@ -1,4 +1,3 @@
-import asyncio
 import random
 from typing import NamedTuple
 
@@ -133,13 +132,11 @@ class ChoiceHandler:
             for index, item in enumerate(lst.items)
             if isinstance(item, MessageItem)
         ]
-        match_result = await asyncio.gather(
-            *[self.comparator(content, item.content) for _, item in message_items]
+        match_result = await self.comparator.find(
+            content, [item.content for _, item in message_items]
         )
         matched: list[tuple[int, MessageItem | ReferenceItem]] = [
-            (index, item)
-            for (index, item), matched in zip(message_items, match_result, strict=False)
-            if matched
+            message_items[i] for i in match_result
         ]
 
         # process reference items
@@ -148,18 +145,25 @@ class ChoiceHandler:
             for index, item in enumerate(lst.items)
             if isinstance(item, ReferenceItem)
         ]
+        ref_lists = {
+            ref_list.name: ref_list
+            for ref_list in await UserListService.find_lists(
+                self.group_id, [item.name for _, item in ref_items]
+            )
+        }
         for index, item in ref_items:
-            ref_list = await UserListService.find_list(self.group_id, item.name)
+            ref_list = ref_lists.get(item.name)
             if ref_list is None:
                 continue
-            ref_match = await asyncio.gather(
-                *[
-                    self.comparator(content, ref_item.content)
+            ref_match = await self.comparator.find(
+                content,
+                [
+                    ref_item.content
                     for ref_item in ref_list.items
                     if isinstance(ref_item, MessageItem)
-                ]
+                ],
             )
-            if any(ref_match):
+            if ref_match:
                 matched.append((index, item))
 
         if not matched:
@@ -218,24 +222,41 @@ class ChoiceHandler:
         symtab: dict[str, MessageSegment],
         sudo: bool,
     ):
-        lst = await UserListService.find_list(self.group_id, list_name)
+        meta = await UserListService.find_list_meta(self.group_id, list_name)
         match action.op:
             case Op.SHOW:
-                if lst is None:
+                if meta is None:
                     raise ListNotExistsError(list_name)
                 parsed = parse_page_or_item_number(action, symtab)
                 if parsed.is_page:
+                    # only load the items on the page
                     if parsed.is_all:
                         pagination = None
+                        lst = await UserListService.find_list(self.group_id, list_name)
                     else:
-                        pagination = lst.paginate(parsed.num, self.NUM_ITEMS_PER_PAGE)
+                        lst, pagination = await UserListService.find_page(
+                            self.group_id,
+                            list_name,
+                            parsed.num,
+                            self.NUM_ITEMS_PER_PAGE,
+                            meta.num_items,
+                        ) or (None, None)
+                    if lst is None:
+                        raise ListNotExistsError(list_name)
                     obj = await ChoiceRender.render_list(
-                        group_id=self.group_id, userlist=lst, pagination=pagination
+                        group_id=self.group_id,
+                        userlist=lst,
+                        metadata=meta,
+                        pagination=pagination,
                     )
-                elif not 0 <= parsed.num < len(lst):
-                    raise InvalidIndexError(str(parsed.num + 1))
                 else:
-                    item = lst.items[parsed.num]
+                    item = None
+                    if 0 <= parsed.num < meta.num_items:
+                        item = await UserListService.find_item(
+                            self.group_id, list_name, parsed.num
+                        )
+                    if item is None:
+                        raise InvalidIndexError(str(parsed.num + 1))
                     if isinstance(item, ReferenceItem):
                         obj = f"[引用] {item.name}"
                     else:
@@ -251,13 +272,15 @@ class ChoiceHandler:
                     result = obj
                 await self.matcher.finish(result)
             case Op.REMOVE:
-                if lst is None:
+                if meta is None:
                     raise ListNotExistsError(list_name)
                 if action.items:
                     raise InvalidItemOpError("删除列表时不可包含其他参数")
-                await UserListService.remove_list(
+                lst = await UserListService.remove_list(
                     self.group_id, list_name, operator_id, sudo
                 )
+                if lst is None:
+                    raise ListNotExistsError(list_name)
                 # display a grayscale image for the deleted list
                 obj = await ChoiceRender.render_list(
                     group_id=self.group_id, userlist=lst
@@ -273,7 +296,7 @@ class ChoiceHandler:
                     )
                 )
             case Op.ADD:
-                if lst is not None:
+                if meta is not None:
                     raise ListExistsError(list_name)
                 await UserListService.create_list(self.group_id, list_name, operator_id)
                 await self.matcher.finish(f"列表 [{list_name}] 已创建")
@@ -282,7 +305,7 @@ class ChoiceHandler:
                     user_id=operator_id, group_id=self.group_id
                 ) as cfg:
                     if list_name not in cfg.shortcuts:
-                        if lst is None:
+                        if meta is None:
                             raise ListNotExistsError(list_name)
                         cfg.shortcuts.append(list_name)
                         op = "添加"
@@ -299,13 +322,19 @@ class ChoiceHandler:
         content: Message,
         pending_msgs: list[Message],
     ) -> tuple[bool, "MessageItem | None", int | None]:
-        for i, existing_item in enumerate(lst.items):
-            if isinstance(existing_item, MessageItem):
-                if await self.comparator(content, existing_item.content):
-                    return True, existing_item, i
-        for pending in pending_msgs:
-            if await self.comparator(content, pending):
-                return True, None, None
+        message_items = [
+            (i, item)
+            for i, item in enumerate(lst.items)
+            if isinstance(item, MessageItem)
+        ]
+        found = await self.comparator.find(
+            content, [item.content for _, item in message_items]
+        )
+        if found:
+            i, existing_item = message_items[found[0]]
+            return True, existing_item, i
+        if await self.comparator.find(content, pending_msgs):
+            return True, None, None
         return False, None, None
 
     async def _ref_exists(
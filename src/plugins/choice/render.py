@@ -5,6 +5,7 @@ from typing import Literal, NamedTuple, cast
 from nonebot.adapters.onebot.v11 import Message
 
 from src.utils.image.avatar import Avatar
+from src.utils.image.encode import ImageEncoder
 from src.utils.persistence import FileStorage
 from src.utils.render import (
     Alignment,
@@ -312,7 +313,8 @@ class ChoiceRender:
             )
         image = obj.render().to_pil()
         if cached and isinstance(item, MessageItem):
-            await storage.store_as_temp(storage.encode_image(image), cache_name)
+            data = await ImageEncoder.encode_async(image)
+            await storage.store_as_temp(data, cache_name)
         return obj
 
     @classmethod
@@ -342,6 +344,7 @@ class ChoiceRender:
         *,
         group_id: int,
         userlist: UserList,
+        metadata: UserListMetadata | None = None,
         cached: bool = True,
         pagination: UserListPagination | None = None,
         items: Sequence[tuple[int, MessageItem | ReferenceItem]] | None = None,
@@ -378,7 +381,8 @@ class ChoiceRender:
                 ordered=False,
             )
             num_columns = min(num_columns, len(items))
-            extra = await cls.render_item_count(userlist, rescale=rescale)
+            # a paginated `userlist` only holds its page; count from metadata
+            extra = await cls.render_item_count(metadata or userlist, rescale=rescale)
         else:
             num_columns = 1
             content = Paragraph.of("空空如也", style=cls.TITLE_STYLE)
@@ -491,7 +495,7 @@ class ChoiceRender:
     async def _render_column_rows(cls, *lists: UserListMetadata) -> Container:
         columns = [[], [], []]
         creator_ids = list(set(userlist.creator_id for userlist in lists))
-        avatars = await asyncio.gather(*(Avatar.user(uid) for uid in creator_ids))
+        avatars = await Avatar.users(creator_ids)
         avatar_dict = dict(zip(creator_ids, avatars, strict=False))
         for userlist in sorted(lists, key=lambda x: -x.num_items):
             title = Paragraph.of(userlist.name, style=cls.TITLE_STYLE)
@@ -54,6 +54,10 @@ async def _():
         stat = await storage.get_stats()
         heading = f"## {name.capitalize()}"
         ttl = f"TTL: `{storage.ttl}`"
+        cache = (
+            f"Cache: `{storage.cache.hit_ratio:.1%}` hit, "
+            f"`{format_size(storage.cache.memory.size)}` in memory"
+        )
         if not stat:
             stat_tbl = "Failed to get storage stats."
         else:
@@ -74,7 +78,7 @@ async def _():
             stat_tbl = "\n".join(
                 ["| " + " | ".join(line) + " |" for line in [header, sep, *data]]
             )
-        texts.append("\n\n".join([heading, ttl, stat_tbl]))
+        texts.append("\n\n".join([heading, ttl, cache, stat_tbl]))
 
     im = Markdown("\n\n".join(texts)).render().to_pil()
     await check_storage.finish(MessageSegment.image(im))
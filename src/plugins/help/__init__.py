@@ -5,7 +5,7 @@ from nonebot.params import CommandArg
 from src.ext import MessageSegment
 from src.utils.observability.wrappers import on_command
 
-from .load import load_document_image
+from .load import load_document_image_async
 
 matcher = on_command("帮助", aliases={"help"}, force_whitespace=True, block=True)
 
@@ -14,12 +14,12 @@ matcher = on_command("帮助", aliases={"help"}, force_whitespace=True, block=Tr
 async def _(bot: Bot, event: GroupMessageEvent, arg_: Message = CommandArg()):
     arg = arg_.extract_plain_text().strip()
     if not arg:
-        image = load_document_image()
+        data = await load_document_image_async()
         summary = "帮助总览"
     else:
-        image = load_document_image(arg)
+        data = await load_document_image_async(arg)
         summary = f"帮助-{arg}"
-    if image:
-        await matcher.finish(MessageSegment.image(image, summary=summary))
+    if data:
+        await matcher.finish(MessageSegment.image(data, summary=summary))
     else:
         await matcher.finish("未找到该命令或尚未编写帮助文档")
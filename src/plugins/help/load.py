@@ -1,37 +1,67 @@
 from pathlib import Path
 
-from PIL import Image
-
 from src.utils.doc import DocManager
+from src.utils.image.encode import ImageEncoder
 from src.utils.render_ext.markdown import Markdown
 
 cache = Path("data/dynamic/doc-markdown")
 
 
-def load_document_image(
-    name: str | None = None, cached: bool = True
-) -> Image.Image | None:
+def _cache_file(name: str | None) -> Path:
     cache.mkdir(parents=True, exist_ok=True)
     if name is None:
-        file = cache / "overview.png"
-    else:
-        file = cache / f"{name}.png"
-    if file.exists() and cached:
+        return cache / "overview.png"
+    return cache / f"{name}.png"
+
+
+def _read_cache(file: Path) -> bytes | None:
+    if file.exists():
         try:
-            return Image.open(file)
+            return file.read_bytes()
         except OSError:
             pass
+    return None
+
+
+def _export_markdown(name: str | None) -> str | None:
     if name is None:
-        markdown = DocManager.export_overview()
-    else:
-        meta = DocManager.get(name)
-        if meta is None:
-            return None
-        markdown = meta.export_markdown()
+        return DocManager.export_overview()
+    meta = DocManager.get(name)
+    if meta is None:
+        return None
+    return meta.export_markdown()
+
+
+def load_document_image(name: str | None = None, cached: bool = True) -> bytes | None:
+    file = _cache_file(name)
+    if cached and (data := _read_cache(file)) is not None:
+        return data
+    markdown = _export_markdown(name)
+    if markdown is None:
+        return None
     renderer = Markdown(markdown)
-    image = renderer.render().to_pil()
-    image.save(file)
-    return image
+    # the overview is tall, encode it without holding the whole bitmap
+    data = ImageEncoder.encode_object(renderer)
+    file.write_bytes(data)
+    return data
+
+
+async def load_document_image_async(name: str | None = None) -> bytes | None:
+    """Load a document image from the event loop.
+
+    Layout runs on the loop; only rendering and encoding a cache miss run
+    in a worker thread.
+    """
+    file = _cache_file(name)
+    if (data := _read_cache(file)) is not None:
+        return data
+    markdown = _export_markdown(name)
+    if markdown is None:
+        return None
+    renderer = await Markdown(markdown).prefetch()
+    data = await ImageEncoder.encode_object_async(renderer)
+    file.write_bytes(data)
+    return data
 
 
 def init_cache(*names: str):
@@ -1,6 +1,5 @@
 import re
 
-import pypinyin
 from nonebot.adapters import Message
 from nonebot.adapters.onebot.v11 import GroupMessageEvent
 from nonebot.params import CommandArg
@@ -9,6 +8,7 @@ from src.ext import ratelimit
 from src.utils.doc import CommandCategory, command_doc
 from src.utils.observability.wrappers import on_command, on_regex
 
+from .data import Idiom
 from .guess import GuessIdiom
 from .guess.data import UPDATE_INTERVAL_STR
 
@@ -72,7 +72,7 @@ async def _(event: GroupMessageEvent, arg_: Message = CommandArg()):
         result = await guess.guess(user_id, arg, explicit=True)
     else:
         result = await guess.guess(
-            user_id, " ".join(pypinyin.lazy_pinyin(arg)), explicit=False
+            user_id, " ".join(Idiom.to_pinyin(arg)), explicit=False
         )
     await matcher.finish(result)
 
@@ -1,20 +1,24 @@
 """Idiom data from https://github.com/pwxcoo/chinese-xinhua"""
 
+import asyncio
 import random
-import re
 import sqlite3
 from collections import Counter
-from collections.abc import Hashable, Sequence
+from collections.abc import Hashable, Iterable, Sequence
 from enum import Enum
-from itertools import product
 from pathlib import Path
 from typing import TypedDict, TypeVar
 
+import numpy as np
 import orjson
 from pypinyin import Style as PinyinStyle
 from pypinyin import lazy_pinyin, load_phrases_dict
 
 from src.utils.log import logger_wrapper
+from src.utils.persistence import SQLitePool
+from src.utils.persistence.snapshot import Snapshot
+
+from .syllable import Segmentation, SyllableTrie
 
 logger = logger_wrapper("idiom")
 
@@ -44,31 +48,131 @@ class Diff(Enum):
     EXIST = 2
 
 
+class IdiomSampler:
+    """Uniform sampling of idiom row ids with exclusions.
+
+    Candidate ids are held in one array, and exclusions are a bitset over
+    positions in that array. Sampling draws random positions and rejects
+    excluded or repeated ones, so a pick costs O(1) as long as most
+    candidates are allowed; after `MAX_REJECTIONS` misses it falls back to
+    scanning the allowed positions once.
+    """
+
+    MAX_REJECTIONS = 64
+
+    def __init__(self, rows: Iterable[tuple[int, str]]) -> None:
+        ids, positions = [], {}
+        for i, (row_id, word) in enumerate(rows):
+            ids.append(row_id)
+            positions[word] = i
+        self.ids = np.array(ids, dtype=np.uint32)
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def mask(self, words: Iterable[str]) -> bytearray:
+        """Exclusion bitset of `words`; unknown words are ignored."""
+        mask = bytearray((len(self.ids) + 7) // 8)
+        for word in words:
+            if (i := self.positions.get(word)) is not None:
+                mask[i >> 3] |= 1 << (i & 7)
+        return mask
+
+    def sample(self, k: int, excluded: bytearray | None = None) -> list[int]:
+        """Return up to `k` distinct allowed row ids, in random order."""
+        n = len(self.ids)
+
+        def allowed(i: int) -> bool:
+            return not excluded or not excluded[i >> 3] >> (i & 7) & 1
+
+        picked: dict[int, None] = {}
+        rejections = 0
+        while n and len(picked) < k and rejections < self.MAX_REJECTIONS:
+            i = random.randrange(n)
+            if i in picked or not allowed(i):
+                rejections += 1
+                continue
+            picked[i] = None
+        if len(picked) < k:
+            rest = [i for i in range(n) if allowed(i) and i not in picked]
+            picked.update(
+                dict.fromkeys(random.sample(rest, min(k - len(picked), len(rest))))
+            )
+        return [int(self.ids[i]) for i in picked]
+
+
 class Idiom:
-    db_path = Path("~/.cache/nonebot/idiom.db").expanduser()
     idiom_path = Path("data/static/chinese/idiom.json")
     fix_path = Path("data/static/chinese/fix_pinyin.txt")
     syllable_path = Path("data/static/chinese/syllables.txt")
 
-    _conn: sqlite3.Connection | None = None
-    syllables: set[str] = set()
+    SNAPSHOT_VERSION = 1
+    POOL_SIZE = 4
+    MMAP_SIZE = 256 * 1024 * 1024
     SEP = "-"
 
+    _snapshot: Snapshot | None = None
+    _pool: SQLitePool | None = None
+    _pool_lock = asyncio.Lock()
+    _fixes: tuple[dict[str, list[list[str]]], set[str]] | None = None
+    syllables: set[str] = set()
+    _syllable_trie: SyllableTrie | None = None
+    _sampler: "IdiomSampler | None" = None
+
     @classmethod
-    def get_conn(cls) -> sqlite3.Connection:
-        if cls._conn is None:
-            cls.db_path.parent.mkdir(parents=True, exist_ok=True)
-            cls._conn = sqlite3.connect(cls.db_path)
-            cls._conn.execute("PRAGMA journal_mode=WAL")
-            cls._conn.execute("PRAGMA synchronous=NORMAL")
-            cls._init_db()
-        return cls._conn
+    def snapshot(cls) -> Snapshot:
+        if cls._snapshot is None:
+            cls._snapshot = Snapshot(
+                "idiom",
+                cls.SNAPSHOT_VERSION,
+                cls.build,
+                [cls.idiom_path, cls.fix_path],
+            )
+        return cls._snapshot
 
     @classmethod
-    def _init_db(cls):
-        conn = cls.get_conn()
+    async def pool(cls) -> SQLitePool:
+        """Read-only connections to the snapshot, opened on first use."""
+        if cls._pool is None:
+            async with cls._pool_lock:
+                if cls._pool is None:
+                    path = await asyncio.to_thread(cls.snapshot().ensure)
+                    cls._pool = SQLitePool(
+                        path,
+                        size=cls.POOL_SIZE,
+                        mmap_size=cls.MMAP_SIZE,
+                        immutable=True,
+                    )
+        return cls._pool
+
+    @classmethod
+    def load_fixes(cls) -> tuple[dict[str, list[list[str]]], set[str]]:
+        """Load pinyin fixes into pypinyin once; return them with the removals."""
+        if cls._fixes is None:
+            fix_dict: dict[str, list[list[str]]] = {}
+            removes = set()
+            for line in cls.fix_path.read_text(encoding="utf-8").splitlines():
+                word, *syllables = line.strip().split()
+                if not syllables:
+                    removes.add(word)
+                    continue
+                fix_dict[word] = [[s] for s in syllables]
+            load_phrases_dict(fix_dict)
+            cls._fixes = fix_dict, removes
+        return cls._fixes
+
+    @classmethod
+    def to_pinyin(cls, text: str, tone: bool = False) -> list[str]:
+        cls.load_fixes()
+        style = PinyinStyle.TONE if tone else PinyinStyle.NORMAL
+        return lazy_pinyin(text, style=style)
+
+    @classmethod
+    def build(cls, conn: sqlite3.Connection):
+        """Fill a snapshot database from `idiom.json` with pinyin fixes applied."""
         conn.executescript("""
-        CREATE TABLE IF NOT EXISTS idiom (
+        CREATE TABLE idiom (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             word TEXT UNIQUE,
             pinyin TEXT,
@@ -78,148 +182,115 @@ class Idiom:
             derivation TEXT,
             length INTEGER
         );
+        CREATE INDEX idx_idiom_word ON idiom(word);
+        CREATE INDEX idx_idiom_length ON idiom(length);
         """)
-        conn.executescript("""
-        CREATE INDEX IF NOT EXISTS idx_idiom_word ON idiom(word);
-        CREATE INDEX IF NOT EXISTS idx_idiom_length ON idiom(length);
-        """)
-        conn.commit()
+        _, removes = cls.load_fixes()
+        items = orjson.loads(cls.idiom_path.read_bytes())
+        for item in items:
+            word = item["word"]
+            if word in removes:
+                continue
+            explanation = item["explanation"].replace("”", "")
+            example = item["example"].replace("”", "")
+            derivation = item["derivation"].replace("”", "").replace("无", "")
+
+            conn.execute(
+                "INSERT INTO idiom (word, pinyin, pinyin_tone, explanation, example, derivation, length)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    word,
+                    cls.SEP.join(cls.to_pinyin(word)),
+                    cls.SEP.join(cls.to_pinyin(word, tone=True)),
+                    explanation,
+                    example,
+                    derivation,
+                    len(word),
+                ),
+            )
 
     @classmethod
-    def init(cls):
-        conn = cls.get_conn()
-
-        # ==== fix pinyin ====
-        fix_dict: dict[str, list[list[str]]] = {}
-        removes = set()
-        for line in cls.fix_path.read_text(encoding="utf-8").splitlines():
-            word, *syllables = line.strip().split()
-            if not syllables:
-                removes.add(word)
-                continue
-            fix_dict[word] = [[s] for s in syllables]
-        load_phrases_dict(fix_dict)
-
-        # If empty, load idioms
-        if not conn.execute("SELECT EXISTS(SELECT 1 FROM idiom LIMIT 1)").fetchone()[0]:
-            items = orjson.loads(cls.idiom_path.read_bytes())
-            with conn:
-                for item in items:
-                    word = item["word"]
-                    if word in removes:
-                        continue
-                    pinyin = lazy_pinyin(word, style=PinyinStyle.NORMAL)
-                    pinyin_tone = lazy_pinyin(word, style=PinyinStyle.TONE)
-                    explanation = item["explanation"].replace("”", "")
-                    example = item["example"].replace("”", "")
-                    derivation = item["derivation"].replace("”", "").replace("无", "")
-
-                    conn.execute(
-                        "INSERT INTO idiom (word, pinyin, pinyin_tone, explanation, example, derivation, length)"
-                        " VALUES (?, ?, ?, ?, ?, ?, ?)",
-                        (
-                            word,
-                            cls.SEP.join(pinyin),
-                            cls.SEP.join(pinyin_tone),
-                            explanation,
-                            example,
-                            derivation,
-                            len(word),
-                        ),
-                    )
-        else:
-            # If not empty, update pinyin
-            with conn:
-                for word in fix_dict:
-                    pinyin = lazy_pinyin(word, style=PinyinStyle.NORMAL)
-                    pinyin_tone = lazy_pinyin(word, style=PinyinStyle.TONE)
-                    conn.execute(
-                        "UPDATE idiom SET pinyin = ?, pinyin_tone = ? WHERE word = ?",
-                        (cls.SEP.join(pinyin), cls.SEP.join(pinyin_tone), word),
-                    )
-                for word in removes:
-                    conn.execute("DELETE FROM idiom WHERE word = ?", (word,))
+    def get_syllables(cls) -> set[str]:
+        if not cls.syllables:
+            cls.syllables = {
+                s
+                for line in cls.syllable_path.read_text(encoding="utf-8").splitlines()
+                if (s := line.strip())
+            }
+        return cls.syllables
 
-        # syllables
-        for line in cls.syllable_path.read_text(encoding="utf-8").splitlines():
-            if s := line.strip():
-                cls.syllables.add(s)
+    @classmethod
+    def get_syllable_trie(cls) -> SyllableTrie:
+        if cls._syllable_trie is None:
+            cls._syllable_trie = SyllableTrie(cls.get_syllables())
+        return cls._syllable_trie
 
     @classmethod
-    def random4(cls, excludes: set[str] | None = None) -> IdiomItem:
-        if excludes is None:
-            excludes = set()
-        conn = cls.get_conn()
-        cursor = conn.execute(
-            "SELECT word, pinyin, pinyin_tone, explanation, example, derivation "
-            "FROM idiom WHERE rowid IN ("
-            "    SELECT rowid FROM idiom WHERE length = 4 "
-            "    ORDER BY RANDOM() LIMIT ?"
-            ")",
-            (max(100, len(excludes) + 1),),
-        )
-        idioms = [row for row in cursor if row[0] not in excludes]
-        if not idioms:
+    async def sampler(cls) -> "IdiomSampler":
+        """Ids of all 4-character idioms, loaded on first use."""
+        if cls._sampler is None:
+            pool = await cls.pool()
+            async with cls._pool_lock:
+                if cls._sampler is None:
+                    rows = await pool.fetchall(
+                        "SELECT id, word FROM idiom WHERE length = 4 ORDER BY id"
+                    )
+                    cls._sampler = IdiomSampler(rows)
+        return cls._sampler
+
+    @classmethod
+    async def sample4(cls, k: int, excludes: set[str] | None = None) -> list[IdiomItem]:
+        """Pick `k` distinct 4-character idioms, none of them in `excludes`."""
+        sampler = await cls.sampler()
+        ids = sampler.sample(k, sampler.mask(excludes or ()))
+        if len(ids) < k:
             logger.error("No idiom available.")
             raise ValueError
-        word, pinyin, pinyin_tone, explanation, example, derivation = random.choice(
-            idioms
-        )
-        return IdiomItem(
-            word=word,
-            pinyin=pinyin.split(cls.SEP),
-            pinyin_tone=pinyin_tone.split(cls.SEP),
-            explanation=explanation,
-            example=example,
-            derivation=derivation,
+        pool = await cls.pool()
+        rows = await pool.fetchall(
+            "SELECT id, word, pinyin, pinyin_tone, explanation, example, derivation "
+            f"FROM idiom WHERE id IN ({', '.join('?' * k)})",
+            ids,
         )
+        by_id = {row[0]: row[1:] for row in rows}
+        return [cls._item(by_id[i]) for i in ids]
+
+    @classmethod
+    async def random4(cls, excludes: set[str] | None = None) -> IdiomItem:
+        return (await cls.sample4(1, excludes))[0]
 
     @classmethod
-    def get_pinyin(cls, word: str, tone: bool = False) -> list[str]:
-        conn = cls.get_conn()
-        row = conn.execute(
+    async def get_pinyin(cls, word: str, tone: bool = False) -> list[str]:
+        pool = await cls.pool()
+        row = await pool.fetchone(
             "SELECT pinyin, pinyin_tone FROM idiom WHERE word = ?", (word,)
-        ).fetchone()
+        )
         if not row:
             raise ValueError(f"Not an idiom: {word}")
         pinyin, pinyin_tone = row
         return (pinyin_tone if tone else pinyin).split(cls.SEP)
 
     @classmethod
-    def is_idiom(cls, word: str) -> bool:
-        conn = cls.get_conn()
-        row = conn.execute("SELECT 1 FROM idiom WHERE word = ?", (word,)).fetchone()
+    async def is_idiom(cls, word: str) -> bool:
+        pool = await cls.pool()
+        row = await pool.fetchone("SELECT 1 FROM idiom WHERE word = ?", (word,))
         return row is not None
 
     @classmethod
     def is_syllable(cls, word: str) -> bool:
-        return word in cls.syllables
+        return word in cls.get_syllable_trie()
 
     @classmethod
-    def parse_syllables(cls, input_: str) -> list[tuple[str]] | None:
-        # dp[i]: all possible syllables of seq[:i]
-        parts = []
-        delim = "-"
-        for seq in re.split(r"[' \-]+", input_):
-            dp: list[set[str]] = [set() for _ in range(len(seq) + 1)]
-            dp[0] = {""}
-            for i in range(1, len(seq) + 1):
-                for s in cls.syllables:
-                    if len(s) > i:
-                        continue
-                    # endswith this syllable and previous part is valid
-                    # update dp[i] with all possible previous parts
-                    if seq.endswith(s, 0, i) and dp[i - len(s)]:
-                        dp[i].update(
-                            [f"{x}{delim}{s}" if x else s for x in dp[i - len(s)]]
-                        )
-            if not dp[-1]:
-                return
-            parts.append([s.split(delim) for s in dp[-1]])
-        return sorted(
-            [sum([tuple(_) for _ in result], tuple()) for result in product(*parts)],
-            key=lambda t: (len(t), t),
-        )
+    def segment(cls, input_: str) -> Segmentation:
+        """Split pinyin input into syllables; see `Segmentation`."""
+        return cls.get_syllable_trie().segment(input_)
+
+    @classmethod
+    def parse_syllables(
+        cls, input_: str, limit: int | None = 64
+    ) -> list[tuple[str, ...]] | None:
+        """Return up to `limit` segmentations, fewest syllables first."""
+        return cls.get_syllable_trie().parse(input_, limit) or None
 
     @classmethod
     def diff(cls, target: Sequence[T], provided: Sequence[T]) -> list[Diff]:
@@ -241,23 +312,25 @@ class Idiom:
         return result
 
     @classmethod
-    def load_idiom(cls, word: str) -> IdiomItem:
-        conn = cls.get_conn()
-        row = conn.execute(
+    async def load_idiom(cls, word: str) -> IdiomItem:
+        pool = await cls.pool()
+        row = await pool.fetchone(
             "SELECT word, pinyin, pinyin_tone, explanation, example, derivation "
             "FROM idiom WHERE word = ?",
             (word,),
-        ).fetchone()
+        )
         if not row:
             raise ValueError(f"Not an idiom: {word}")
+        return cls._item(row)
+
+    @classmethod
+    def _item(cls, row: Sequence[str]) -> IdiomItem:
+        word, pinyin, pinyin_tone, explanation, example, derivation = row
         return IdiomItem(
-            word=row[0],
-            pinyin=row[1].split(cls.SEP),
-            pinyin_tone=row[2].split(cls.SEP),
-            explanation=row[3],
-            example=row[4],
-            derivation=row[5],
+            word=word,
+            pinyin=pinyin.split(cls.SEP),
+            pinyin_tone=pinyin_tone.split(cls.SEP),
+            explanation=explanation,
+            example=example,
+            derivation=derivation,
         )
-
-
-Idiom.init()
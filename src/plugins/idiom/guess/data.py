@@ -1,6 +1,9 @@
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 
+from nonebot import get_driver
+
 from src.utils.persistence import Collection, Mongo
 
 MAX_GUESS = 6
@@ -30,6 +33,12 @@ class CurrentGuess:
     attempts: list[Attempt]
 
 
+@dataclass
+class Rank:
+    group_id: int
+    score: int
+
+
 @dataclass
 class GroupData:
     group_id: int
@@ -103,6 +112,9 @@ class GuessIdiomData:
     data: Collection[dict, GroupData] = Mongo.collection("guess_idiom")
 
     GLOBAL_ID = 0
+    RANKING_TTL = 30
+
+    _ranking: tuple[float, int, list[Rank]] | None = None
 
     @classmethod
     async def get(cls, group_id: int) -> GroupData:
@@ -112,16 +124,40 @@ class GuessIdiomData:
 
     @classmethod
     async def set(cls, group_id: int, data: GroupData):
+        # the stored score is rewritten with the history, so it never drifts
         await cls.data.find_one_and_update(
             {"group_id": group_id},
             data,
             upsert=True,
         )
+        cls._ranking = None
 
     @classmethod
-    async def get_ranking(cls) -> list[GroupData]:
-        groups = [item async for item in cls.data.find_all({})]
-        return sorted(groups, key=lambda group: group.score, reverse=True)
+    async def get_ranking(cls, limit: int = 10) -> list[Rank]:
+        """Top groups by score, served from the `score` index.
+
+        Results are cached for `RANKING_TTL` seconds, and dropped whenever
+        a group is saved.
+        """
+        now = time.monotonic()
+        if cls._ranking is not None:
+            at, cached_limit, ranking = cls._ranking
+            if now - at < cls.RANKING_TTL and cached_limit >= limit:
+                return ranking[:limit]
+        cursor = (
+            cls.data.find(
+                {"group_id": {"$ne": cls.GLOBAL_ID}},
+                projection={"_id": 0, "group_id": 1, "score": 1},
+            )
+            .sort("score", -1)
+            .limit(limit)
+        )
+        ranking = [
+            Rank(group_id=doc["group_id"], score=doc.get("score", 0))
+            async for doc in cursor
+        ]
+        cls._ranking = (now, limit, ranking)
+        return ranking
 
     @classmethod
     async def get_global(cls) -> GroupData:
@@ -132,10 +168,36 @@ class GuessIdiomData:
         await cls.set(cls.GLOBAL_ID, data)
 
 
+@get_driver().on_startup
+async def init_ranking():
+    collection = GuessIdiomData.data.collection
+    await collection.create_index([("group_id", 1)])
+    await collection.create_index([("score", -1)])
+    # backfill documents written before scores were stored
+    await collection.update_many(
+        {"score": {"$exists": False}},
+        [
+            {
+                "$set": {
+                    "score": {
+                        "$size": {
+                            "$filter": {
+                                "input": "$history",
+                                "cond": {"$gt": ["$$this.attempt", 0]},
+                            }
+                        }
+                    }
+                }
+            }
+        ],
+    )
+
+
 @GuessIdiomData.data.serialize()
 def serialize(data: GroupData) -> dict:
     return {
         "group_id": data.group_id,
+        "score": data.score,
         "current": {
             "time": data.current.time,
             "word": data.current.word,
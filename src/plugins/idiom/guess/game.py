@@ -1,7 +1,5 @@
 from datetime import datetime
 
-import pypinyin
-
 from src.ext import MessageSegment
 
 from ..data import Diff, Idiom
@@ -44,40 +42,36 @@ class GuessIdiom:
     async def match_target(self, word: str) -> tuple[bool, str]:
         group = await GuessIdiomData.get(self.group_id)
         if group.current:
-            target = "".join(Idiom.get_pinyin(group.current.word))
+            target = "".join(await Idiom.get_pinyin(group.current.word))
             if word == group.current.word:
                 return True, target
-            input_ = "".join(pypinyin.lazy_pinyin(word))
+            input_ = "".join(Idiom.to_pinyin(word))
             return target == input_, target
         return False, ""
 
     @classmethod
-    def _new_guess(cls, global_data: GroupData) -> GroupData:
+    async def _new_guess(cls, global_data: GroupData) -> GroupData:
         exclude = {h.word for h in global_data.history}
-        new_word = Idiom.random4(excludes=exclude)["word"]
+        new_word = (await Idiom.random4(excludes=exclude))["word"]
         return global_data.new_guess(datetime.now(), new_word)
 
     @classmethod
-    def _check_answer(
+    async def _check_answer(
         cls,
         input_: str,
         guess: CurrentGuess,
     ) -> list[str]:
-        syllables = Idiom.parse_syllables(input_)
-        if not syllables:
+        segmentation = Idiom.segment(input_)
+        if not segmentation:
             raise SyllableParseFailure
-        target = Idiom.get_pinyin(guess.word)
-        syllable_count_filtered = [s for s in syllables if len(s) == len(target)]
-        if not syllable_count_filtered:
+        target = await Idiom.get_pinyin(guess.word)
+        if len(target) not in segmentation.part_counts():
             raise SyllableNumMismatch(len(target))
-        syllable_length_filtered = [
-            s
-            for s in syllable_count_filtered
-            if all(len(m) == len(n) for m, n in zip(s, target, strict=False))
-        ]
-        if not syllable_length_filtered:
-            raise SyllableLengthMismatch([len(t) for t in target])
-        return list(syllable_length_filtered[0])
+        lengths = [len(t) for t in target]
+        syllables = segmentation.with_lengths(lengths)
+        if syllables is None:
+            raise SyllableLengthMismatch(lengths)
+        return list(syllables)
 
     async def start(self) -> MessageSegment | None:
         group = await GuessIdiomData.get(self.group_id)
@@ -91,7 +85,7 @@ class GuessIdiom:
             glob.current is None
             or (interval := datetime.now() - glob.current.time) > UPDATE_INTERVAL
         ):
-            glob = self._new_guess(glob)
+            glob = await self._new_guess(glob)
             await GuessIdiomData.set_global(glob)
         assert glob.current is not None
         # update from the global data
@@ -119,12 +113,12 @@ class GuessIdiom:
                 else MessageSegment.text("没有正在进行的猜成语游戏")
             )
         try:
-            provided = self._check_answer(input_, group.current)
+            provided = await self._check_answer(input_, group.current)
         except self.explicit_only as e:
             return None if not explicit else MessageSegment.text(str(e))
         except InvalidInput as e:
             return MessageSegment.text(str(e))
-        target = Idiom.get_pinyin(group.current.word)
+        target = await Idiom.get_pinyin(group.current.word)
         diff = Idiom.diff("".join(target), "".join(provided))
         group.attempt_guess(user_id, provided)
 
@@ -149,7 +143,7 @@ class GuessIdiom:
         current: CurrentGuess,
         stop: bool,
     ) -> MessageSegment:
-        target_syl = Idiom.get_pinyin(current.word)
+        target_syl = await Idiom.get_pinyin(current.word)
         target_syl_len = [len(s) for s in target_syl]
 
         attempts: list[RenderAttemptData] = []
@@ -177,6 +171,6 @@ class GuessIdiom:
             attempts=attempts,
             syllables=target_syl_len,
             key_state=None if stop else keyboards,
-            answer=Idiom.load_idiom(current.word) if stop else None,
+            answer=await Idiom.load_idiom(current.word) if stop else None,
         )
         return MessageSegment.image(obj.render().to_pil())
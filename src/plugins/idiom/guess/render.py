@@ -3,6 +3,8 @@ from enum import Enum
 from functools import lru_cache
 from typing import TypedDict
 
+from PIL import Image as PILImage
+
 from src.utils.image.avatar import Avatar
 from src.utils.render import (
     Alignment,
@@ -190,9 +192,14 @@ class GuessAttempt:
 
     @classmethod
     async def render_attempt(
-        cls, user_id: int, syllables: list[str], diff: list[Diff]
+        cls,
+        user_id: int,
+        syllables: list[str],
+        diff: list[Diff],
+        avatar: PILImage.Image | None = None,
     ) -> RenderObject:
-        avatar = await Avatar.user(user_id)
+        if avatar is None:
+            avatar = await Avatar.user(user_id)
         objects: list[RenderObject] = [Image.from_image(avatar.resize(cls.AVATAR_SIZE))]
         s = 0
         for syllable in syllables:
@@ -249,10 +256,14 @@ class GuessAttempt:
         syllables: list[int],
     ) -> RenderObject:
         objects = []
-        for attempt in attempts:
+        avatars = await Avatar.users(attempt["user_id"] for attempt in attempts)
+        for attempt, avatar in zip(attempts, avatars, strict=True):
             objects.append(
                 await cls.render_attempt(
-                    attempt["user_id"], attempt["syllables"], attempt["diffs"]
+                    attempt["user_id"],
+                    attempt["syllables"],
+                    attempt["diffs"],
+                    avatar=avatar,
                 )
             )
         for _ in range(MAX_GUESS - len(attempts)):
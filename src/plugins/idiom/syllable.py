@@ -0,0 +1,154 @@
+import re
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import islice, pairwise
+
+SEPARATORS = re.compile(r"[' \-]+")
+
+_END = ""  # trie key marking the end of a syllable
+
+
+class Segmentation:
+    """All ways to split one pinyin input into syllables.
+
+    `ends[i]` lists, in ascending order, every position `j` such that
+    `seq[i:j]` is a syllable. `counts[i]` is a bitmask whose bit `k` is set
+    when `seq[i:]` splits into exactly `k` syllables, so enumeration never
+    enters a branch that cannot be completed, and the number of parts is
+    known before anything is enumerated.
+    """
+
+    __slots__ = ("counts", "ends", "seq")
+
+    def __init__(self, seq: str, ends: list[list[int]]) -> None:
+        self.seq = seq
+        self.ends = ends
+        counts = [0] * (len(seq) + 1)
+        counts[-1] = 1 if seq else 0  # an empty input is not a segmentation
+        for i in reversed(range(len(seq))):
+            mask = 0
+            for j in ends[i]:
+                mask |= counts[j]
+            counts[i] = mask << 1
+        self.counts = counts
+
+    def __bool__(self) -> bool:
+        return self.counts[0] != 0
+
+    def part_counts(self) -> list[int]:
+        """Possible numbers of syllables, ascending."""
+        mask = self.counts[0]
+        return [k for k in range(mask.bit_length()) if mask >> k & 1]
+
+    def with_parts(self, parts: int) -> Iterator[tuple[str, ...]]:
+        """Yield the segmentations into exactly `parts` syllables, in order."""
+        seq, ends, counts, n = self.seq, self.ends, self.counts, len(self.seq)
+        if not counts[0] >> parts & 1:
+            return
+        # iterative depth-first search; inputs can be longer than the
+        # recursion limit
+        cuts = [0]
+        stack = [iter(ends[0])]
+        while stack:
+            remaining = parts - len(cuts)
+            for j in stack[-1]:
+                if not counts[j] >> remaining & 1:
+                    continue
+                if j == n:
+                    yield tuple(seq[a:b] for a, b in pairwise([*cuts, n]))
+                    continue
+                cuts.append(j)
+                stack.append(iter(ends[j]))
+                break
+            else:
+                stack.pop()
+                cuts.pop()
+
+    def __iter__(self) -> Iterator[tuple[str, ...]]:
+        """Yield every segmentation, fewest syllables first, then by syllable."""
+        for parts in self.part_counts():
+            yield from self.with_parts(parts)
+
+    def with_lengths(self, lengths: Sequence[int]) -> tuple[str, ...] | None:
+        """Return the segmentation whose syllables have exactly `lengths`."""
+        if sum(lengths) != len(self.seq):
+            return None
+        result, i = [], 0
+        for length in lengths:
+            if i + length not in self.ends[i]:
+                return None
+            result.append(self.seq[i : i + length])
+            i += length
+        return tuple(result)
+
+
+class SyllableTrie:
+    """Prefix tree of pinyin syllables.
+
+    Splitting an input walks the trie from every position, which costs at
+    most `max_length` steps each, so building a `Segmentation` is linear in
+    the input length whatever the syllable set or input.
+
+    Example:
+    ```
+    trie = SyllableTrie(["xi", "xia", "xiao", "a", "ao", "o"])
+    list(trie.segment("xiao"))  # [("xiao",), ("xi", "ao"), ("xia", "o"), ...]
+    ```
+    """
+
+    __slots__ = ("_root", "_size", "max_length")
+
+    def __init__(self, syllables: Iterable[str] = ()) -> None:
+        self._root: dict = {}
+        self._size = 0
+        self.max_length = 0
+        for syllable in syllables:
+            self.add(syllable)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, syllable: str) -> None:
+        if not syllable:
+            return
+        node = self._root
+        for c in syllable:
+            node = node.setdefault(c, {})
+        if _END not in node:
+            node[_END] = True
+            self._size += 1
+            self.max_length = max(self.max_length, len(syllable))
+
+    def __contains__(self, word: str) -> bool:
+        node = self._root
+        for c in word:
+            node = node.get(c)
+            if node is None:
+                return False
+        return _END in node
+
+    def _ends(self, seq: str, start: int, stop: int) -> list[int]:
+        """Ends of the syllables starting at `start`, not crossing `stop`."""
+        ends = []
+        node = self._root
+        for i in range(start, min(stop, start + self.max_length)):
+            node = node.get(seq[i])
+            if node is None:
+                break
+            if _END in node:
+                ends.append(i + 1)
+        return ends
+
+    def segment(self, text: str) -> Segmentation:
+        """Split `text` into syllables; separators force a syllable boundary."""
+        chunks = [c for c in SEPARATORS.split(text) if c]
+        seq = "".join(chunks)
+        ends: list[list[int]] = []
+        stop = 0
+        for chunk in chunks:
+            start, stop = stop, stop + len(chunk)
+            ends.extend(self._ends(seq, i, stop) for i in range(start, stop))
+        return Segmentation(seq, ends)
+
+    def parse(self, text: str, limit: int | None = None) -> list[tuple[str, ...]]:
+        """Return up to `limit` segmentations of `text`, in `Segmentation` order."""
+        return list(islice(self.segment(text), limit))
@@ -1,3 +1,4 @@
+from nonebot import get_driver
 from nonebot.adapters import Message
 from nonebot.adapters.onebot.v11.event import Reply
 from nonebot.params import CommandArg
@@ -5,13 +6,25 @@ from nonebot.typing import T_State
 
 from src.ext import MessageSegment
 from src.utils.doc import CommandCategory, command_doc
+from src.utils.image.encode import ImageEncoder
 from src.utils.observability.wrappers import on_command, on_reply
-from src.utils.render_ext.markdown import Markdown
+from src.utils.render_ext.markdown import Markdown, MathRenderer
 
 render_markdown = on_command(
     "markdown", aliases={"渲染"}, block=True, force_whitespace=True, priority=2
 )
 render_markdown_reply = on_reply(("渲染", "markdown"), block=True)
+driver = get_driver()
+
+
+@driver.on_startup
+async def _():
+    await MathRenderer.startup()
+
+
+@driver.on_shutdown
+async def _():
+    MathRenderer.shutdown()
 
 
 @render_markdown.handle()
@@ -25,7 +38,8 @@ async def _(arg: Message = CommandArg()):
         `引用` {cmd}              -  渲染*引用消息*中的文本
     """
     if content := arg.extract_plain_text():
-        image = Markdown(content).render().to_pil()
+        markdown = await Markdown(content).prefetch()
+        image = await ImageEncoder.encode_object_async(markdown)
         await render_markdown.finish(MessageSegment.image(image, summary="Markdown"))
 
 
@@ -35,7 +49,8 @@ async def _(state: T_State):
     if not reply:
         return
     if content := reply.message.extract_plain_text():
-        image = Markdown(content).render().to_pil()
+        markdown = await Markdown(content).prefetch()
+        image = await ImageEncoder.encode_object_async(markdown)
         await render_markdown_reply.finish(
             MessageSegment.image(image, summary="Markdown")
         )
@@ -1,3 +1,4 @@
 import src.utils.observability.heartbeat
 import src.utils.observability.hooks
+import src.utils.observability.loop
 import src.utils.observability.router  # noqa: F401
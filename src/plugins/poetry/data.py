@@ -1,3 +1,4 @@
+import asyncio
 import re
 import sqlite3
 from pathlib import Path
@@ -6,6 +7,10 @@ from typing import TypedDict
 import orjson
 
 from src.utils.log import logger_wrapper
+from src.utils.persistence import SQLitePool
+from src.utils.persistence.snapshot import Snapshot
+
+from .index import VerseIndex
 
 logger = logger_wrapper("poetry")
 
@@ -18,11 +23,19 @@ class PoetryItem(TypedDict):
 
 
 class Poetry:
-    db_path = Path("~/.cache/nonebot/poetry.db").expanduser()
     poetry_path = Path("data/static/chinese/poetry")
     fix_path = Path("data/static/chinese/fix_poetry.txt")
+    index_dir = Path("~/.cache/nonebot/poetry_index").expanduser()
+
+    SNAPSHOT_VERSION = 1
+    POOL_SIZE = 4
+    MMAP_SIZE = 256 * 1024 * 1024
 
-    _conn: sqlite3.Connection | None = None
+    _snapshot: Snapshot | None = None
+    _pool: SQLitePool | None = None
+    _pool_lock = asyncio.Lock()
+    _index: VerseIndex | None = None
+    _index_lock = asyncio.Lock()
 
     p_pattern = re.compile(r"[,，\.。!！\?？、《》；]")
 
@@ -57,148 +70,96 @@ class Poetry:
     ]
 
     @classmethod
-    def get_conn(cls) -> sqlite3.Connection:
-        if cls._conn is None:
-            cls.db_path.parent.mkdir(parents=True, exist_ok=True)
-            cls._conn = sqlite3.connect(cls.db_path)
-            cls._conn.execute("PRAGMA journal_mode=WAL")
-            cls._conn.execute("PRAGMA synchronous=NORMAL")
-            cls._init_db()
-        return cls._conn
+    def snapshot(cls) -> Snapshot:
+        if cls._snapshot is None:
+            cls._snapshot = Snapshot(
+                "poetry",
+                cls.SNAPSHOT_VERSION,
+                cls.build,
+                [cls.poetry_path, cls.fix_path],
+            )
+        return cls._snapshot
+
+    @classmethod
+    async def pool(cls) -> SQLitePool:
+        """Read-only connections to the snapshot, opened on first use."""
+        if cls._pool is None:
+            async with cls._pool_lock:
+                if cls._pool is None:
+                    path = await asyncio.to_thread(cls.snapshot().ensure)
+                    cls._pool = SQLitePool(
+                        path,
+                        size=cls.POOL_SIZE,
+                        mmap_size=cls.MMAP_SIZE,
+                        immutable=True,
+                    )
+        return cls._pool
 
     @classmethod
-    def _init_db(cls):
-        conn = cls.get_conn()
+    def _load_fixes(cls) -> dict[str, str]:
+        """Map original poem contents to their corrected versions."""
+        fixes = {}
+        if not cls.fix_path.exists():
+            return fixes
+        raw = cls.fix_path.read_text(encoding="utf-8")
+        for entry in raw.split("====="):
+            lines = [_ for line in entry.strip().splitlines() if (_ := line.strip())]
+            if len(lines) != 2:
+                logger.warning(f"Skipping invalid entry: \n{entry}")
+                continue
+            original, repl = lines
+            fixes[original] = repl
+        return fixes
+
+    @classmethod
+    def build(cls, conn: sqlite3.Connection, batch_size: int = 1000):
+        """Fill a snapshot database from the poetry files with fixes applied."""
         conn.executescript("""
-        CREATE TABLE IF NOT EXISTS poetry (
+        CREATE TABLE poetry (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             title TEXT,
             dynasty TEXT,
             author TEXT,
             content TEXT
         );
-        CREATE VIRTUAL TABLE IF NOT EXISTS poetry_fts USING fts5(
+        CREATE VIRTUAL TABLE poetry_fts USING fts5(
             content, title, dynasty, author,
             content='poetry', content_rowid='id'
         );
-        CREATE TABLE IF NOT EXISTS poetry_parts (
-            part TEXT,
-            poetry_id INTEGER
-        );
-        CREATE INDEX IF NOT EXISTS idx_part ON poetry_parts(part);
         """)
-        conn.commit()
-
-    @classmethod
-    def init(cls, batch_size: int = 1000):
-        conn = cls.get_conn()
-        if not conn.execute("SELECT EXISTS(SELECT 1 FROM poetry LIMIT 1)").fetchone()[
-            0
-        ]:
-            files = list(cls.poetry_path.glob("*.json"))
-            for file in files:
-                poems = orjson.loads(file.read_bytes())
-                batch_poetry = []
-                batch_parts = []
-                with conn:
-                    for p in poems:
-                        batch_poetry.append(
-                            (p["title"], p["dynasty"], p["author"], p["content"])
-                        )
-                        if len(batch_poetry) >= batch_size:
-                            cls._insert_batch_in_tx(conn, batch_poetry, batch_parts)
-                            batch_poetry.clear()
-                            batch_parts.clear()
-                    if batch_poetry:
-                        cls._insert_batch_in_tx(conn, batch_poetry, batch_parts)
-        # always apply fix
-        cls._apply_fix()
-
-    @classmethod
-    def _apply_fix(cls):
-        if not cls.fix_path.exists():
-            return
-
-        conn = cls.get_conn()
-        with conn:
-            raw = cls.fix_path.read_text(encoding="utf-8")
-            for entry in raw.split("====="):
-                lines = [
-                    _ for line in entry.strip().splitlines() if (_ := line.strip())
-                ]
-                if len(lines) != 2:
-                    logger.warning(f"Skipping invalid entry: \n{entry}")
-                    continue
-                original, repl = lines
-                row = conn.execute(
-                    "SELECT id, content FROM poetry WHERE content=?",
-                    (original,),
-                ).fetchone()
-                if row:
-                    poetry_id = row[0]
-                    conn.execute(
-                        "UPDATE poetry SET content=? WHERE id=?",
-                        (repl, poetry_id),
-                    )
-                    conn.execute("DELETE FROM poetry_fts WHERE rowid = ?", (poetry_id,))
-                    conn.execute(
-                        "INSERT INTO poetry_fts "
-                        "(rowid, content, title, dynasty, author)"
-                        " SELECT id, content, title, dynasty, author FROM poetry "
-                        "WHERE id = ?",
-                        (poetry_id,),
-                    )
-                    conn.execute(
-                        "DELETE FROM poetry_parts WHERE poetry_id=?",
-                        (poetry_id,),
-                    )
-                    for part in cls.separate(repl):
-                        conn.execute(
-                            "INSERT INTO poetry_parts (part, poetry_id) VALUES (?, ?)",
-                            (part, poetry_id),
-                        )
-                    logger.info(f"Fixed poetry {poetry_id}: \n   {original}\n-> {repl}")
+        fixes = cls._load_fixes()
+        for file in sorted(cls.poetry_path.glob("*.json")):
+            poems = orjson.loads(file.read_bytes())
+            batch = []
+            for p in poems:
+                content = fixes.get(p["content"], p["content"])
+                batch.append((p["title"], p["dynasty"], p["author"], content))
+                if len(batch) >= batch_size:
+                    cls._insert_batch(conn, batch)
+                    batch.clear()
+            if batch:
+                cls._insert_batch(conn, batch)
+        # populate the external-content FTS index in one pass
+        conn.execute("INSERT INTO poetry_fts(poetry_fts) VALUES ('rebuild')")
 
     @classmethod
-    def _insert_batch_in_tx(cls, conn: sqlite3.Connection, batch_poetry, batch_parts):
-        # main table
+    def _insert_batch(cls, conn: sqlite3.Connection, batch_poetry):
         conn.executemany(
             "INSERT INTO poetry (title, dynasty, author, content) VALUES (?, ?, ?, ?)",
             batch_poetry,
         )
 
-        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
-        start_id = last_id - len(batch_poetry) + 1
-
-        for offset, poetry in enumerate(batch_poetry):
-            pid = start_id + offset
-            for part in cls.separate(poetry[3]):
-                batch_parts.append((part, pid))
-
-        conn.executemany(
-            "INSERT INTO poetry_parts (part, poetry_id) VALUES (?, ?)",
-            batch_parts,
-        )
-        # FTS index populate
-        conn.execute(
-            "INSERT INTO poetry_fts "
-            "(rowid, content, title, dynasty, author)"
-            " SELECT id, content, title, dynasty, author FROM poetry "
-            "WHERE id BETWEEN ? AND ?",
-            (start_id, last_id),
-        )
-
     @classmethod
-    def search(cls, keyword: str) -> list[PoetryItem]:
-        conn = cls.get_conn()
-        cursor = conn.execute(
+    async def search(cls, keyword: str) -> list[PoetryItem]:
+        pool = await cls.pool()
+        rows = await pool.fetchall(
             "SELECT p.title, p.dynasty, p.author, p.content "
             "FROM poetry_fts f JOIN poetry p ON f.rowid = p.id "
             "WHERE poetry_fts MATCH ?",
             (keyword,),
         )
         result = []
-        for row in cursor:
+        for row in rows:
             result.append(
                 {
                     "title": row[0],
@@ -214,47 +175,41 @@ class Poetry:
         return [s for s in cls.p_pattern.split(content) if s]
 
     @classmethod
-    def search_origin(cls, content: str) -> list[PoetryItem]:
+    def _load_index(cls, conn: sqlite3.Connection) -> VerseIndex:
+        # the index is derived from exactly one snapshot
+        fingerprint = cls.snapshot().checksum
+        index = VerseIndex.load(cls.index_dir, fingerprint)
+        if index is None:
+            logger.info("Building verse index...")
+            index = VerseIndex.from_database(conn, cls.separate)
+            index.save(cls.index_dir, fingerprint)
+            logger.info(f"Verse index built with {len(index)} verses")
+        return index
+
+    @classmethod
+    async def verse_index(cls) -> VerseIndex:
+        async with cls._index_lock:
+            if cls._index is None:
+                pool = await cls.pool()
+                cls._index = await pool.run(cls._load_index)
+        return cls._index
+
+    @classmethod
+    async def search_origin(cls, content: str) -> list[PoetryItem]:
         parts = cls.separate(content)
         if not parts:
             return []
-        conn = cls.get_conn()
-
-        # get candidate ids by intersecting parts
-        placeholder = ",".join("?" for _ in parts)
-        query = (
-            f"SELECT poetry_id FROM poetry_parts "
-            f"WHERE part IN ({placeholder}) "
-            f"GROUP BY poetry_id HAVING COUNT(DISTINCT part)=?"
-        )
-        args = [*parts, len(parts)]
-        candidates = {r[0] for r in conn.execute(query, args)}
-        if not candidates:
+        index = await cls.verse_index()
+        poetry_ids = index.match(parts)
+        if not poetry_ids:
             return []
-
-        # verify sequence match
-        result = []
-        sel = conn.execute(
-            f"SELECT id, content, title, dynasty, author "
-            f"FROM poetry WHERE id IN ({','.join('?' for _ in candidates)})",
-            tuple(candidates),
+        pool = await cls.pool()
+        rows = await pool.fetchall(
+            f"SELECT title, dynasty, author, content "
+            f"FROM poetry WHERE id IN ({','.join('?' for _ in poetry_ids)})",
+            tuple(poetry_ids),
         )
-        for row in sel:
-            _, poetry_content, title, dynasty, author = row
-            pparts = cls.separate(poetry_content)
-            # sliding window
-            for i in range(len(pparts) - len(parts) + 1):
-                if pparts[i : i + len(parts)] == parts:
-                    result.append(
-                        PoetryItem(
-                            title=title,
-                            dynasty=dynasty,
-                            author=author,
-                            content=poetry_content,
-                        )
-                    )
-                    break
-        return result
-
-
-Poetry.init()
+        return [
+            PoetryItem(title=title, dynasty=dynasty, author=author, content=content)
+            for title, dynasty, author, content in rows
+        ]
@@ -100,7 +100,7 @@ class FeiHua:
                     self.E_NO_KW.format(keywords=group.display_keywords)
                 )
             )
-        match_poetry = Poetry.search_origin(input_)
+        match_poetry = await Poetry.search_origin(input_)
         if not match_poetry:
             return None if not explicit else MessageSegment.text(self.E_NOT_POETRY)
         hit_part = [p for p in parts if any(kw in p for kw in group.keywords)]
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import math
+import sqlite3
+from collections.abc import Callable, Iterable, Sequence
+from pathlib import Path
+
+import numpy as np
+
+from src.utils.log import logger_wrapper
+
+logger = logger_wrapper("poetry")
+
+FILES = ("hashes", "poems", "positions", "bloom")
+
+
+def verse_hash(verse: str) -> int:
+    """Stable 64-bit hash of one verse."""
+    return int.from_bytes(
+        hashlib.blake2b(verse.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+class VerseIndex:
+    """In-memory index from verse to `(poem id, line position)`.
+
+    Every verse of every poem is reduced to a 64-bit hash. The hashes are
+    kept sorted in a NumPy array next to the poem ids and positions, so a
+    lookup is a binary search. A Bloom filter (`BITS_PER_VERSE` bits per
+    verse, `HASHES` probes) in front rejects text that is not poetry
+    without touching the arrays.
+
+    The arrays are saved as `.npy` files and memory-mapped on load;
+    `fingerprint` identifies the data they were built from.
+    """
+
+    BITS_PER_VERSE = 10
+    HASHES = 7
+
+    def __init__(
+        self,
+        hashes: np.ndarray,
+        poems: np.ndarray,
+        positions: np.ndarray,
+        bloom: np.ndarray,
+    ) -> None:
+        self.hashes = hashes
+        self.poems = poems
+        self.positions = positions
+        self.bloom = bloom
+        self.bloom_bits = len(bloom) * 8
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    @classmethod
+    def _probes(cls, h: int | np.ndarray, bits: int | np.uint64):
+        # double hashing; both halves stay below 2**32, so nothing overflows
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        for i in range(cls.HASHES):
+            yield (h1 + i * h2) % bits
+
+    @classmethod
+    def from_verses(cls, verses: Iterable[tuple[str, int, int]]) -> "VerseIndex":
+        """Build from `(verse, poem id, position)` triples."""
+        hashes, poems, positions = [], [], []
+        for verse, poem_id, position in verses:
+            hashes.append(verse_hash(verse))
+            poems.append(poem_id)
+            positions.append(position)
+        h = np.array(hashes, dtype=np.uint64)
+        order = np.argsort(h, kind="stable")
+        h = h[order]
+        bits = max(64, math.ceil(len(h) * cls.BITS_PER_VERSE / 8) * 8)
+        marks = np.zeros(bits, dtype=bool)
+        for probe in cls._probes(h, np.uint64(bits)):
+            marks[probe] = True
+        return cls(
+            hashes=h,
+            poems=np.array(poems, dtype=np.uint32)[order],
+            positions=np.array(positions, dtype=np.uint32)[order],
+            bloom=np.packbits(marks, bitorder="little"),
+        )
+
+    @classmethod
+    def from_database(
+        cls,
+        conn: sqlite3.Connection,
+        separate: Callable[[str], list[str]],
+    ) -> "VerseIndex":
+        def verses():
+            for poem_id, content in conn.execute("SELECT id, content FROM poetry"):
+                for position, verse in enumerate(separate(content)):
+                    yield verse, poem_id, position
+
+        return cls.from_verses(verses())
+
+    def save(self, directory: Path, fingerprint: str) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in FILES:
+            np.save(directory / f"{name}.npy", getattr(self, name))
+        (directory / "meta.json").write_text(
+            json.dumps({"fingerprint": fingerprint, "verses": len(self)})
+        )
+
+    @classmethod
+    def load(cls, directory: Path, fingerprint: str) -> "VerseIndex | None":
+        """Memory-map a saved index, or return None if it is missing or stale."""
+        try:
+            meta = json.loads((directory / "meta.json").read_text())
+            if meta.get("fingerprint") != fingerprint:
+                return None
+            arrays = {
+                name: np.load(directory / f"{name}.npy", mmap_mode="r")
+                for name in FILES
+            }
+        except (OSError, ValueError):
+            return None
+        return cls(**arrays)
+
+    def might_contain(self, verse: str) -> bool:
+        h = verse_hash(verse)
+        for probe in self._probes(h, self.bloom_bits):
+            if not self.bloom[probe >> 3] & (1 << (probe & 7)):
+                return False
+        return True
+
+    def _lookup(self, verse: str) -> set[tuple[int, int]]:
+        h = np.uint64(verse_hash(verse))
+        lo = np.searchsorted(self.hashes, h, side="left")
+        hi = np.searchsorted(self.hashes, h, side="right")
+        return set(
+            zip(
+                self.poems[lo:hi].tolist(),
+                self.positions[lo:hi].tolist(),
+                strict=True,
+            )
+        )
+
+    def match(self, verses: Sequence[str]) -> set[int]:
+        """Return the ids of poems containing `verses` as consecutive lines."""
+        if not verses or not all(self.might_contain(v) for v in verses):
+            return set()
+        candidates = self._lookup(verses[0])
+        for offset, verse in enumerate(verses[1:], 1):
+            if not candidates:
+                break
+            following = self._lookup(verse)
+            candidates = {
+                (poem, start)
+                for poem, start in candidates
+                if (poem, start + offset) in following
+            }
+        return {poem for poem, _ in candidates}
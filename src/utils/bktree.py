@@ -0,0 +1,69 @@
+from collections.abc import Iterable
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree[V]:
+    """Burkhard-Keller tree over integer hashes under Hamming distance.
+
+    Each node stores one hash (with every value added under it) and children
+    keyed by their distance to the node. A radius query only descends into
+    children whose edge distance lies within `[d - radius, d + radius]`,
+    which prunes most of the tree for small radii.
+
+    Example:
+    ```
+    tree = BKTree[int]()
+    tree.add(0b1011, 0)
+    tree.add(0b0011, 1)
+    tree.query(0b1111, radius=1)  # [(1, 0)]
+    ```
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, items: Iterable[tuple[int, V]] = ()) -> None:
+        # node layout: (hash, values, children)
+        self._root: tuple[int, list[V], dict[int, tuple]] | None = None
+        self._size = 0
+        for key, value in items:
+            self.add(key, value)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: int, value: V) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = (key, [value], {})
+            return
+        node = self._root
+        while True:
+            d = hamming(key, node[0])
+            if d == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = (key, [value], {})
+                return
+            node = child
+
+    def query(self, key: int, radius: int) -> list[tuple[int, V]]:
+        """Return `(distance, value)` for every value within `radius` of `key`."""
+        if self._root is None:
+            return []
+        result: list[tuple[int, V]] = []
+        stack = [self._root]
+        while stack:
+            node_key, values, children = stack.pop()
+            d = hamming(key, node_key)
+            if d <= radius:
+                result.extend((d, v) for v in values)
+            for edge, child in children.items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        result.sort(key=lambda x: x[0])
+        return result
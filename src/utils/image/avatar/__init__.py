@@ -1,3 +1,6 @@
+import asyncio
+from collections.abc import Iterable
+
 from aiohttp import ClientSession, ClientTimeout
 from nonebot import get_driver
 from PIL import Image
@@ -5,6 +8,7 @@ from PIL import Image
 from src.utils.env import inject_env
 from src.utils.log import logger_wrapper
 
+from .cache import AvatarCache
 from .fetch import Fetcher, UpdateStatus
 from .manager import Manager
 
@@ -17,6 +21,7 @@ class Avatar:
     default = Image.open("data/static/avatar/fail.png").resize((640, 640))
 
     avatar_timeout: float
+    avatar_concurrency: int = 8
 
     session: ClientSession
 
@@ -27,16 +32,15 @@ class Avatar:
         if not is_group:
             if custom := Fetcher.load_custom_avatar(id=id):
                 return custom
-        image = await Fetcher.fetch_avatar_async(cls.session, id=id, is_group=is_group)
+        image = await AvatarCache.get(cls.session, id=id, is_group=is_group)
         if image is not None:
             return image
-        # on failure: fetch at background, load local or return default
+        # nothing cached and every host failed: retry at background
         Manager.enqueue(id=id, is_group=is_group)
         logger.warning(
             f"Failed to fetch {'group' if is_group else 'user'} {id} avatar."
         )
-        cached = Fetcher.load_local_avatar(id=id, is_group=is_group)
-        return cached or default or cls.default.copy()
+        return default or cls.default.copy()
 
     @classmethod
     async def user(
@@ -54,20 +58,64 @@ class Avatar:
     ) -> Image.Image:
         return await cls._shared(group_id, is_group=True, default=default)
 
+    @classmethod
+    async def _many(
+        cls,
+        ids: Iterable[int],
+        is_group: bool,
+        default: Image.Image | None,
+    ) -> list[Image.Image]:
+        ids = list(ids)
+        semaphore = asyncio.Semaphore(cls.avatar_concurrency)
+
+        async def fetch(id: int) -> Image.Image:
+            async with semaphore:
+                return await cls._shared(id, is_group=is_group, default=default)
+
+        # fetch each distinct id once, fanning out over the shared session
+        unique = list(dict.fromkeys(ids))
+        fetched = await asyncio.gather(*map(fetch, unique))
+        images = dict(zip(unique, fetched, strict=True))
+        result, seen = [], set()
+        for id in ids:
+            result.append(images[id].copy() if id in seen else images[id])
+            seen.add(id)
+        return result
+
+    @classmethod
+    async def users(
+        cls,
+        user_ids: Iterable[int],
+        default: Image.Image | None = None,
+    ) -> list[Image.Image]:
+        """Fetch several user avatars concurrently, in the order given."""
+        return await cls._many(user_ids, is_group=False, default=default)
+
+    @classmethod
+    async def groups(
+        cls,
+        group_ids: Iterable[int],
+        default: Image.Image | None = None,
+    ) -> list[Image.Image]:
+        """Fetch several group avatars concurrently, in the order given."""
+        return await cls._many(group_ids, is_group=True, default=default)
+
     @classmethod
     async def update(cls, user_id: int, image: Image.Image | str | None):
-        return await Fetcher.update_user_avatar(
+        status = await Fetcher.update_user_avatar(
             cls.session, user_id=user_id, avatar=image
         )
+        AvatarCache.invalidate(id=user_id, is_group=False)
+        return status
 
     @classmethod
     async def startup(cls):
         cls.session = ClientSession(timeout=ClientTimeout(total=cls.avatar_timeout))
-        Manager.start_worker()
+        Manager.start_worker(cls.session)
 
     @classmethod
     async def shutdown(cls):
-        Manager.stop_worker()
+        await Manager.stop_worker()
         await cls.session.close()
 
 
@@ -0,0 +1,231 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any
+
+from aiohttp import ClientSession
+from PIL import Image
+
+from src.utils.env import inject_env
+from src.utils.log import logger_wrapper
+
+from .fetch import Fetcher
+
+logger = logger_wrapper(__name__)
+
+AvatarKey = tuple[int, bool]  # (id, is_group)
+
+
+@dataclass
+class AvatarEntry:
+    image: Image.Image
+    fetched_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+def _decode(data: bytes) -> Image.Image:
+    image = Image.open(BytesIO(data))
+    image.load()
+    return image
+
+
+@inject_env()
+class AvatarCache:
+    """Avatar cache keyed by (id, kind) instead of by URL.
+
+    Lookup order is memory LRU (decoded images) → disk (`data/dynamic/avatar`
+    plus a JSON sidecar holding validators) → network.
+
+    - Fresh entries (younger than `avatar_fresh_ttl`) are served directly.
+    - Stale entries (younger than `avatar_stale_ttl`) are served directly
+      while a conditional request (ETag / Last-Modified) revalidates them in
+      the background.
+    - Missing entries are fetched, trying every qlogo host in a fixed order.
+    - If the network fails, any cached entry is served regardless of age.
+    """
+
+    avatar_cache_size: int = 128
+    avatar_fresh_ttl: float = 600
+    avatar_stale_ttl: float = 7 * 24 * 3600
+
+    _memory: OrderedDict[AvatarKey, AvatarEntry] = OrderedDict()
+    _inflight: dict[AvatarKey, asyncio.Task[AvatarEntry | None]] = {}
+
+    @classmethod
+    def _remember(cls, key: AvatarKey, entry: AvatarEntry) -> None:
+        cls._memory[key] = entry
+        cls._memory.move_to_end(key)
+        while len(cls._memory) > cls.avatar_cache_size:
+            cls._memory.popitem(last=False)
+
+    @classmethod
+    def peek(cls, *, id: int, is_group: bool) -> AvatarEntry | None:
+        """Return the in-memory entry without touching disk or network."""
+        return cls._memory.get((id, is_group))
+
+    @classmethod
+    def invalidate(cls, *, id: int, is_group: bool) -> None:
+        cls._memory.pop((id, is_group), None)
+
+    @staticmethod
+    def _load_disk(key: AvatarKey) -> AvatarEntry | None:
+        id, is_group = key
+        path = Fetcher.path(id, is_group)
+        try:
+            image = _decode(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception:
+            path.unlink(missing_ok=True)
+            return None
+        meta: dict[str, Any]
+        try:
+            meta = json.loads(Fetcher.meta_path(id, is_group).read_text())
+        except Exception:
+            # written before validators were kept
+            meta = {"fetched_at": path.stat().st_mtime}
+        return AvatarEntry(
+            image=image,
+            fetched_at=meta.get("fetched_at", 0),
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+        )
+
+    @staticmethod
+    def _save_disk(key: AvatarKey, entry: AvatarEntry, data: bytes | None) -> None:
+        id, is_group = key
+        path = Fetcher.path(id, is_group)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if data is not None:
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            tmp.replace(path)
+        Fetcher.meta_path(id, is_group).write_text(
+            json.dumps(
+                {
+                    "fetched_at": entry.fetched_at,
+                    "etag": entry.etag,
+                    "last_modified": entry.last_modified,
+                }
+            )
+        )
+
+    @classmethod
+    async def _lookup(cls, key: AvatarKey) -> AvatarEntry | None:
+        entry = cls._memory.get(key)
+        if entry is not None:
+            cls._memory.move_to_end(key)
+            return entry
+        entry = await asyncio.to_thread(cls._load_disk, key)
+        if entry is not None:
+            cls._remember(key, entry)
+        return entry
+
+    @classmethod
+    async def _fetch(
+        cls,
+        session: ClientSession,
+        key: AvatarKey,
+        previous: AvatarEntry | None,
+    ) -> AvatarEntry | None:
+        id, is_group = key
+        headers = {}
+        if previous is not None:
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+
+        for url in Fetcher.urls(id, is_group):
+            try:
+                async with session.get(url, headers=headers) as resp:
+                    if resp.status == 304 and previous is not None:
+                        entry = AvatarEntry(
+                            image=previous.image,
+                            fetched_at=time.time(),
+                            etag=resp.headers.get("ETag", previous.etag),
+                            last_modified=resp.headers.get(
+                                "Last-Modified", previous.last_modified
+                            ),
+                        )
+                        data = None
+                    else:
+                        resp.raise_for_status()
+                        data = await resp.read()
+                        entry = AvatarEntry(
+                            image=await asyncio.to_thread(_decode, data),
+                            fetched_at=time.time(),
+                            etag=resp.headers.get("ETag"),
+                            last_modified=resp.headers.get("Last-Modified"),
+                        )
+            except Exception as e:
+                logger.debug(f"Avatar fetch failed [{url}]", exception=e)
+                continue
+            cls._remember(key, entry)
+            try:
+                await asyncio.to_thread(cls._save_disk, key, entry, data)
+            except Exception as e:
+                logger.warning(f"Failed to save avatar {key}", exception=e)
+            return entry
+        return None
+
+    @classmethod
+    def _refresh(
+        cls,
+        session: ClientSession,
+        key: AvatarKey,
+        previous: AvatarEntry | None,
+    ) -> asyncio.Task[AvatarEntry | None]:
+        """Start (or join) the network refresh of one avatar."""
+        task = cls._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(cls._fetch(session, key, previous))
+            cls._inflight[key] = task
+            task.add_done_callback(lambda _: cls._inflight.pop(key, None))
+        return task
+
+    @classmethod
+    async def refresh(
+        cls,
+        session: ClientSession,
+        *,
+        id: int,
+        is_group: bool,
+    ) -> AvatarEntry | None:
+        """Fetch the avatar from the network now, revalidating any cached copy."""
+        key = (id, is_group)
+        previous = await cls._lookup(key)
+        return await asyncio.shield(cls._refresh(session, key, previous))
+
+    @classmethod
+    async def get(
+        cls,
+        session: ClientSession | None,
+        *,
+        id: int,
+        is_group: bool,
+    ) -> Image.Image | None:
+        """Return a copy of the avatar, or None if it is unavailable."""
+        key = (id, is_group)
+        entry = await cls._lookup(key)
+        if entry is not None and entry.age < cls.avatar_fresh_ttl:
+            return entry.image.copy()
+        if session is None or session.closed:
+            return entry.image.copy() if entry is not None else None
+
+        task = cls._refresh(session, key, entry)
+        if entry is not None and entry.age < cls.avatar_stale_ttl:
+            # stale-while-revalidate
+            return entry.image.copy()
+        refreshed = await asyncio.shield(task)
+        if refreshed is not None:
+            return refreshed.image.copy()
+        return entry.image.copy() if entry is not None else None
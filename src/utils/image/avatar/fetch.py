@@ -1,4 +1,3 @@
-import random
 from datetime import timedelta
 from enum import Enum
 from io import BytesIO
@@ -30,20 +29,31 @@ class Fetcher:
     LOCAL_FALLBACK_DIR = "data/dynamic/avatar"
     GROUP_PATH = "group/{id}.png"
     USER_PATH = "user/{id}.png"
+    META_SUFFIX = ".json"
     USER_CUSTOM_PATH = "user-custom/{id}.jpg"
 
     avatar_timeout_long: float
 
     @classmethod
-    def user_template(cls, user_id: int) -> str:
-        k = random.randint(1, 5)
-        if k == 5:
-            return cls.USER_URL.format(id=user_id)
-        return cls.USER_URL2.format(k=k, id=user_id)
+    def user_urls(cls, user_id: int) -> list[str]:
+        """All user avatar hosts, in a fixed per-user failover order.
+
+        The primary host is derived from the id so the same user always hits
+        the same URL (and whatever caches sit in front of it).
+        """
+        first = user_id % 4
+        hosts = [
+            cls.USER_URL2.format(k=(first + i) % 4 + 1, id=user_id) for i in range(4)
+        ]
+        return [*hosts, cls.USER_URL.format(id=user_id)]
+
+    @classmethod
+    def urls(cls, id: int, is_group: bool) -> list[str]:
+        return [cls.GROUP_URL.format(id=id)] if is_group else cls.user_urls(id)
 
     @classmethod
     def url(cls, id: int, is_group: bool) -> str:
-        return cls.GROUP_URL.format(id=id) if is_group else cls.user_template(id)
+        return cls.urls(id, is_group)[0]
 
     @classmethod
     def path(cls, id: int, is_group: bool) -> Path:
@@ -51,6 +61,10 @@ class Fetcher:
             cls.GROUP_PATH if is_group else cls.USER_PATH
         ).format(id=id)
 
+    @classmethod
+    def meta_path(cls, id: int, is_group: bool) -> Path:
+        return cls.path(id, is_group).with_suffix(cls.META_SUFFIX)
+
     @staticmethod
     @alru_cache(ttl=timedelta(minutes=5).total_seconds())
     async def afetch(session: ClientSession, url: str) -> Image.Image:
@@ -64,59 +78,6 @@ class Fetcher:
         resp.raise_for_status()
         return Image.open(BytesIO(resp.content))
 
-    @classmethod
-    def fetch_avatar(
-        cls,
-        *,
-        id: int,
-        is_group: bool,
-    ) -> Image.Image | None:
-        """Fetches an avatar synchronously from the internet."""
-        url = cls.url(id, is_group)
-        file_path = cls.path(id, is_group)
-        try:
-            image = cls.fetch(url)
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            image.save(file_path)
-            return image
-        except Exception:
-            return None
-
-    @classmethod
-    async def fetch_avatar_async(
-        cls,
-        session: ClientSession,
-        *,
-        id: int,
-        is_group: bool,
-    ) -> Image.Image | None:
-        """Fetches an avatar asynchronously from the internet."""
-        url = cls.url(id, is_group)
-        file_path = cls.path(id, is_group)
-        try:
-            img = await cls.afetch(session, url)
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            img.save(file_path)
-            return img
-        except Exception:
-            return None
-
-    @classmethod
-    def load_local_avatar(
-        cls,
-        *,
-        id: int,
-        is_group: bool,
-    ) -> Image.Image | None:
-        """Loads an avatar from local storage if available."""
-        file_path = cls.path(id, is_group)
-        if file_path.exists():
-            try:
-                return Image.open(file_path)
-            except Exception:
-                file_path.unlink()
-        return None
-
     @classmethod
     def load_custom_avatar(
         cls,
@@ -1,43 +1,102 @@
-import queue
-import threading
+import asyncio
+import time
 
-from .fetch import Fetcher
+from aiohttp import ClientSession
+
+from src.utils.log import logger_wrapper
+
+from .cache import AvatarCache, AvatarKey
+
+logger = logger_wrapper(__name__)
 
 
 class Manager:
-    """Manages avatar fetching via a background queue and thread."""
+    """Retries failed avatar fetches with a pool of async workers.
+
+    Each avatar is attempted at most `MAX_ATTEMPTS` times with exponential
+    backoff, and retries across all avatars share a budget of
+    `RETRY_BUDGET` per `BUDGET_WINDOW` seconds, so an outage of qlogo does
+    not turn into a retry storm.
+    """
+
+    WORKERS = 4
+    MAX_ATTEMPTS = 3
+    BACKOFF = 30.0
+    RETRY_BUDGET = 60
+    BUDGET_WINDOW = 60.0
 
-    _queue: queue.Queue = queue.Queue()
-    _stop_event = threading.Event()
-    _worker_thread: threading.Thread | None = None
+    _queue: asyncio.Queue[tuple[AvatarKey, int]] | None = None
+    _pending: set[AvatarKey] = set()
+    _workers: list[asyncio.Task] = []
+    _session: ClientSession | None = None
+    _budget: int = 0
+    _budget_reset: float = 0.0
 
     @classmethod
-    def start_worker(cls):
-        """Starts the background worker thread."""
-        if cls._worker_thread is None:
-            cls._stop_event.clear()
-            cls._worker_thread = threading.Thread(target=cls._worker_loop, daemon=True)
-            cls._worker_thread.start()
+    def start_worker(cls, session: ClientSession):
+        """Starts the background workers."""
+        if cls._queue is not None:
+            return
+        cls._session = session
+        cls._queue = asyncio.Queue()
+        cls._workers = [asyncio.create_task(cls._worker()) for _ in range(cls.WORKERS)]
 
     @classmethod
-    def stop_worker(cls):
-        """Stops the background worker thread."""
-        cls._stop_event.set()
-        if cls._worker_thread:
-            cls._worker_thread.join()
-            cls._worker_thread = None
+    async def stop_worker(cls):
+        """Stops the background workers, dropping pending requests."""
+        for task in cls._workers:
+            task.cancel()
+        await asyncio.gather(*cls._workers, return_exceptions=True)
+        cls._workers = []
+        cls._queue = None
+        cls._pending.clear()
 
     @classmethod
     def enqueue(cls, *, id: int, is_group: bool):
-        """Adds a fetch request to the queue."""
-        cls._queue.put((id, is_group))
+        """Adds a fetch request to the queue, unless one is already pending."""
+        key = (id, is_group)
+        if cls._queue is None or key in cls._pending:
+            return
+        cls._pending.add(key)
+        cls._queue.put_nowait((key, 0))
+
+    @classmethod
+    def _take_budget(cls) -> bool:
+        now = time.monotonic()
+        if now >= cls._budget_reset:
+            cls._budget = cls.RETRY_BUDGET
+            cls._budget_reset = now + cls.BUDGET_WINDOW
+        if cls._budget <= 0:
+            return False
+        cls._budget -= 1
+        return True
+
+    @classmethod
+    def _retry(cls, key: AvatarKey, attempt: int):
+        if cls._queue is not None:
+            cls._queue.put_nowait((key, attempt))
 
     @classmethod
-    def _worker_loop(cls):
+    async def _worker(cls):
         """Processes fetch requests from the queue in the background."""
-        while not cls._stop_event.is_set():
+        assert cls._queue is not None and cls._session is not None
+        queue, session = cls._queue, cls._session
+        while True:
+            key, attempt = await queue.get()
+            id, is_group = key
             try:
-                id, is_group = cls._queue.get(timeout=1)
-                Fetcher.fetch_avatar(id=id, is_group=is_group)
-            except queue.Empty:
-                continue
+                entry = await AvatarCache.refresh(session, id=id, is_group=is_group)
+            except Exception as e:
+                logger.warning(f"Avatar worker failed on {key}", exception=e)
+                entry = None
+            if entry is not None:
+                cls._pending.discard(key)
+            elif attempt + 1 < cls.MAX_ATTEMPTS and cls._take_budget():
+                delay = cls.BACKOFF * 2**attempt
+                asyncio.get_running_loop().call_later(
+                    delay, cls._retry, key, attempt + 1
+                )
+            else:
+                cls._pending.discard(key)
+                logger.warning(f"Giving up fetching avatar {key}")
+            queue.task_done()
@@ -0,0 +1,193 @@
+import asyncio
+import struct
+import time
+import zlib
+from collections.abc import Iterable
+from io import BytesIO
+from typing import TYPE_CHECKING, Literal, cast
+
+import numpy as np
+from PIL import Image
+
+from src.utils.env import inject_env
+from src.utils.log import logger_wrapper
+from src.utils.observability.metrics import IMAGE_ENCODE_BYTES, IMAGE_ENCODE_DURATION
+
+if TYPE_CHECKING:
+    from src.utils.render import RenderObject
+
+logger = logger_wrapper(__name__)
+
+EncodedFormat = Literal["png", "png_palette", "png_stream", "webp", "jpeg"]
+PHOTO_FORMATS = ("png", "webp", "jpeg")
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_FILTER_UP = 2
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    crc = zlib.crc32(data, zlib.crc32(tag))
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", crc)
+
+
+@inject_env()
+class ImageEncoder:
+    """Encode rendered images for sending.
+
+    - Images with at most `image_encode_palette_colors` distinct colors are
+      stored losslessly as palette PNGs, which is typical of text renders
+      and both faster to compress and several times smaller.
+    - Other images are PNGs at `image_encode_png_level`, which favours
+      speed over size (zlib level 1 instead of the default 6).
+    - Opaque images with too many colors for a palette (photos) use
+      `image_encode_photo_format` instead: `"png"`, `"webp"` (lossless) or
+      `"jpeg"` (at `image_encode_jpeg_quality`). Other values are logged
+      and treated as `"png"`.
+
+    Use `encode_async` for large images so that compression runs in a
+    worker thread instead of blocking the event loop.
+
+    Render objects taller than `image_encode_stream_height` are rendered
+    in strips of `image_encode_strip_height` rows and compressed as they
+    are produced (`encode_object`), so the whole bitmap is never held in
+    memory. Streamed images are always RGBA PNGs.
+    """
+
+    image_encode_png_level: int = 1
+    image_encode_palette_colors: int = 256
+    image_encode_photo_format: str = "png"
+    image_encode_jpeg_quality: int = 90
+    image_encode_stream_height: int = 4096
+    image_encode_strip_height: int = 256
+
+    _warned_formats: set[str] = set()
+
+    @classmethod
+    def _photo_format(cls) -> str:
+        photo_format = cls.image_encode_photo_format
+        if photo_format in PHOTO_FORMATS:
+            return photo_format
+        if photo_format not in cls._warned_formats:
+            cls._warned_formats.add(photo_format)
+            logger.warning(
+                f"Unknown image_encode_photo_format {photo_format!r}, "
+                f"expected one of {PHOTO_FORMATS}; using png"
+            )
+        return "png"
+
+    @classmethod
+    def _palette(cls, image: Image.Image) -> Image.Image | None:
+        """Exact palette version of `image`, if it has few enough colors."""
+        if image.mode not in ("RGB", "RGBA"):
+            return None
+        colors = image.getcolors(cls.image_encode_palette_colors)
+        if colors is None:
+            return None
+        # compare pixels as packed 32-bit values against the sorted palette
+        rgba = image if image.mode == "RGBA" else image.convert("RGBA")
+        pixels = np.asarray(rgba).view(np.uint32)[..., 0]
+        # RGB and RGBA colors are tuples
+        palette = np.array(
+            [(*cast(tuple[int, ...], c), 255)[:4] for _, c in colors], dtype=np.uint8
+        )
+        palette = palette.view(np.uint32)[:, 0]
+        palette.sort()
+        indexed = Image.fromarray(
+            np.searchsorted(palette, pixels).astype(np.uint8), "P"
+        )
+        indexed.putpalette(palette.view(np.uint8).tobytes(), "RGBA")
+        return indexed
+
+    @classmethod
+    def _is_opaque(cls, image: Image.Image) -> bool:
+        if image.mode == "RGB":
+            return True
+        if image.mode != "RGBA":
+            return False
+        # per-band (min, max) for multi-band images
+        extrema = cast(tuple[tuple[int, int], ...], image.getextrema())
+        return extrema[3] == (255, 255)
+
+    @classmethod
+    def _encode(cls, image: Image.Image) -> tuple[bytes, EncodedFormat]:
+        io = BytesIO()
+        if (indexed := cls._palette(image)) is not None:
+            indexed.save(io, format="PNG", compress_level=cls.image_encode_png_level)
+            return io.getvalue(), "png_palette"
+        photo_format = cls._photo_format()
+        if photo_format != "png" and cls._is_opaque(image):
+            if photo_format == "jpeg":
+                image.convert("RGB").save(
+                    io, format="JPEG", quality=cls.image_encode_jpeg_quality
+                )
+            else:
+                image.save(io, format="WEBP", lossless=True, method=0)
+            return io.getvalue(), "jpeg" if photo_format == "jpeg" else "webp"
+        image.save(io, format="PNG", compress_level=cls.image_encode_png_level)
+        return io.getvalue(), "png"
+
+    @classmethod
+    def encode(cls, image: Image.Image) -> bytes:
+        started = time.perf_counter()
+        data, format_ = cls._encode(image)
+        IMAGE_ENCODE_DURATION.labels(format=format_).observe(
+            time.perf_counter() - started
+        )
+        IMAGE_ENCODE_BYTES.labels(format=format_).inc(len(data))
+        return data
+
+    @classmethod
+    async def encode_async(cls, image: Image.Image) -> bytes:
+        return await asyncio.to_thread(cls.encode, image)
+
+    @classmethod
+    def _encode_strips(
+        cls, width: int, height: int, strips: Iterable[np.ndarray]
+    ) -> bytes:
+        """Write RGBA strips, from top to bottom, as a PNG.
+
+        Rows use the "up" filter, which turns the flat areas of rendered
+        documents into zeros, and are compressed as each strip arrives.
+        """
+        header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+        chunks = [_PNG_SIGNATURE, _png_chunk(b"IHDR", header)]
+        compressor = zlib.compressobj(cls.image_encode_png_level)
+        previous = np.zeros((1, width * 4), dtype=np.uint8)
+        for strip in strips:
+            rows = strip.reshape(strip.shape[0], width * 4)
+            filtered = np.empty((rows.shape[0], width * 4 + 1), dtype=np.uint8)
+            filtered[:, 0] = _PNG_FILTER_UP
+            # uint8 arithmetic wraps around, as the filter requires
+            np.subtract(rows[:1], previous, out=filtered[:1, 1:])
+            np.subtract(rows[1:], rows[:-1], out=filtered[1:, 1:])
+            previous = rows[-1:].copy()
+            if data := compressor.compress(filtered.tobytes()):
+                chunks.append(_png_chunk(b"IDAT", data))
+        chunks.append(_png_chunk(b"IDAT", compressor.flush()))
+        chunks.append(_png_chunk(b"IEND", b""))
+        return b"".join(chunks)
+
+    @classmethod
+    def encode_object(cls, obj: "RenderObject") -> bytes:
+        """Render and encode `obj`, in strips if it is tall."""
+        if obj.height <= cls.image_encode_stream_height:
+            return cls.encode(obj.render().to_pil())
+        # rendering and compression are interleaved, both are timed
+        started = time.perf_counter()
+        strips = obj.render_strips(cls.image_encode_strip_height)
+        data = cls._encode_strips(obj.width, obj.height, (s.base_im for s in strips))
+        IMAGE_ENCODE_DURATION.labels(format="png_stream").observe(
+            time.perf_counter() - started
+        )
+        IMAGE_ENCODE_BYTES.labels(format="png_stream").inc(len(data))
+        return data
+
+    @classmethod
+    async def encode_object_async(cls, obj: "RenderObject") -> bytes:
+        """Lay out `obj` here, then render and encode it in a worker thread.
+
+        Layout reads shared caches (compiled templates, markdown images and
+        equations) that are only safe to use from the event loop.
+        """
+        _ = obj.height
+        return await asyncio.to_thread(cls.encode_object, obj)
@@ -0,0 +1,54 @@
+from collections import OrderedDict
+from io import BytesIO
+
+from PIL import Image
+
+from src.utils.env import inject_env
+
+ThumbnailKey = tuple[str, tuple[int, int]]  # (filename, (width, height))
+
+
+def decode_thumbnail(data: bytes, size: tuple[int, int]) -> Image.Image:
+    """Decode `data` scaled down to fit within `size`.
+
+    JPEGs are decoded in draft mode at the smallest DCT scale (1/2 to 1/8)
+    that still covers twice `size`, and other formats are first reduced by
+    box averaging, so the full-resolution bitmap is never resampled with
+    LANCZOS. Images already within `size` are returned as decoded.
+    """
+    image = Image.open(BytesIO(data))
+    # `thumbnail` drafts and reduces before the final resample
+    image.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+    image.load()
+    return image
+
+
+@inject_env()
+class ThumbnailCache:
+    """In-process LRU of decoded thumbnails, keyed by (filename, size).
+
+    Entries are shared, so callers must not modify the returned images.
+    """
+
+    thumbnail_cache_size: int = 64
+
+    _memory: OrderedDict[ThumbnailKey, Image.Image] = OrderedDict()
+
+    @classmethod
+    def get(cls, filename: str, size: tuple[int, int]) -> Image.Image | None:
+        image = cls._memory.get((filename, size))
+        if image is not None:
+            cls._memory.move_to_end((filename, size))
+        return image
+
+    @classmethod
+    def put(cls, filename: str, size: tuple[int, int], image: Image.Image) -> None:
+        cls._memory[(filename, size)] = image
+        cls._memory.move_to_end((filename, size))
+        while len(cls._memory) > cls.thumbnail_cache_size:
+            cls._memory.popitem(last=False)
+
+    @classmethod
+    def invalidate(cls, filename: str) -> None:
+        for key in [key for key in cls._memory if key[0] == filename]:
+            del cls._memory[key]
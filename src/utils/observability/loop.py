@@ -0,0 +1,152 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from types import FrameType
+
+from nonebot import get_driver
+from nonebot.internal.matcher import Matcher
+from nonebot.utils import escape_tag
+
+from src.utils.env import inject_env
+from src.utils.log import logger_wrapper
+
+from .hooks import MatcherIdentifier
+from .metrics import (
+    EVENT_LOOP_BLOCKED_SECONDS,
+    EVENT_LOOP_LAG,
+    EVENT_LOOP_SLOW_CALLBACKS,
+)
+
+logger = logger_wrapper(__name__)
+
+# innermost frames of the loop thread logged for a stall
+_STACK_LIMIT = 12
+
+
+@inject_env()
+class LoopMonitor:
+    """Watch the event loop from a background thread.
+
+    Every `loop_monitor_interval` seconds the watchdog schedules a callback
+    on the loop and records how long it waited to run
+    (`xiaoxiao_event_loop_lag_seconds`). If it has not run within
+    `loop_monitor_slow_threshold` seconds, a callback is blocking the loop:
+    the watchdog samples the stack of the loop thread while it is blocked,
+    and once the loop is free again counts the stall against the matcher
+    found on that stack, or the running coroutine.
+    """
+
+    loop_monitor_interval: float = 0.5
+    loop_monitor_slow_threshold: float = 0.1
+
+    _stop: threading.Event | None = None
+
+    @classmethod
+    def start(cls, loop: asyncio.AbstractEventLoop) -> None:
+        """Start watching `loop`. Must be called from the loop's thread."""
+        if cls._stop is not None:
+            return
+        cls._stop = threading.Event()
+        threading.Thread(
+            target=cls._watch,
+            args=(loop, threading.get_ident(), cls._stop),
+            name="loop-monitor",
+            daemon=True,
+        ).start()
+
+    @classmethod
+    def stop(cls) -> None:
+        if cls._stop is not None:
+            cls._stop.set()
+            cls._stop = None
+
+    @classmethod
+    def _watch(
+        cls, loop: asyncio.AbstractEventLoop, thread_id: int, stop: threading.Event
+    ) -> None:
+        while not stop.wait(cls.loop_monitor_interval):
+            try:
+                if not cls._check(loop, thread_id, stop):
+                    return
+            except Exception as e:
+                # one bad sample must not stop monitoring
+                logger.error("Event loop check failed", e)
+
+    @classmethod
+    def _check(
+        cls, loop: asyncio.AbstractEventLoop, thread_id: int, stop: threading.Event
+    ) -> bool:
+        """Measure the lag of one callback. False if monitoring should stop."""
+        ran = threading.Event()
+        ran_at: list[float] = []
+
+        def ack() -> None:
+            ran_at.append(time.perf_counter())
+            ran.set()
+
+        scheduled = time.perf_counter()
+        try:
+            loop.call_soon_threadsafe(ack)
+        except RuntimeError:  # loop closed
+            return False
+        if ran.wait(cls.loop_monitor_slow_threshold):
+            EVENT_LOOP_LAG.observe(ran_at[0] - scheduled)
+            return True
+
+        label, stack = cls._sample(loop, thread_id)
+        while not ran.wait(cls.loop_monitor_interval):
+            if stop.is_set():
+                return False
+        blocked = ran_at[0] - scheduled
+        EVENT_LOOP_LAG.observe(blocked)
+        EVENT_LOOP_SLOW_CALLBACKS.labels(matcher=label).inc()
+        EVENT_LOOP_BLOCKED_SECONDS.labels(matcher=label).inc(blocked)
+        # qualnames (`<locals>`) and frames (`<module>`) look like color tags
+        logger.warning(
+            f"Event loop blocked for {blocked:.3f}s by {escape_tag(label)}\n"
+            f"{escape_tag(stack)}"
+        )
+        return True
+
+    @classmethod
+    def _sample(
+        cls, loop: asyncio.AbstractEventLoop, thread_id: int
+    ) -> tuple[str, str]:
+        """Label and stack of whatever is running on the loop thread."""
+        frame = sys._current_frames().get(thread_id)
+        if frame is None:
+            return "unknown", ""
+        stack = "".join(traceback.format_stack(frame, _STACK_LIMIT))
+        if (matcher := cls._find_matcher(frame)) is not None:
+            return MatcherIdentifier.get_label(matcher), stack
+        task = asyncio.current_task(loop)
+        if task is None:
+            return "callback", stack
+        coro = task.get_coro()
+        return f"task:{getattr(coro, '__qualname__', type(coro).__name__)}", stack
+
+    @classmethod
+    def _find_matcher(cls, frame: FrameType | None) -> Matcher | None:
+        # a running coroutine has the frames of the coroutines awaiting it
+        # below it, so a handler always runs above `Matcher.simple_run`
+        while frame is not None:
+            if frame.f_code is Matcher.simple_run.__code__:
+                matcher = frame.f_locals.get("self")
+                return matcher if isinstance(matcher, Matcher) else None
+            frame = frame.f_back
+        return None
+
+
+driver = get_driver()
+
+
+@driver.on_startup
+async def _():
+    LoopMonitor.start(asyncio.get_running_loop())
+
+
+@driver.on_shutdown
+async def _():
+    LoopMonitor.stop()
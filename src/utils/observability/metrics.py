@@ -56,6 +56,117 @@ GATEWAY_HEALTHY = Gauge(
     "OneBot gateway connectivity (1=ok, 0=down)",
 )
 
+FILE_CACHE_REQUESTS = Counter(
+    "xiaoxiao_file_cache_requests_total",
+    "File storage cache lookups",
+    ["db", "tier", "result"],
+)
+FILE_CACHE_COALESCED_TOTAL = Counter(
+    "xiaoxiao_file_cache_coalesced_total",
+    "File storage loads joined onto an in-flight load of the same file",
+    ["db"],
+)
+FILE_CACHE_BYTES = Gauge(
+    "xiaoxiao_file_cache_bytes",
+    "Bytes held by the file storage cache",
+    ["db", "tier"],
+)
+
+STORAGE_MAINTENANCE_DELETED_TOTAL = Counter(
+    "xiaoxiao_storage_maintenance_deleted_total",
+    "Documents removed by GridFS maintenance",
+    ["db", "kind"],
+)
+STORAGE_MAINTENANCE_DURATION = Histogram(
+    "xiaoxiao_storage_maintenance_duration_seconds",
+    "Time spent in one GridFS maintenance pass",
+    ["db", "task"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, float("inf")),
+)
+STORAGE_MAINTENANCE_LAST_SUCCESS = Gauge(
+    "xiaoxiao_storage_maintenance_last_success_timestamp_seconds",
+    "Unix time of the last completed GridFS maintenance pass",
+    ["db", "task"],
+)
+
+IMAGE_ENCODE_DURATION = Histogram(
+    "xiaoxiao_image_encode_duration_seconds",
+    "Time spent encoding an outgoing image",
+    ["format"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float("inf")),
+)
+IMAGE_ENCODE_BYTES = Counter(
+    "xiaoxiao_image_encode_bytes_total",
+    "Bytes of encoded outgoing images",
+    ["format"],
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "xiaoxiao_event_loop_lag_seconds",
+    "Delay between scheduling a callback on the event loop and running it",
+    buckets=(
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        float("inf"),
+    ),
+)
+EVENT_LOOP_SLOW_CALLBACKS = Counter(
+    "xiaoxiao_event_loop_slow_callbacks_total",
+    "Event loop stalls longer than the slow callback threshold",
+    ["matcher"],
+)
+EVENT_LOOP_BLOCKED_SECONDS = Counter(
+    "xiaoxiao_event_loop_blocked_seconds_total",
+    "Time the event loop spent blocked in slow callbacks",
+    ["matcher"],
+)
+
+MONGO_COMMAND_DURATION = Histogram(
+    "xiaoxiao_mongo_command_duration_seconds",
+    "Time spent in MongoDB commands",
+    ["db", "collection", "command", "status"],
+    buckets=(
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        float("inf"),
+    ),
+)
+MONGO_POOL_CONNECTIONS = Gauge(
+    "xiaoxiao_mongo_pool_connections",
+    "Open connections in MongoDB connection pools",
+    ["address"],
+)
+MONGO_POOL_CHECKED_OUT = Gauge(
+    "xiaoxiao_mongo_pool_checked_out_connections",
+    "MongoDB connections checked out of their pool",
+    ["address"],
+)
+MONGO_POOL_CHECKOUT_DURATION = Histogram(
+    "xiaoxiao_mongo_pool_checkout_duration_seconds",
+    "Time spent waiting for a MongoDB connection",
+    ["address"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, float("inf")),
+)
+
 
 def get_metrics_text() -> bytes:
     return generate_latest(REGISTRY)
@@ -1,9 +1,11 @@
 from .filestore import FileStorage
 from .mongo import Collection, Mongo, PydanticObjectId
+from .sqlite import SQLitePool
 
 __all__ = [
     "Collection",
     "FileStorage",
     "Mongo",
     "PydanticObjectId",
+    "SQLitePool",
 ]
@@ -0,0 +1,265 @@
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from pathlib import Path
+
+from ..log import logger_wrapper
+from ..observability.metrics import (
+    FILE_CACHE_BYTES,
+    FILE_CACHE_COALESCED_TOTAL,
+    FILE_CACHE_REQUESTS,
+)
+
+logger = logger_wrapper("storage")
+
+
+class SingleFlight[K: Hashable, V]:
+    """Coalesce concurrent calls with the same key into a single execution.
+
+    The first caller starts the work; callers arriving while it is still
+    running await the same result. A cancelled waiter does not cancel the
+    shared work for the others.
+    """
+
+    def __init__(self, name: str = "") -> None:
+        self.name = name
+        self._calls: dict[K, asyncio.Future[V]] = {}
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._calls
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        fut = self._calls.get(key)
+        if fut is not None:
+            FILE_CACHE_COALESCED_TOTAL.labels(db=self.name).inc()
+            return await asyncio.shield(fut)
+
+        fut = asyncio.ensure_future(fn())
+        self._calls[key] = fut
+
+        def _done(f: asyncio.Future[V]):
+            if self._calls.get(key) is f:
+                del self._calls[key]
+
+        fut.add_done_callback(_done)
+        return await asyncio.shield(fut)
+
+
+class MemoryTier:
+    """In-process LRU of file contents, bounded by total bytes."""
+
+    def __init__(self, max_bytes: int, max_item_bytes: int = 0) -> None:
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes or max_bytes // 8
+        self.size = 0
+        self._data: OrderedDict[str, bytes] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def get(self, key: str) -> bytes | None:
+        data = self._data.get(key)
+        if data is not None:
+            self._data.move_to_end(key)
+        return data
+
+    def put(self, key: str, data: bytes) -> bool:
+        if len(data) > self.max_item_bytes:
+            return False
+        self.pop(key)
+        self._data[key] = data
+        self.size += len(data)
+        while self.size > self.max_bytes and self._data:
+            _, evicted = self._data.popitem(last=False)
+            self.size -= len(evicted)
+        return True
+
+    def pop(self, key: str) -> bytes | None:
+        data = self._data.pop(key, None)
+        if data is not None:
+            self.size -= len(data)
+        return data
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.size = 0
+
+
+class DiskTier:
+    """Local directory of file contents, trimmed by modification time.
+
+    Entries are named by the SHA-1 of the GridFS filename, so arbitrary
+    filenames are safe to use as keys. All filesystem access is blocking;
+    callers are expected to run these methods in a worker thread.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.size = -1  # unknown until the first scan
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return self.root / digest[:2] / digest
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        # touch so that trimming keeps recently used entries
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        if self.size < 0:
+            self.size = self._scan_size()
+        else:
+            self.size += len(data)
+        if self.size > self.max_bytes:
+            self.trim()
+
+    def pop(self, key: str) -> None:
+        path = self._path(key)
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        if self.size >= 0:
+            self.size -= size
+
+    def _entries(self) -> list[tuple[Path, os.stat_result]]:
+        entries = []
+        for sub in self.root.iterdir():
+            if not sub.is_dir():
+                continue
+            for path in sub.iterdir():
+                try:
+                    entries.append((path, path.stat()))
+                except OSError:
+                    continue
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(st.st_size for _, st in self._entries())
+
+    def trim(self) -> None:
+        """Remove least recently used entries until below 90% of the bound."""
+        entries = self._entries()
+        entries.sort(key=lambda e: e[1].st_mtime)
+        size = sum(st.st_size for _, st in entries)
+        target = self.max_bytes * 0.9
+        for path, st in entries:
+            if size <= target:
+                break
+            try:
+                path.unlink()
+                size -= st.st_size
+            except OSError:
+                continue
+        self.size = size
+
+
+class BlobCache:
+    """Two-tier (memory + optional disk) cache in front of GridFS reads.
+
+    Contents are keyed by GridFS filename. Stored files are immutable under
+    a filename, so entries are only dropped on eviction or explicit
+    invalidation (deletion / overwrite of the underlying file).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        memory_bytes: int,
+        disk_dir: str | Path | None = None,
+        disk_bytes: int = 0,
+    ) -> None:
+        self.name = name
+        self.memory = MemoryTier(memory_bytes)
+        self.disk = (
+            DiskTier(Path(disk_dir) / name, disk_bytes)
+            if disk_dir and disk_bytes > 0
+            else None
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _record(self, tier: str, result: str) -> None:
+        FILE_CACHE_REQUESTS.labels(db=self.name, tier=tier, result=result).inc()
+
+    def _update_gauges(self) -> None:
+        FILE_CACHE_BYTES.labels(db=self.name, tier="memory").set(self.memory.size)
+        if self.disk is not None and self.disk.size >= 0:
+            FILE_CACHE_BYTES.labels(db=self.name, tier="disk").set(self.disk.size)
+
+    async def get(self, key: str) -> bytes | None:
+        data = self.memory.get(key)
+        if data is not None:
+            self.hits += 1
+            self._record("memory", "hit")
+            return data
+        self._record("memory", "miss")
+
+        if self.disk is not None:
+            try:
+                data = await asyncio.to_thread(self.disk.get, key)
+            except Exception as e:
+                logger.warning(f"Disk cache read failed [{key}]", exception=e)
+                data = None
+            if data is not None:
+                self.hits += 1
+                self._record("disk", "hit")
+                self.memory.put(key, data)
+                self._update_gauges()
+                return data
+            self._record("disk", "miss")
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, data: bytes) -> None:
+        self.memory.put(key, data)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.put, key, data)
+            except Exception as e:
+                logger.warning(f"Disk cache write failed [{key}]", exception=e)
+        self._update_gauges()
+
+    async def invalidate(self, *keys: str) -> None:
+        for key in keys:
+            self.memory.pop(key)
+        if self.disk is not None and keys:
+            disk = self.disk
+
+            def _pop_all():
+                for key in keys:
+                    disk.pop(key)
+
+            try:
+                await asyncio.to_thread(_pop_all)
+            except Exception as e:
+                logger.warning("Disk cache invalidation failed", exception=e)
+        self._update_gauges()
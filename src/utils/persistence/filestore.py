@@ -13,7 +13,12 @@ from pymongo.asynchronous.database import AsyncDatabase
 from pymongo.errors import DuplicateKeyError
 
 from ..env import inject_env
+from ..image.thumbnail import ThumbnailCache, decode_thumbnail
 from ..log import logger_wrapper
+from ..observability.metrics import FILE_CACHE_REQUESTS
+from .blobcache import BlobCache, SingleFlight
+from .maintenance import StorageMaintenance
+from .monitoring import event_listeners
 
 
 class StorageStat(NamedTuple):
@@ -54,11 +59,21 @@ class FileStorage:
     - If ephemeral, the file will be deleted after a certain period of time.
     - If persistent, a reference count is kept to prevent deletion.
       Persistent files are not deleted until the reference count is zero.
+
+    Reads go through a per-database `BlobCache` (in-process LRU bounded by
+    bytes, plus an optional local disk tier), and concurrent loads of the
+    same filename share a single GridFS read / download.
     """
 
     FILE_STORAGE_CONCURRENCY: int = 10
     FILE_STORAGE_TTL: str = "7d"
     FILE_STORAGE_CLEANUP_INTERVAL: int = 3600
+    FILE_STORAGE_CLEANUP_IN_PROCESS: bool = True
+    FILE_STORAGE_CLEANUP_BATCH: int = 500
+    FILE_STORAGE_CLEANUP_PAUSE: float = 0.1
+    FILE_STORAGE_CACHE_SIZE: int = 64 * 1024 * 1024
+    FILE_STORAGE_DISK_CACHE_DIR: str = ""
+    FILE_STORAGE_DISK_CACHE_SIZE: int = 1024 * 1024 * 1024
 
     _instances: dict[str, "FileStorage"] = {}
     _lock = asyncio.Lock()
@@ -76,6 +91,13 @@ class FileStorage:
         self.fs_bucket = gridfs.AsyncGridFSBucket(self.db)
         self.semaphore = asyncio.Semaphore(self.FILE_STORAGE_CONCURRENCY)
         self.ttl = _parse_timedelta(ttl or self.FILE_STORAGE_TTL)
+        self.cache = BlobCache(
+            self.db.name,
+            memory_bytes=self.FILE_STORAGE_CACHE_SIZE,
+            disk_dir=self.FILE_STORAGE_DISK_CACHE_DIR or None,
+            disk_bytes=self.FILE_STORAGE_DISK_CACHE_SIZE,
+        )
+        self._flight: SingleFlight[str, bytes | None] = SingleFlight(self.db.name)
 
     @classmethod
     async def get_instance(cls, db_name: str = "files", ttl: str = "") -> "FileStorage":
@@ -84,7 +106,7 @@ class FileStorage:
                 return cls._instances[db_name]
             if cls._session is None:
                 cls._session = aiohttp.ClientSession()
-            client = AsyncMongoClient()
+            client = AsyncMongoClient(event_listeners=event_listeners())
             instance = cls(client[db_name], cls._session, ttl)
             await instance._ensure_index()
             cls._instances[db_name] = instance
@@ -114,37 +136,38 @@ class FileStorage:
     async def _cleanup_loop(cls):
         while True:
             await asyncio.sleep(cls.FILE_STORAGE_CLEANUP_INTERVAL)
+            if not cls.FILE_STORAGE_CLEANUP_IN_PROCESS:
+                # expiry is handled externally (scripts/cleanup_orphan_chunks.py)
+                continue
             async with cls._lock:
                 instances = dict(cls._instances)
             for instance in instances.values():
                 try:
                     await instance._cleanup_expired()
-                except Exception:
-                    logger.error("Cleanup failed")
+                except Exception as e:
+                    logger.error(f"Cleanup failed ({instance.db.name})", exception=e)
+
+    def maintenance(self) -> StorageMaintenance:
+        async def _invalidate(filenames: list[str]):
+            await self.cache.invalidate(*filenames)
+            for filename in filenames:
+                ThumbnailCache.invalidate(self._thumbnail_key(filename))
+
+        return StorageMaintenance(
+            self.db,
+            batch_size=self.FILE_STORAGE_CLEANUP_BATCH,
+            pause=self.FILE_STORAGE_CLEANUP_PAUSE,
+            on_delete=_invalidate,
+        )
 
     async def _cleanup_expired(self):
-        """Delete expired ephemeral files using fs_bucket (cascades to chunks)."""
-        now = datetime.now(UTC)
-        deleted = 0
-        while True:
-            docs = await self.db.fs.files.find(
-                {
-                    "metadata.storage_type": "ephemeral",
-                    "metadata.expire_at": {"$lt": now},
-                },
-                projection={"_id": True},
-                limit=50,
-            ).to_list(50)
-            if not docs:
-                break
-            for doc in docs:
-                try:
-                    await self.fs_bucket.delete(doc["_id"])
-                    deleted += 1
-                except Exception:
-                    pass
-        if deleted:
-            logger.info(f"Cleaned up {deleted} expired file(s) ({self.db.name})")
+        """Delete expired ephemeral files and their chunks in bulk."""
+        result = await self.maintenance().sweep_expired()
+        if result.files:
+            logger.info(
+                f"Cleaned up {result.files} expired file(s), "
+                f"{result.chunks} chunk(s) ({self.db.name})"
+            )
 
     async def _ensure_index(self):
         # drop legacy TTL index if it exists — TTL on fs.files deletes
@@ -160,12 +183,6 @@ class FileStorage:
         )
         await self.db.fs.files.create_index([("filename", 1)], unique=True)
 
-    @classmethod
-    def encode_image(cls, image: Image.Image) -> bytes:
-        io = BytesIO()
-        image.save(io, format="PNG")
-        return io.getvalue()
-
     async def _download_and_store(
         self, url: str, filename: str, retries: int = 3
     ) -> bool:
@@ -190,6 +207,8 @@ class FileStorage:
     async def store_as_temp(self, content: aiohttp.StreamReader | bytes, filename: str):
         existing = await self.db.fs.files.find_one({"filename": filename})
         if existing and existing["metadata"]["storage_type"] != "persistent":
+            await self.cache.invalidate(filename)
+            ThumbnailCache.invalidate(self._thumbnail_key(filename))
             try:
                 await self.fs_bucket.delete(existing["_id"])
             except Exception as e:
@@ -245,19 +264,38 @@ class FileStorage:
         )
         return result.modified_count > 0
 
+    async def _read(self, filename: str, file_id=None) -> bytes:
+        """Read a stored file from GridFS and populate the cache."""
+        if file_id is not None:
+            grid_out = await self.fs_bucket.open_download_stream(file_id)
+        else:
+            grid_out = await self.fs_bucket.open_download_stream_by_name(filename)
+        data: bytes = await grid_out.read()
+        await self.cache.put(filename, data)
+        return data
+
+    async def _load_uncached(self, url: str, filename: str) -> bytes | None:
+        doc = await self.db.fs.files.find_one(
+            {"filename": filename}, projection={"_id": True, "metadata.ready": True}
+        )
+        if doc and doc["metadata"].get("ready"):
+            return await self._read(filename, doc["_id"])
+        if not doc and url and await self._download_and_store(url, filename):
+            return await self._read(filename)
+        if url:
+            # directly download and return
+            async with self.session.get(url) as resp:
+                resp.raise_for_status()
+                return await resp.read()
+
     async def load(self, url: str, filename: str) -> bytes | None:
         try:
-            doc = await self.db.fs.files.find_one({"filename": filename})
-            if not doc and url:
-                await self._download_and_store(url, filename)
-            if doc and doc["metadata"].get("ready"):
-                grid_out = await self.fs_bucket.open_download_stream_by_name(filename)
-                return await grid_out.read()
-            elif url:
-                # directly download and return
-                async with self.session.get(url) as resp:
-                    resp.raise_for_status()
-                    return await resp.read()
+            data = await self.cache.get(filename)
+            if data is not None:
+                return data
+            return await self._flight.do(
+                filename, lambda: self._load_uncached(url, filename)
+            )
         except Exception as e:
             logger.info(f"Load file failed: {e}")
 
@@ -266,26 +304,69 @@ class FileStorage:
         if data:
             return Image.open(BytesIO(data))
 
+    def _thumbnail_key(self, filename: str) -> str:
+        return f"{self.db.name}/{filename}"
+
+    async def load_thumbnail(
+        self, url: str, filename: str, size: tuple[int, int]
+    ) -> Image.Image | None:
+        """Load an image scaled down to fit within `size`.
+
+        Decoding runs in a worker thread. JPEGs are decoded in draft mode at
+        no more than about twice `size`; other formats are decoded in full
+        and then reduced (see `decode_thumbnail`). Results are cached by
+        (filename, size) and shared, so do not modify them.
+        """
+        key = self._thumbnail_key(filename)
+        image = ThumbnailCache.get(key, size)
+        FILE_CACHE_REQUESTS.labels(
+            db=self.db.name, tier="thumbnail", result="miss" if image is None else "hit"
+        ).inc()
+        if image is not None:
+            return image
+        data = await self.load(url, filename)
+        if not data:
+            return None
+        image = await asyncio.to_thread(decode_thumbnail, data, size)
+        ThumbnailCache.put(key, size, image)
+        return image
+
     async def load_metadata(self, filename: str) -> dict | None:
         doc = await self.db.fs.files.find_one({"filename": filename})
         return doc["metadata"] if doc else None
 
+    async def load_metadata_many(self, filenames: list[str], key: str) -> dict:
+        """Return `{filename: metadata[key]}` for files where the key is set."""
+        cursor = self.db.fs.files.find(
+            {"filename": {"$in": filenames}, f"metadata.{key}": {"$exists": True}},
+            projection={"filename": True, f"metadata.{key}": True},
+        )
+        return {doc["filename"]: doc["metadata"][key] async for doc in cursor}
+
     async def get_or_compute_metadata(
         self,
         filename: str,
         key: str,
         processor: Callable[[bytes], str],
     ) -> str:
+        """Return `metadata[key]`, computing and storing it on first use.
+
+        `processor` receives the file content and runs in a worker thread.
+        """
         doc = await self.db.fs.files.find_one({"filename": filename})
 
         if doc and doc["metadata"].get("ready"):
             if key in doc["metadata"]:
                 return doc["metadata"][key]
 
-            grid_out = await self.fs_bucket.open_download_stream_by_name(filename)
-            data: bytes = await grid_out.read()
+            data = await self.cache.get(filename)
+            if data is None:
+                data = await self._flight.do(
+                    filename, lambda: self._read(filename, doc["_id"])
+                )
+            assert data is not None
 
-            value = processor(data)
+            value = await asyncio.to_thread(processor, data)
 
             await self.db.fs.files.update_one(
                 {"filename": filename}, {"$set": {f"metadata.{key}": value}}
@@ -310,6 +391,8 @@ class FileStorage:
         if not doc:
             return False
         if doc["metadata"]["references"] <= 0:
+            await self.cache.invalidate(filename)
+            ThumbnailCache.invalidate(self._thumbnail_key(filename))
             await self.fs_bucket.delete(doc["_id"])
             return True
         return False
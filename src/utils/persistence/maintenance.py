@@ -0,0 +1,179 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any, NamedTuple
+
+from pymongo.asynchronous.database import AsyncDatabase
+
+from ..log import logger_wrapper
+from ..observability.metrics import (
+    STORAGE_MAINTENANCE_DELETED_TOTAL,
+    STORAGE_MAINTENANCE_DURATION,
+    STORAGE_MAINTENANCE_LAST_SUCCESS,
+)
+
+logger = logger_wrapper("storage")
+
+
+class SweepResult(NamedTuple):
+    files: int
+    chunks: int
+    batches: int
+
+
+class StorageMaintenance:
+    """Bulk maintenance of a GridFS database.
+
+    `fs_bucket.delete` issues two single-document deletes per file. Here both
+    collections are cleaned with `delete_many` over batches of ids, so a
+    batch of N files costs a constant number of round trips.
+
+    Batches are separated by `pause` seconds and only one maintenance batch
+    runs at a time per process, which keeps the sweep from competing with
+    foreground queries for the connection pool.
+    """
+
+    _slot = asyncio.Semaphore(1)
+
+    def __init__(
+        self,
+        db: AsyncDatabase,
+        batch_size: int = 500,
+        pause: float = 0.1,
+        on_delete: Callable[[list[str]], Awaitable[Any]] | None = None,
+    ):
+        self.db = db
+        self.batch_size = batch_size
+        self.pause = pause
+        self.on_delete = on_delete
+
+    async def _delete_files(self, ids: list, filter: dict[str, Any]) -> SweepResult:
+        """Delete the given files and their chunks.
+
+        `filter` is re-applied when deleting from `fs.files` so that a file
+        promoted between selection and deletion survives; its chunks are kept
+        by excluding ids that still exist afterwards.
+        """
+        files = await self.db.fs.files.delete_many({"_id": {"$in": ids}, **filter})
+        if files.deleted_count < len(ids):
+            survivors = await self.db.fs.files.distinct("_id", {"_id": {"$in": ids}})
+            if survivors:
+                kept = set(survivors)
+                ids = [i for i in ids if i not in kept]
+        chunks = await self.db.fs.chunks.delete_many({"files_id": {"$in": ids}})
+        return SweepResult(files.deleted_count, chunks.deleted_count, 1)
+
+    async def sweep_expired(
+        self, now: datetime | None = None, limit: int = 0
+    ) -> SweepResult:
+        """Delete ephemeral files whose `expire_at` is before `now`.
+
+        Args:
+            now: cutoff time, defaults to the current time.
+            limit: stop after roughly this many files (0 = no limit).
+        """
+        now = now or datetime.now(UTC)
+        filter = {
+            "metadata.storage_type": "ephemeral",
+            "metadata.expire_at": {"$lt": now},
+        }
+        return await self._run("expired", filter, limit)
+
+    async def _run(self, task: str, filter: dict[str, Any], limit: int) -> SweepResult:
+        db = self.db.name
+        files = chunks = batches = 0
+        start = time.perf_counter()
+        while not limit or files < limit:
+            async with self._slot:
+                docs = await self.db.fs.files.find(
+                    filter,
+                    projection={"_id": True, "filename": True},
+                    limit=self.batch_size,
+                ).to_list(self.batch_size)
+                if not docs:
+                    break
+                if self.on_delete is not None:
+                    await self.on_delete([doc["filename"] for doc in docs])
+                result = await self._delete_files([doc["_id"] for doc in docs], filter)
+            files += result.files
+            chunks += result.chunks
+            batches += 1
+            STORAGE_MAINTENANCE_DELETED_TOTAL.labels(db=db, kind="files").inc(
+                result.files
+            )
+            STORAGE_MAINTENANCE_DELETED_TOTAL.labels(db=db, kind="chunks").inc(
+                result.chunks
+            )
+            if result.files == 0:
+                # everything selected was concurrently promoted or deleted
+                break
+            await asyncio.sleep(self.pause)
+        STORAGE_MAINTENANCE_DURATION.labels(db=db, task=task).observe(
+            time.perf_counter() - start
+        )
+        STORAGE_MAINTENANCE_LAST_SUCCESS.labels(db=db, task=task).set_to_current_time()
+        return SweepResult(files, chunks, batches)
+
+    def _orphan_pipeline(self) -> list[dict[str, Any]]:
+        # anti-join: distinct chunk owners without a matching fs.files entry
+        return [
+            {"$group": {"_id": "$files_id"}},
+            {
+                "$lookup": {
+                    "from": "fs.files",
+                    "localField": "_id",
+                    "foreignField": "_id",
+                    "as": "file",
+                }
+            },
+            {"$match": {"file": {"$eq": []}}},
+            {"$project": {"_id": True}},
+        ]
+
+    async def iter_orphans(self, limit: int = 0):
+        """Yield batches of `files_id` whose chunks have no `fs.files` entry."""
+        pipeline = self._orphan_pipeline()
+        if limit > 0:
+            pipeline.append({"$limit": limit})
+        cursor = await self.db.fs.chunks.aggregate(
+            pipeline, allowDiskUse=True, batchSize=self.batch_size
+        )
+        batch = []
+        async for doc in cursor:
+            batch.append(doc["_id"])
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def count_orphans(self) -> int:
+        cursor = await self.db.fs.chunks.aggregate(
+            [*self._orphan_pipeline(), {"$count": "n"}], allowDiskUse=True
+        )
+        result = await cursor.to_list(1)
+        return result[0]["n"] if result else 0
+
+    async def sweep_orphans(self, limit: int = 0) -> SweepResult:
+        """Delete chunks whose owning `fs.files` document no longer exists."""
+        db = self.db.name
+        files = chunks = batches = 0
+        start = time.perf_counter()
+        async for ids in self.iter_orphans(limit):
+            async with self._slot:
+                result = await self.db.fs.chunks.delete_many({"files_id": {"$in": ids}})
+            files += len(ids)
+            chunks += result.deleted_count
+            batches += 1
+            STORAGE_MAINTENANCE_DELETED_TOTAL.labels(db=db, kind="orphan_chunks").inc(
+                result.deleted_count
+            )
+            await asyncio.sleep(self.pause)
+        STORAGE_MAINTENANCE_DURATION.labels(db=db, task="orphans").observe(
+            time.perf_counter() - start
+        )
+        STORAGE_MAINTENANCE_LAST_SUCCESS.labels(
+            db=db, task="orphans"
+        ).set_to_current_time()
+        return SweepResult(files, chunks, batches)
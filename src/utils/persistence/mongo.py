@@ -18,6 +18,7 @@ from pymongo.results import (
 
 from ..env import inject_env
 from ..log import logger_wrapper
+from .monitoring import event_listeners
 from .serialize import deserialize, serialize
 
 T = TypeVar("T")
@@ -254,7 +255,7 @@ class Collection[D: Mapping[str, Any], T]:
 class Mongo:
     DB: str = "nonebot2"
 
-    _client = AsyncMongoClient()
+    _client = AsyncMongoClient(event_listeners=event_listeners())
 
     _collections: list[tuple[str, str]] = []
 
@@ -0,0 +1,170 @@
+from collections.abc import Mapping
+from typing import Any
+
+from pymongo import monitoring
+
+from ..env import inject_env
+from ..log import logger_wrapper
+from ..observability.metrics import (
+    MONGO_COMMAND_DURATION,
+    MONGO_POOL_CHECKED_OUT,
+    MONGO_POOL_CHECKOUT_DURATION,
+    MONGO_POOL_CONNECTIONS,
+)
+
+logger = logger_wrapper(__name__)
+
+# where the filter of each command is, if it has one
+_FILTER_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+}
+_BULK_FIELDS = {
+    "update": "updates",
+    "delete": "deletes",
+}
+
+
+def _collection(command_name: str, command: Mapping[str, Any]) -> str:
+    if command_name == "getMore":
+        return str(command.get("collection", ""))
+    target = command.get(command_name)
+    # database commands (e.g. `aggregate: 1`) have no collection
+    return target if isinstance(target, str) else ""
+
+
+def _filter(command_name: str, command: Mapping[str, Any]) -> Any:
+    if command_name in _FILTER_FIELDS:
+        return command.get(_FILTER_FIELDS[command_name])
+    if command_name in _BULK_FIELDS:
+        statements = command.get(_BULK_FIELDS[command_name]) or [{}]
+        return statements[0].get("q")
+    if command_name == "aggregate":
+        for stage in command.get("pipeline") or []:
+            if "$match" in stage:
+                return stage["$match"]
+    return None
+
+
+def filter_shape(value: Any) -> Any:
+    """Replace the values in a filter with "?", keeping fields and operators.
+
+    Example:
+        {"user_id": 1, "time": {"$gt": t}} -> {"user_id": "?", "time": {"$gt": "?"}}
+    """
+    if isinstance(value, Mapping):
+        return {key: filter_shape(item) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        # `$in` lists and `$or` branches: the first item is representative
+        return [filter_shape(value[0]), "..."] if value else []
+    return "?"
+
+
+@inject_env()
+class CommandMetrics(monitoring.CommandListener):
+    """Record the duration of every command by database, collection and command.
+
+    Commands slower than `mongo_slow_command_threshold` seconds are logged
+    with the shape of their filter. GridFS chunk reads show up as `find` and
+    `getMore` on the `<bucket>.chunks` collection.
+    """
+
+    mongo_slow_command_threshold: float = 0.1
+
+    def __init__(self) -> None:
+        # (connection, request id) -> (collection, filter) of running commands
+        self._running: dict[tuple[Any, int], tuple[str, Any]] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        self._running[(event.connection_id, event.request_id)] = (
+            _collection(event.command_name, event.command),
+            _filter(event.command_name, event.command),
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, "success")
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, "error")
+
+    def _finish(
+        self,
+        event: monitoring.CommandSucceededEvent | monitoring.CommandFailedEvent,
+        status: str,
+    ) -> None:
+        collection, filter = self._running.pop(
+            (event.connection_id, event.request_id), ("", None)
+        )
+        duration = event.duration_micros / 1e6
+        MONGO_COMMAND_DURATION.labels(
+            db=event.database_name,
+            collection=collection,
+            command=event.command_name,
+            status=status,
+        ).observe(duration)
+        if duration >= self.mongo_slow_command_threshold:
+            logger.warning(
+                f"Slow Mongo {event.command_name} on "
+                f"{event.database_name}.{collection}: {duration * 1000:.0f}ms, "
+                f"filter={filter_shape(filter) if filter is not None else None}"
+            )
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Track open and checked out connections, and the time to check one out."""
+
+    @staticmethod
+    def _address(address: tuple[str, int | None]) -> str:
+        host, port = address
+        return f"{host}:{port}"
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        MONGO_POOL_CONNECTIONS.labels(address=self._address(event.address)).inc()
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        MONGO_POOL_CONNECTIONS.labels(address=self._address(event.address)).dec()
+
+    def connection_checked_out(
+        self, event: monitoring.ConnectionCheckedOutEvent
+    ) -> None:
+        address = self._address(event.address)
+        MONGO_POOL_CHECKED_OUT.labels(address=address).inc()
+        if event.duration is not None:
+            MONGO_POOL_CHECKOUT_DURATION.labels(address=address).observe(event.duration)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        MONGO_POOL_CHECKED_OUT.labels(address=self._address(event.address)).dec()
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_check_out_started(
+        self, event: monitoring.ConnectionCheckOutStartedEvent
+    ) -> None:
+        pass
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ) -> None:
+        pass
+
+
+def event_listeners() -> list[
+    monitoring.CommandListener | monitoring.ConnectionPoolListener
+]:
+    """Listeners to pass as `event_listeners` to every Mongo client."""
+    return [CommandMetrics(), PoolMetrics()]
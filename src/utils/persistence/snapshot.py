@@ -0,0 +1,174 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from ..env import inject_env
+from ..log import logger_wrapper
+
+logger = logger_wrapper("snapshot")
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@inject_env()
+class Snapshot:
+    """Versioned, checksummed SQLite snapshot of a static dataset.
+
+    `build` fills a fresh database from the dataset files in `sources`. The
+    result is vacuumed, hashed and installed under `snapshot_dir` as
+    `<name>-v<version>.db`, next to a `<name>-v<version>.json` manifest
+    holding the checksum and a key of the sources it was built from.
+
+    `ensure` returns the installed snapshot, rebuilding it only when it is
+    missing or when `version` or the sources changed. Staleness is checked
+    from file metadata, so it does not depend on dataset size. The first
+    `ensure` of each instance also verifies the checksum, and rebuilds a
+    snapshot that was truncated or overwritten. Snapshots are normally
+    produced ahead of time by `scripts/build_snapshots.py`.
+
+    Example:
+    ```
+    snapshot = Snapshot("idiom", 1, build_idiom, [Path("idiom.json")])
+    path = snapshot.ensure()
+    ```
+    """
+
+    snapshot_dir: str = "~/.cache/nonebot/snapshots"
+
+    def __init__(
+        self,
+        name: str,
+        version: int,
+        build: Callable[[sqlite3.Connection], None],
+        sources: Iterable[Path],
+    ) -> None:
+        self.name = name
+        self.version = version
+        self.build_fn = build
+        self.sources = list(sources)
+        self._lock = threading.Lock()
+        self._verified = False
+
+    @property
+    def root(self) -> Path:
+        return Path(self.snapshot_dir).expanduser()
+
+    @property
+    def path(self) -> Path:
+        return self.root / f"{self.name}-v{self.version}.db"
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.path.with_suffix(".json")
+
+    def _files(self) -> list[Path]:
+        files = []
+        for source in self.sources:
+            if source.is_dir():
+                files.extend(sorted(source.glob("*.json")))
+            elif source.exists():
+                files.append(source)
+        return files
+
+    def source_key(self) -> str:
+        """Digest of source names, sizes and modification times."""
+        digest = hashlib.sha256(f"{self.name}:{self.version}".encode())
+        for file in self._files():
+            stat = file.stat()
+            digest.update(f"{file}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    def manifest(self) -> dict | None:
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def is_current(self) -> bool:
+        manifest = self.manifest()
+        if manifest is None or manifest.get("source_key") != self.source_key():
+            return False
+        try:
+            return self.path.stat().st_size == manifest.get("size")
+        except OSError:
+            return False
+
+    def is_intact(self) -> bool:
+        """Whether the snapshot matches the checksum in its manifest.
+
+        Reads the whole snapshot.
+        """
+        manifest = self.manifest()
+        if manifest is None:
+            return False
+        try:
+            return _sha256(self.path) == manifest.get("sha256")
+        except OSError:
+            return False
+
+    @property
+    def checksum(self) -> str:
+        """SHA-256 of the installed snapshot, as recorded in its manifest."""
+        manifest = self.manifest()
+        return manifest["sha256"] if manifest else ""
+
+    def build(self) -> Path:
+        """Build the snapshot from its sources and install it atomically."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.unlink(missing_ok=True)
+        started = time.perf_counter()
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            with conn:
+                self.build_fn(conn)
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+
+        manifest = {
+            "name": self.name,
+            "version": self.version,
+            "source_key": self.source_key(),
+            "sha256": _sha256(tmp),
+            "size": tmp.stat().st_size,
+            "built_at": time.time(),
+        }
+        tmp.replace(self.path)
+        self.manifest_path.write_text(json.dumps(manifest, indent=2))
+        self._verified = True
+        logger.info(
+            f"Built snapshot {self.path.name} in "
+            f"{time.perf_counter() - started:.1f}s ({manifest['size']} bytes)"
+        )
+        return self.path
+
+    def ensure(self) -> Path:
+        """Return the installed snapshot, building it first if needed.
+
+        Blocking; call from a worker thread.
+        """
+        with self._lock:
+            if not self.is_current():
+                logger.warning(f"Snapshot {self.path.name} is missing or stale")
+                self.build()
+            elif not self._verified:
+                if not self.is_intact():
+                    logger.warning(
+                        f"Snapshot {self.path.name} does not match its checksum"
+                    )
+                    self.build()
+                self._verified = True
+            return self.path
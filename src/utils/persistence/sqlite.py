@@ -0,0 +1,104 @@
+import asyncio
+import sqlite3
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from ..log import logger_wrapper
+
+logger = logger_wrapper("sqlite")
+
+Params = Sequence[Any]
+
+
+class SQLitePool:
+    """Async gateway to a read-only SQLite database.
+
+    Queries run on a pool of `size` worker threads, each holding its own
+    read-only connection, so slow queries (e.g. FTS5 matches) never block
+    the event loop and independent queries proceed in parallel. Every
+    connection keeps up to `statement_cache` prepared statements, so use
+    constant SQL strings with placeholders wherever possible.
+
+    For files that never change once written (e.g. snapshots), pass
+    `immutable=True` to skip file locking, and `mmap_size` to read pages
+    straight from a memory map instead of copying them into the page cache.
+
+    Example:
+    ```
+    pool = SQLitePool(Path("idiom.db"), size=4)
+    row = await pool.fetchone("SELECT 1 FROM idiom WHERE word = ?", (word,))
+    ```
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        size: int = 4,
+        statement_cache: int = 256,
+        mmap_size: int = 0,
+        immutable: bool = False,
+    ) -> None:
+        self.path = path
+        self.size = size
+        self.statement_cache = statement_cache
+        self.mmap_size = mmap_size
+        self.immutable = immutable
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        uri = f"file:{self.path}?mode=ro"
+        if self.immutable:
+            uri += "&immutable=1"
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            cached_statements=self.statement_cache,
+            check_same_thread=False,  # closed from another thread on shutdown
+        )
+        conn.execute("PRAGMA query_only=ON")
+        if self.mmap_size:
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.size, thread_name_prefix=f"sqlite-{self.path.stem}"
+            )
+        return self._executor
+
+    async def run[T](self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run `fn` with a worker's connection and return its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(), lambda: fn(self._conn()))
+
+    async def fetchone(self, sql: str, params: Params = ()) -> tuple | None:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def fetchall(self, sql: str, params: Params = ()) -> list[tuple]:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+    def close(self) -> None:
+        """Stop the workers and close every connection."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
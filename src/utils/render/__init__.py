@@ -45,6 +45,7 @@ __all__ = [
     "RenderImage",
     "RenderObject",
     "RenderText",
+    "RowReader",
     "Space",
     "Spacer",
     "Stack",
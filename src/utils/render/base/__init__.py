@@ -11,6 +11,7 @@ from .decorations import (
 from .image import ImageMask, RenderImage
 from .object import BaseStyle, RenderObject
 from .properties import Alignment, Border, BoundingBox, Direction, Interpolation, Space
+from .rows import RowReader
 from .text import RenderText
 from .textfont import TextFont
 from .textstyle import *
@@ -40,6 +41,7 @@ __all__ = [
     "RenderImage",
     "RenderObject",
     "RenderText",
+    "RowReader",
     "Space",
     "TextDecoration",
     "TextFont",
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import inspect
 from collections import UserDict, UserList
-from collections.abc import Callable, Iterable
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from types import TracebackType
 from typing import Any, Literal, Self, TypeVar
 
@@ -11,6 +13,10 @@ K = TypeVar("K")
 V = TypeVar("V")
 TC = TypeVar("TC", bound="Cacheable")
 
+_filled: ContextVar[list[tuple[Cacheable, str]] | None] = ContextVar(
+    "_filled", default=None
+)
+
 
 class Cacheable:
     """Supports caching return value of properties and methods.
@@ -179,11 +185,27 @@ def cached[TC: "Cacheable", T](func: Callable[[TC], T]) -> Callable[[TC], T]:
             raise TypeError(f"@cached must be used on a Cacheable object: {type(self)}")
         if key in self._cache_:
             return self._cache_[key]
+        if (filled := _filled.get()) is not None:
+            filled.append((self, key))
         return self._cache_.setdefault(key, func(self))
 
     return wrapper
 
 
+@contextmanager
+def track_cache() -> Iterator[list[tuple[Cacheable, str]]]:
+    """Collect `(object, name)` of the @cached values computed in the block.
+
+    Useful to drop the caches filled by a one-off computation afterwards.
+    """
+    filled: list[tuple[Cacheable, str]] = []
+    token = _filled.set(filled)
+    try:
+        yield filled
+    finally:
+        _filled.reset(token)
+
+
 class volatile:
     """A context manager that used in Cacheable.__init__ method
     to create volatile properties.
@@ -59,7 +59,14 @@ class InplaceDecoration(Decoration):
 
 
 class LayerDecoration(Decoration):
-    """Decorations that render a layer to be overlaid on the render result."""
+    """Decorations that render a layer to be overlaid on the render result.
+
+    Attributes:
+        row_local: whether the layer depends only on the decorated object's
+            geometry, so that `render_layer_rows` can render parts of it.
+    """
+
+    row_local: bool = False
 
     def __init__(self, overlay: Overlay) -> None:
         super().__init__()
@@ -78,6 +85,15 @@ class LayerDecoration(Decoration):
         """
         raise NotImplementedError()
 
+    def render_layer_rows(
+        self, obj: RenderObject, top: int, bottom: int
+    ) -> RenderImage:
+        """Render rows [top, bottom) of the decoration layer.
+
+        Only supported by `row_local` decorations.
+        """
+        raise NotImplementedError()
+
 
 class Decorations:
     """Collection of decorations."""
@@ -137,20 +153,58 @@ class Decorations:
             cropped = RenderImage.from_raw(im.base_im[y : y + h, x : x + w])
             im = im.replace(x, y, deco.apply(cropped))
         elif isinstance(deco, LayerDecoration):
-            if deco.overlay == Overlay.ABOVE_COMPOSITE:
-                im = im.paste(0, 0, deco.render_layer(im, obj))
-            elif deco.overlay == Overlay.BELOW_COMPOSITE:
-                im = deco.render_layer(im, obj).paste(0, 0, im)
-            elif deco.overlay == Overlay.ABOVE_OVERLAY:
-                im = im.replace(0, 0, deco.render_layer(im, obj))
-            elif deco.overlay == Overlay.BELOW_OVERLAY:
-                im = deco.render_layer(im, obj).replace(0, 0, im)
-            else:
-                raise ValueError(f"Invalid overlay: {deco.overlay!r}")
+            im = cls.overlay(im, deco.render_layer(im, obj), deco.overlay)
         else:
             raise ValueError(f"Invalid decoration: {type(deco)!r}")
         return im
 
+    @classmethod
+    def overlay(
+        cls,
+        im: RenderImage,
+        layer: RenderImage,
+        overlay: Overlay,
+    ) -> RenderImage:
+        if overlay == Overlay.ABOVE_COMPOSITE:
+            return im.paste(0, 0, layer)
+        if overlay == Overlay.BELOW_COMPOSITE:
+            return layer.paste(0, 0, im)
+        if overlay == Overlay.ABOVE_OVERLAY:
+            return im.replace(0, 0, layer)
+        if overlay == Overlay.BELOW_OVERLAY:
+            return layer.replace(0, 0, im)
+        raise ValueError(f"Invalid overlay: {overlay!r}")
+
+    def row_local(self) -> bool:
+        """Whether the decorated result can be rendered band by band.
+
+        True if there are only final decorations, all of them row-local
+        layers (see `LayerDecoration.row_local`).
+        """
+        for stage, decorations in self._decorations.items():
+            if stage != DecoStage.FINAL and decorations:
+                return False
+        return all(
+            isinstance(deco, LayerDecoration) and deco.row_local
+            for deco in self._decorations[DecoStage.FINAL]
+        )
+
+    def apply_final_rows(
+        self,
+        im: RenderImage,
+        obj: RenderObject,
+        top: int,
+    ) -> RenderImage:
+        """Apply final decorations to rows [top, top + im.height) of `obj`.
+
+        Requires `row_local()`.
+        """
+        for deco in self._decorations[DecoStage.FINAL]:
+            assert isinstance(deco, LayerDecoration)
+            layer = deco.render_layer_rows(obj, top, top + im.height)
+            im = self.overlay(im, layer, deco.overlay)
+        return im
+
     def apply_stage(
         self, im: RenderImage, obj: RenderObject, stage: DecoStage
     ) -> RenderImage:
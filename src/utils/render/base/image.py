@@ -17,6 +17,19 @@ from .properties import Alignment, Border, Direction, Interpolation
 
 _P = ParamSpec("_P")
 
+# `_MASK_TABLE[alpha << 8 | mask]` is `alpha` scaled by `mask / 255`
+_MASK_TABLE = np.array(
+    [[a if m == 255 else int(a * (m / 255.0)) for m in range(256)] for a in range(256)],
+    dtype=np.uint8,
+).ravel()
+
+# channels -> (conversion for RGB(A) input, conversion for BGR(A) input)
+_RAW_CONVERSIONS: dict[int, tuple[int | None, int]] = {
+    1: (cv2.COLOR_GRAY2RGBA, cv2.COLOR_GRAY2RGBA),
+    3: (cv2.COLOR_RGB2RGBA, cv2.COLOR_BGR2RGBA),
+    4: (None, cv2.COLOR_BGRA2RGBA),
+}
+
 
 def check_writable[**P](
     func: Callable[Concatenate[RenderImage, _P], RenderImage],
@@ -81,16 +94,12 @@ class RenderImage:
         if im.ndim > 3 or im.ndim < 2:
             raise ValueError(f"Invalid image shape: {im.shape}")
         channels = im.shape[2] if im.ndim == 3 else 1
-        if channels == 1:
-            im = cv2.cvtColor(im, cv2.COLOR_GRAY2BGRA)
-        elif channels == 3:
-            im = cv2.cvtColor(im, cv2.COLOR_BGR2BGRA)
-        elif channels == 4:
-            pass
-        else:
+        if channels not in _RAW_CONVERSIONS:
             raise ValueError(f"Invalid color mode: {channels}")
-        if bgr:
-            im = cv2.cvtColor(im, cv2.COLOR_BGRA2RGBA)
+        # a single conversion (or none) straight to RGBA
+        code = _RAW_CONVERSIONS[channels][bgr]
+        if code is not None:
+            im = cv2.cvtColor(im, code)
         return cls(im)
 
     @classmethod
@@ -256,51 +265,51 @@ class RenderImage:
         end: Color = Palette.BLACK,
         spill_compensation: bool = False,
     ) -> Self:
-        self_r = np.array(self.base_im[:, :, 0]).astype(np.int16)
-        self_g = np.array(self.base_im[:, :, 1]).astype(np.int16)
-        self_b = np.array(self.base_im[:, :, 2]).astype(np.int16)
-        self_a = np.array(self.base_im[:, :, 3]).astype(np.int16)
-        diff = (end.r - start.r, end.g - start.g, end.b - start.b)
-
-        transparency_r = (
-            np.zeros((self.height, self.width), dtype=np.int16)
-            if diff[0] == 0
-            else np.array((self_r - start.r) / diff[0]).astype(np.int16)
-        )
-        transparency_g = (
-            np.zeros((self.height, self.width), dtype=np.int16)
-            if diff[1] == 0
-            else np.array((self_g - start.g) / diff[1]).astype(np.int16)
-        )
-        transparency_b = (
-            np.zeros((self.height, self.width), dtype=np.int16)
-            if diff[2] == 0
-            else np.array((self_b - start.b) / diff[2]).astype(np.int16)
-        )
-        if not spill_compensation:
-            transparency_r = np.clip(np.array(transparency_r).astype(np.int16), 0, 1)
-            transparency_g = np.clip(np.array(transparency_g).astype(np.int16), 0, 1)
-            transparency_b = np.clip(np.array(transparency_b).astype(np.int16), 0, 1)
+        """Fade pixels between `start` and `end` to transparent.
 
+        A channel counts `(value - start) / (end - start)` steps towards
+        `end`, truncated, and clipped to [0, 1] unless `spill_compensation`
+        is set. Pixels whose steps over the channels that differ between
+        the colors average at least 1 lose their alpha; fully transparent
+        pixels are then cleared to black.
+        """
+        diff = (end.r - start.r, end.g - start.g, end.b - start.b)
         if diff == (0, 0, 0):
             raise ValueError(f"Invalid colors: {start}, {end}")
-        transparency = (transparency_r + transparency_g + transparency_b) / (
-            (0 if diff[0] == 0 else 1)
-            + (0 if diff[1] == 0 else 1)
-            + (0 if diff[2] == 0 else 1)
-        )
-        transparency = np.clip(np.array(transparency).astype(np.int16), 0, 1)
-
-        new_a = np.array(self_a - self_a * transparency).astype(np.uint8)
-        mask = new_a == 0
-        new_rgb = self.base_im[:, :, :3]
-        new_rgb[mask] = (0, 0, 0)
-        new_rgb = cast[npt.NDArray[np.uint8]](new_rgb)
-        self.base_im[:, :, :3] = np.around(new_rgb)
-        self.base_im[:, :, 3] = np.around(new_a)
-
+        if spill_compensation:
+            transparent = self._spill_transparent(start, diff)
+        else:
+            # every varying channel has to have reached `end`
+            lower = [0, 0, 0, 0]
+            upper = [255, 255, 255, 255]
+            for c, (d, e) in enumerate(zip(diff, end[:3], strict=True)):
+                if d > 0:
+                    lower[c] = e
+                elif d < 0:
+                    upper[c] = e
+            transparent = cv2.inRange(self.base_im, np.array(lower), np.array(upper))
+
+        alpha = self.base_im[:, :, 3]
+        np.bitwise_and(alpha, np.bitwise_not(transparent), out=alpha)
+        self.base_im[alpha == 0] = 0
         return self
 
+    def _spill_transparent(
+        self, start: Color, diff: tuple[int, int, int]
+    ) -> npt.NDArray[np.uint8]:
+        """`set_transparency` mask with unclipped steps, via per-channel LUTs."""
+        values = np.arange(256)
+        steps = np.zeros(self.base_im.shape[:2], dtype=np.int16)
+        buffer = np.empty_like(steps)
+        for c, (d, s) in enumerate(zip(diff, start[:3], strict=True)):
+            if d == 0:
+                continue
+            lut = ((values - s) / d).astype(np.int16)
+            np.take(lut, cast[ImageMask](self.base_im[:, :, c]), out=buffer)
+            steps += buffer
+        varying = sum(d != 0 for d in diff)
+        return np.where(steps >= varying, np.uint8(255), np.uint8(0))
+
     @check_writable
     def draw_border(
         self,
@@ -473,9 +482,6 @@ class RenderImage:
         Raises:
             ValueError: if mask size is not same as image size.
         """
-        if mask.dtype == np.bool_:
-            mask_ = mask.astype(np.uint8) * 255
-            mask = cast[ImageMask](mask_)
         h, w = mask.shape
         if h != self.height or w != self.width:
             raise ValueError(
@@ -483,9 +489,15 @@ class RenderImage:
                 f"expected ({self.height}, {self.width}), "
                 f"got ({h}, {w})"
             )
-        indices = mask != 255
-        coef = mask[indices] / 255.0
-        self.base_im[indices, 3] = self.base_im[indices, 3] * coef
+        alpha = self.base_im[:, :, 3]
+        if mask.dtype == np.bool_:
+            alpha[~mask] = 0
+            return self
+        # one uint16 index per pixel into the table of products
+        index = alpha.astype(np.uint16)
+        index <<= 8
+        index |= mask
+        np.take(_MASK_TABLE, index, out=alpha, mode="clip")
         return self
 
     @check_writable
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 
 from typing_extensions import TypedDict
 
@@ -10,6 +10,7 @@ from .color import Color, Palette
 from .decorations import Decoration, Decorations
 from .image import RenderImage
 from .properties import Border, BoundingBox, Space
+from .rows import ComposedRows, RenderedRows, RowReader
 
 
 class BaseStyle(TypedDict, total=False):
@@ -57,6 +58,9 @@ class RenderObject(ABC, Cacheable):
         render_content(): RenderImage - render the object
 
     Content width and height must be determined before rendering.
+
+    Objects that can produce their content in horizontal bands override
+    `content_rows`, which lets `render_strips` render them strip by strip.
     """
 
     def __init__(
@@ -194,3 +198,38 @@ class RenderObject(ABC, Cacheable):
         )
         canvas = self.decorations.apply_final(canvas, self)
         return canvas
+
+    def content_rows(self) -> RowReader | None:
+        """Reader of `render_content()` rows, or None if not supported.
+
+        Override this when the content can be produced band by band without
+        rendering it as a whole.
+        """
+        return None
+
+    def rows(self) -> RowReader:
+        """Reader of `render()` rows.
+
+        The rows are composed band by band when the content supports it and
+        the decorations are row-local, otherwise they are sliced from a full
+        render.
+        """
+        if self.decorations.row_local():
+            content = self.content_rows()
+            if content is not None:
+                return ComposedRows(self, content)
+        return RenderedRows(self)
+
+    def render_strips(self, strip_height: int) -> Iterator[RenderImage]:
+        """Render an object as horizontal strips, from top to bottom.
+
+        Stacking the strips gives the same image as `render()`, but objects
+        supporting `content_rows` (e.g. containers) never hold the
+        whole image in memory. Strips must not be modified.
+        """
+        reader = self.rows()
+        try:
+            for top in range(0, self.height, strip_height):
+                yield reader.read(top, min(top + strip_height, self.height))
+        finally:
+            reader.close()
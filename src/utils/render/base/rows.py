@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+from .cacheable import Cacheable, track_cache
+from .image import RenderImage
+
+if TYPE_CHECKING:
+    from .object import RenderObject
+
+
+class RowReader(ABC):
+    """Reads horizontal bands of a render result from top to bottom.
+
+    `read` must be called with non-decreasing `top`, so that readers may
+    release whatever lies above it. Bands may overlap. Returned images may
+    share memory with the reader and must not be modified.
+    """
+
+    @abstractmethod
+    def read(self, top: int, bottom: int) -> RenderImage:
+        """Rows [top, bottom) of the render result."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release the resources held by the reader."""
+        raise NotImplementedError()
+
+
+class RenderedRows(RowReader):
+    """Rows of `obj.render()`, rendered as a whole on the first read.
+
+    Closing the reader also drops the caches filled by that render (the
+    content of `obj` and of its descendants, rendered glyphs, etc.).
+    """
+
+    def __init__(self, obj: RenderObject) -> None:
+        self.obj = obj
+        self._rendered: RenderImage | None = None
+        self._filled: list[tuple[Cacheable, str]] = []
+
+    def read(self, top: int, bottom: int) -> RenderImage:
+        if self._rendered is None:
+            with track_cache() as self._filled:
+                self._rendered = self.obj.render()
+        return RenderImage(self._rendered.base_im[top:bottom])
+
+    def close(self) -> None:
+        self._rendered = None
+        for cacheable, key in self._filled:
+            cacheable._cache_.pop(key, None)
+        self._filled = []
+
+
+class ComposedRows(RowReader):
+    """Rows of `obj.render()`, composed band by band from rows of its content.
+
+    Every band goes through the same steps as `RenderObject.render`, so the
+    rows are identical to the full render. Only objects whose decorations
+    are row-local (see `Decorations.row_local`) can be composed.
+    """
+
+    def __init__(self, obj: RenderObject, content: RowReader) -> None:
+        self.obj = obj
+        self.content = content
+
+    def read(self, top: int, bottom: int) -> RenderImage:
+        obj = self.obj
+        # antialiased borders are clipped differently at the band edges,
+        # so draw them on a band extended past the requested rows
+        extend = obj.border.width * 2 + 2 if obj.border.width else 0
+        start, end = max(0, top - extend), min(obj.height, bottom + extend)
+        height = end - start
+
+        content_box = obj.content_box
+        padding_box = obj.padding_box
+
+        canvas = RenderImage.empty(obj.width, height)
+        content_top = max(start, content_box.y) - content_box.y
+        content_bottom = min(end, content_box.y + content_box.h) - content_box.y
+        if content_top < content_bottom:
+            content = self.content.read(content_top, content_bottom)
+            canvas = canvas.paste(
+                content_box.x, content_box.y + content_top - start, content
+            )
+
+        padding_top = max(start, padding_box.y) - start
+        padding_bottom = min(end, padding_box.y + padding_box.h) - start
+        padding = RenderImage.empty(obj.width, height).fill(
+            padding_box.x,
+            padding_top,
+            padding_box.w,
+            max(0, padding_bottom - padding_top),
+            color=obj.background,
+        )
+        canvas = padding.paste(0, 0, canvas)
+
+        canvas = canvas.draw_border(
+            padding_box.x,
+            padding_box.y - start,
+            padding_box.w - 1,
+            padding_box.h - 1,
+            obj.border,
+        )
+        canvas = RenderImage(canvas.base_im[top - start : bottom - start])
+        return obj.decorations.apply_final_rows(canvas, obj, top)
+
+    def close(self) -> None:
+        self.content.close()
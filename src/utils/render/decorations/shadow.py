@@ -28,6 +28,8 @@ class Shadow(LayerDecoration):
 class BoxShadow(Shadow):
     """Add shadow depending on the box model.
 
+    The shadow only depends on the box, so it can be rendered in bands.
+
     Attributes:
         offset: Offset from the object box.
         blur_radius: Radius of gaussian blur.
@@ -35,6 +37,8 @@ class BoxShadow(Shadow):
         color: Color of shadow.
     """
 
+    row_local = True
+
     def __init__(
         self,
         offset: tuple[int, int],
@@ -66,20 +70,44 @@ class BoxShadow(Shadow):
         im: RenderImage,
         obj: RenderObject,
     ) -> RenderImage:
-        layer = RenderImage.empty_like(im)
+        return self._render_window(obj, im.width, 0, im.height)
+
+    @override
+    def render_layer_rows(
+        self, obj: RenderObject, top: int, bottom: int
+    ) -> RenderImage:
+        # rows within half the kernel size of the window edges are blurred
+        # with reflected rows, so extend the window to cover them
+        radius = self.blur_radius // 2
+        start, end = max(0, top - radius), min(obj.height, bottom + radius)
+        layer = self._render_window(obj, obj.width, start, end)
+        return RenderImage(layer.base_im[top - start : bottom - start])
+
+    def _render_window(
+        self,
+        obj: RenderObject,
+        width: int,
+        start: int,
+        end: int,
+    ) -> RenderImage:
+        """Render rows [start, end) of the layer, blurring only those rows."""
+        layer = RenderImage.empty(width, end - start)
         spread = self.spread
         # calculate the size of the shadow
-        width = (
+        shadow_width = (
             obj.content_width + obj.padding.width + obj.border.width * 2 + spread * 2
         )
-        height = (
+        shadow_height = (
             obj.content_height + obj.padding.height + obj.border.width * 2 + spread * 2
         )
         # calculate the offset of the shadow
         x = self.offset[0] - spread + obj.margin.left
         y = self.offset[1] - spread + obj.margin.top
-        # create the shadow
-        layer = layer.replace(x, y, RenderImage.empty(width, height, self.color))
+        # create the shadow, only the rows inside the window
+        top, bottom = max(y, start), min(y + shadow_height, end)
+        if top < bottom:
+            shadow = RenderImage.empty(shadow_width, bottom - top, self.color)
+            layer = layer.replace(x, top - start, shadow)
         if self.blur_radius > 0:
             layer.base_im = cv2.GaussianBlur(
                 layer.base_im,
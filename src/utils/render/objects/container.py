@@ -10,6 +10,7 @@ from ..base import (
     Direction,
     RenderImage,
     RenderObject,
+    RowReader,
     cached,
     volatile,
 )
@@ -81,16 +82,8 @@ class Container(RenderObject):
             spacing = 0
         return sum(child.height for child in self.children) + spacing
 
-    @cached
-    @override
-    def render_content(self) -> RenderImage:
-        if not self.children:
-            return RenderImage.empty(0, 0)
-        # rendered = map(lambda child: child.render(), self.children)
-        # concat = RenderImage.concat(rendered,
-        #                             self.direction,
-        #                             self.alignment,
-        #                             spacing=self.spacing)
+    def _arranged(self) -> list[RenderObject]:
+        """Children with spacers inserted between them."""
         # manually add spacing to skip ZeroSpacingSpacer
         if self.direction == Direction.HORIZONTAL:
             spacer = Spacer.of(width=self.spacing)
@@ -105,10 +98,100 @@ class Container(RenderObject):
                 continue
             children.append(spacer)
             children.append(child)
-        rendered = list(map(lambda child: child.render(), children))
+        return children
+
+    @cached
+    @override
+    def render_content(self) -> RenderImage:
+        if not self.children:
+            return RenderImage.empty(0, 0)
+        # rendered = map(lambda child: child.render(), self.children)
+        # concat = RenderImage.concat(rendered,
+        #                             self.direction,
+        #                             self.alignment,
+        #                             spacing=self.spacing)
+        rendered = list(map(lambda child: child.render(), self._arranged()))
         concat = RenderImage.concat(rendered, self.direction, self.alignment)
         return concat
 
+    @override
+    def content_rows(self) -> RowReader | None:
+        if not self.children:
+            return None
+        width, height = self.content_width, self.content_height
+        placements = []
+        offset = 0
+        # same placement as `RenderImage.concat`
+        for child in self._arranged():
+            if self.direction == Direction.HORIZONTAL:
+                space, main = height - child.height, offset
+            else:
+                space, main = width - child.width, offset
+            if self.alignment == Alignment.CENTER:
+                cross = space // 2
+            elif self.alignment == Alignment.END:
+                cross = space
+            else:
+                cross = 0
+            if self.direction == Direction.HORIZONTAL:
+                placements.append((main, cross, child))
+                offset += child.width
+            else:
+                placements.append((cross, main, child))
+                offset += child.height
+        return _PlacedRows(width, placements)
+
+
+class _PlacedRows(RowReader):
+    """Rows of non-overlapping children placed on a transparent canvas.
+
+    Each band only reads the rows of the children it crosses. A child's
+    reader is opened when the first band reaches it and closed once bands
+    have moved past it, so tall documents are never held as a whole.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        placements: list[tuple[int, int, RenderObject]],
+    ) -> None:
+        self.width = width
+        # ordered by top, so that reading can stop at the first child below
+        self.placements = sorted(placements, key=lambda placement: placement[1])
+        self.readers: dict[int, RowReader] = {}
+        self.passed = 0
+
+    @override
+    def read(self, top: int, bottom: int) -> RenderImage:
+        band = RenderImage.empty(self.width, bottom - top)
+        for i in range(self.passed, len(self.placements)):
+            x, y, child = self.placements[i]
+            if y >= bottom:
+                break
+            if y + child.height <= top:
+                # bands never go up, the child will not be read again
+                if (reader := self.readers.pop(i, None)) is not None:
+                    reader.close()
+                if i == self.passed:
+                    self.passed += 1
+                continue
+            if child.height == 0:
+                continue
+            if (reader := self.readers.get(i)) is None:
+                reader = self.readers[i] = child.rows()
+            child_top = max(top, y) - y
+            child_bottom = min(bottom, y + child.height) - y
+            band = band.paste(
+                x, y + child_top - top, reader.read(child_top, child_bottom)
+            )
+        return band
+
+    @override
+    def close(self) -> None:
+        for reader in self.readers.values():
+            reader.close()
+        self.readers.clear()
+
 
 class JustifyContent(Enum):
     """How to justify children in a container."""
@@ -220,6 +303,11 @@ class FixedContainer(Container):
 
         return space, offset
 
+    @override
+    def content_rows(self) -> RowReader | None:
+        # justified children are not stacked like in `Container`
+        return None
+
     @cached
     @override
     def render_content(self) -> RenderImage:
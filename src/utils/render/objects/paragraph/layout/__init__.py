@@ -1,14 +1,19 @@
-from .baseline import concat_elements_by_baseline
+from .baseline import concat_elements_by_baseline, place_elements_by_baseline
 from .element import Element, Split
 from .image_element import ImageElement
 from .line_break import LineBreaker
+from .measure import ParagraphLayout, Placement, measure_lines
 from .text_element import TextElement
 
 __all__ = [
     "Element",
     "ImageElement",
     "LineBreaker",
+    "ParagraphLayout",
+    "Placement",
     "Split",
     "TextElement",
     "concat_elements_by_baseline",
+    "measure_lines",
+    "place_elements_by_baseline",
 ]
@@ -10,23 +10,25 @@ class SupportsBaseline(Protocol):
     def baseline(self) -> int: ...
 
 
-def concat_elements_by_baseline(
+def place_elements_by_baseline(
     elements: list[Element],
     mode: Literal["bottom_as_baseline", "align_bottom"] = "align_bottom",
-) -> RenderImage:
+) -> tuple[list[int], int, int]:
     """
-    Concatenates a list of elements by their baselines.
+    Lays out a list of elements by their baselines, from metrics only.
 
     Args:
         elements (list[Element]):
-            The elements to be concatenated.
+            The elements to be placed side by side.
         mode (Literal["bottom_as_baseline", "align_bottom"]):
             How to align non-baseline elements.
             - "bottom_as_baseline": consider the bottom as baseline.
             - "align_bottom": bottom align with elements having baseline.
 
     Returns:
-        RenderImage: The image of the concatenated elements.
+        tuple[list[int], int, int]:
+            The vertical offset of each element, and the width and height
+            of the line.
     """
     max_below = 0
     if mode == "align_bottom":
@@ -40,18 +42,28 @@ def concat_elements_by_baseline(
     ]
     max_baseline = max(baselines)
 
-    # (vertical start, total height)
-    placements = [
-        (max_baseline - b, e.height)
-        for (b, e) in zip(baselines, elements, strict=False)
-    ]
-
-    total_height = max(y + h for y, h in placements)
+    offsets = [max_baseline - b for b in baselines]
+    total_height = max(y + e.height for y, e in zip(offsets, elements, strict=False))
     total_width = sum(e.width for e in elements)
+    return offsets, total_width, total_height
+
+
+def concat_elements_by_baseline(
+    elements: list[Element],
+    mode: Literal["bottom_as_baseline", "align_bottom"] = "align_bottom",
+) -> RenderImage:
+    """
+    Concatenates a list of elements by their baselines.
 
+    See `place_elements_by_baseline` for the arguments.
+
+    Returns:
+        RenderImage: The image of the concatenated elements.
+    """
+    offsets, total_width, total_height = place_elements_by_baseline(elements, mode)
     canvas = RenderImage.empty(total_width, total_height)
     x_offset = 0
-    for (y, _), e in zip(placements, elements, strict=False):
+    for y, e in zip(offsets, elements, strict=False):
         canvas.replace(x_offset, y, e.render())
         x_offset += e.width
     return canvas
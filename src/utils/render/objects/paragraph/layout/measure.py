@@ -0,0 +1,75 @@
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from ....base import Alignment
+from .baseline import place_elements_by_baseline
+from .element import Element
+
+
+class Placement(NamedTuple):
+    x: int
+    y: int
+    element: Element
+
+
+class ParagraphLayout(NamedTuple):
+    """Size of a paragraph and the position of every element in it."""
+
+    width: int
+    height: int
+    placements: list[Placement]
+
+
+def measure_lines(
+    lines: Iterable[list[Element]],
+    alignment: Alignment,
+    line_spacing: int | float,
+) -> ParagraphLayout:
+    """
+    Stacks broken lines vertically, using element metrics only.
+
+    Args:
+        lines (Iterable[list[Element]]):
+            Lines produced by `LineBreaker.break_lines`. Empty lines are skipped.
+        alignment (Alignment):
+            Horizontal alignment of each line within the widest line.
+        line_spacing (int | float):
+            Spacing in pixels if int, or relative to the line height if float.
+
+    Returns:
+        ParagraphLayout: Nothing is rendered; elements are painted later at
+            their placements.
+    """
+    rows: list[tuple[list[Element], list[int], int, int]] = []
+    spacings: list[int] = []
+    for line in lines:
+        if not line:
+            continue
+        offsets, width, height = place_elements_by_baseline(line)
+        rows.append((line, offsets, width, height))
+        if isinstance(line_spacing, int):
+            spacings.append(line_spacing)
+        else:
+            spacings.append(round(height * line_spacing))
+    if not rows:
+        return ParagraphLayout(0, 0, [])
+    spacings.pop()  # no spacing after the last line
+
+    total_width = max(width for _, _, width, _ in rows)
+    total_height = sum(height for *_, height in rows) + sum(spacings)
+    placements: list[Placement] = []
+    y = 0
+    for (line, offsets, width, height), spacing in zip(
+        rows, [*spacings, 0], strict=True
+    ):
+        if alignment == Alignment.CENTER:
+            x = (total_width - width) // 2
+        elif alignment == Alignment.END:
+            x = total_width - width
+        else:
+            x = 0
+        for element, offset in zip(line, offsets, strict=True):
+            placements.append(Placement(x, y + offset, element))
+            x += element.width
+        y += height + spacing
+    return ParagraphLayout(total_width, total_height, placements)
@@ -0,0 +1,173 @@
+import re
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from string import Formatter
+from typing import Any, ClassVar, Self
+
+from ....base import MinimalTextStyle, RenderImage, RenderObject, TextStyle
+from ..layout import Element, ImageElement, TextElement
+from .generator import OverridableStyle
+from .parser import MarkupElement, MarkupImage, MarkupNode, MarkupParser, MarkupText
+
+# slots are marked with characters from the supplementary private use area,
+# which cannot form tags and never survive escaping
+_SLOT_BASE = 0xF0000
+_SLOT_PATTERN = re.compile("([\U000f0000-\U000ffffd])")
+
+
+@dataclass(frozen=True, slots=True)
+class Slot:
+    field_name: str
+    conversion: str | None
+    format_spec: str
+
+
+@dataclass(frozen=True, slots=True)
+class TextRun:
+    # literal markup, or the index of a slot
+    parts: tuple[str | int, ...]
+    style: MinimalTextStyle
+
+
+@dataclass(frozen=True, slots=True)
+class ImageRun:
+    name: str
+    inline: bool
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+class CompiledTemplate:
+    """A paragraph template parsed and style-resolved once.
+
+    Compiling formats the template with a placeholder character for every
+    field, parses the result as markup and resolves the style of each text
+    run. Rendering only formats the values, substitutes them into the runs
+    and creates the layout elements, with the same result as formatting
+    and parsing the whole template again.
+
+    Templates whose markup depends on the values cannot be compiled: fields
+    with a list format spec (`{items:[, ]...}`), nested format specs and
+    fields inside a tag. `get` returns None for them.
+
+    Compiled templates are cached by template string and style set.
+    """
+
+    CACHE_SIZE: ClassVar[int] = 256
+
+    _cache: ClassVar[OrderedDict[Any, "CompiledTemplate | None"]] = OrderedDict()
+
+    def __init__(self, slots: list[Slot], runs: list[TextRun | ImageRun]) -> None:
+        self.slots = slots
+        self.runs = runs
+
+    @classmethod
+    def get(
+        cls, template: str, default: TextStyle, styles: dict[str, TextStyle]
+    ) -> Self | None:
+        key = (template, _freeze(default), _freeze(styles))
+        try:
+            hash(key)
+        except TypeError:  # unhashable style values
+            return cls.compile(template, default, styles)
+        if key in cls._cache:
+            cls._cache.move_to_end(key)
+            return cls._cache[key]  # type: ignore[return-value]
+        compiled = cls.compile(template, default, styles)
+        cls._cache[key] = compiled
+        while len(cls._cache) > cls.CACHE_SIZE:
+            cls._cache.popitem(last=False)
+        return compiled
+
+    @classmethod
+    def compile(
+        cls, template: str, default: TextStyle, styles: dict[str, TextStyle]
+    ) -> Self | None:
+        if _SLOT_PATTERN.search(template):
+            return None
+        slots: list[Slot] = []
+        markup: list[str] = []
+        for literal, field_name, format_spec, conversion in Formatter().parse(template):
+            markup.append(literal)
+            if field_name is None:
+                continue
+            if not field_name or field_name[0].isdigit():
+                return None  # positional fields
+            format_spec = format_spec or ""
+            if "{" in format_spec or format_spec.startswith("["):
+                return None  # nested or list format spec
+            so_far = "".join(markup)
+            if so_far.rfind("<") > so_far.rfind(">"):
+                return None  # inside a tag
+            markup.append(chr(_SLOT_BASE + len(slots)))
+            slots.append(Slot(field_name, conversion, format_spec))
+
+        nodes = MarkupParser("".join(markup)).parse()
+        runs: list[TextRun | ImageRun] = []
+        try:
+            for node in nodes:
+                cls._compile(node, OverridableStyle(default), styles, runs)
+        except (KeyError, TypeError, ValueError):
+            # let the uncompiled path raise, or not, as it would
+            return None
+        return cls(slots, runs)
+
+    @classmethod
+    def _compile(
+        cls,
+        node: MarkupNode,
+        style_stack: OverridableStyle,
+        styles: dict[str, TextStyle],
+        runs: list[TextRun | ImageRun],
+    ) -> None:
+        match node:
+            case MarkupText(content):
+                parts = tuple(
+                    ord(part) - _SLOT_BASE if i % 2 else part
+                    for i, part in enumerate(_SLOT_PATTERN.split(content))
+                    if part
+                )
+                runs.append(TextRun(parts, style_stack.style))
+            case MarkupImage(name, inline):
+                runs.append(ImageRun(name, inline))
+            case MarkupElement(tag, children):
+                override_style = styles.get(tag, None)
+                if override_style is None:
+                    raise ValueError(f"Unknown style name: {tag}")
+                with style_stack.override(override_style):
+                    for child in children:
+                        cls._compile(child, style_stack, styles, runs)
+
+    def layout(
+        self,
+        values: dict[str, Any],
+        images: dict[str, RenderObject | RenderImage],
+        formatter: Formatter,
+        unescape: Callable[[str], str],
+    ) -> Iterable[Element]:
+        formatted = []
+        for slot in self.slots:
+            value, _ = formatter.get_field(slot.field_name, (), values)
+            value = formatter.convert_field(value, slot.conversion)
+            formatted.append(formatter.format_field(value, slot.format_spec))
+
+        for run in self.runs:
+            if isinstance(run, ImageRun):
+                image = images.get(run.name, None)
+                if image is None:
+                    raise ValueError(f"Unknown image name: {run.name}")
+                if isinstance(image, RenderObject):
+                    image = image.render()
+                yield ImageElement(image, run.inline)
+                continue
+            text = "".join(
+                part if isinstance(part, str) else formatted[part] for part in run.parts
+            )
+            # a text node made only of empty values does not exist
+            if text:
+                yield TextElement.of(text=unescape(text), **run.style)
@@ -1,4 +1,5 @@
 import re
+from bisect import bisect_right
 from collections.abc import Callable, Iterable
 from string import Formatter
 from typing import Any, Self, Unpack, override
@@ -12,9 +13,10 @@ from ...base import (
     cached,
     volatile,
 )
-from .layout import Element, LineBreaker, concat_elements_by_baseline
+from .layout import Element, LineBreaker, ParagraphLayout, measure_lines
 from .markup.generator import LayoutElementGenerator
 from .markup.parser import MarkupParser
+from .markup.template import CompiledTemplate
 
 
 class CustomFormatter(Formatter):
@@ -84,38 +86,34 @@ class Paragraph(RenderObject):
             self.line_spacing = line_spacing
             self.max_width = max_width
 
-    @property
     @cached
+    def layout(self) -> ParagraphLayout:
+        """Break lines and place every element, without rendering."""
+        line_breaker = LineBreaker(self.elements)
+        return measure_lines(
+            line_breaker.break_lines(self.max_width),
+            self.alignment,
+            self.line_spacing,
+        )
+
+    @property
     @override
     def content_width(self) -> int:
-        return self.render_content().width
+        return self.layout().width
 
     @property
-    @cached
     @override
     def content_height(self) -> int:
-        return self.render_content().height
+        return self.layout().height
 
     @cached
     @override
     def render_content(self) -> RenderImage:
-        line_breaker = LineBreaker(self.elements)
-        rendered_lines: list[RenderImage] = []
-        for line in line_breaker.break_lines(self.max_width):
-            if not line:
-                continue
-            line_im = concat_elements_by_baseline(line)
-            rendered_lines.append(line_im)
-            if isinstance(self.line_spacing, int):
-                rendered_lines.append(RenderImage.empty(0, self.line_spacing))
-            else:
-                line_spacing = round(line_im.height * self.line_spacing)
-                rendered_lines.append(RenderImage.empty(0, line_spacing))
-        if rendered_lines:
-            rendered_lines.pop()  # remove last line spacing
-        if not rendered_lines:
-            return RenderImage.empty(0, 0)
-        return RenderImage.concat_vertical(rendered_lines, alignment=self.alignment)
+        layout = self.layout()
+        canvas = RenderImage.empty(layout.width, layout.height)
+        for x, y, element in layout.placements:
+            canvas.replace(x, y, element.render())
+        return canvas
 
     @classmethod
     def of(
@@ -199,17 +197,27 @@ class Paragraph(RenderObject):
         Note:
             This method is safer than `from_markup` since it automatically
             escapes the strings filled in the template.
+
+            Templates are compiled once per template string and style set
+            (see `CompiledTemplate`), so repeated renders of the same
+            template only substitute values and lay out the text.
         """
-        return cls.from_markup(
-            cls.formatter.format(template, **values),
-            max_width=max_width,
-            alignment=alignment,
-            line_spacing=line_spacing,
-            default=default,
-            styles=styles,
-            images=images,
-            **kwargs,
+        compiled = CompiledTemplate.get(template, default or {}, styles or {})
+        if compiled is None:
+            return cls.from_markup(
+                cls.formatter.format(template, **values),
+                max_width=max_width,
+                alignment=alignment,
+                line_spacing=line_spacing,
+                default=default,
+                styles=styles,
+                images=images,
+                **kwargs,
+            )
+        elements = compiled.layout(
+            values, images or {}, cls.formatter, MarkupParser.unescape
         )
+        return cls(elements, max_width, alignment, line_spacing, **kwargs)
 
     @staticmethod
     def find_max_font(
@@ -265,6 +273,62 @@ class Paragraph(RenderObject):
                     style["size"] = target_size
         return styles
 
+    @classmethod
+    def _fit_template(
+        cls,
+        template: str,
+        values: dict[str, Any],
+        *,
+        font_size: tuple[int, int],
+        max_size: tuple[int, int],
+        alignment: Alignment = Alignment.START,
+        line_spacing: int | float = 0.25,
+        default: TextStyle | None = None,
+        styles: dict[str, TextStyle] | None = None,
+        images: dict[str, RenderObject | RenderImage] | None = None,
+        **kwargs: Unpack[BaseStyle],
+    ) -> tuple[int, Self]:
+        """Find the largest font size whose paragraph fits `max_size`.
+
+        Height grows with font size, so sizes are binary searched. Each
+        attempt is only laid out (line breaks from font metrics), never
+        rendered; attempts are kept so the winner is not built twice.
+        """
+        min_size, max_font = font_size
+        max_width, max_height = max_size
+        attempts: dict[int, Self] = {}
+
+        def attempt(size: int) -> Self:
+            if size not in attempts:
+                attempt_default = (default or {}).copy()
+                attempt_styles = {k: v.copy() for k, v in (styles or {}).items()}
+                Paragraph._adjust_absolute_size(
+                    attempt_default, *attempt_styles.values(), target_size=size
+                )
+                attempts[size] = cls.from_template(
+                    template,
+                    values,
+                    max_width=max_width,
+                    alignment=alignment,
+                    line_spacing=line_spacing,
+                    default=attempt_default,
+                    styles=attempt_styles,
+                    images=images,
+                    **kwargs,
+                )
+            return attempts[size]
+
+        # number of sizes (from the smallest) whose height fits
+        fitting = bisect_right(
+            range(min_size, max_font + 1),
+            max_height,
+            key=lambda size: attempt(size).height,
+        )
+        if fitting == 0:
+            raise ValueError(f"Cannot find fitting font size: min_font_size={min_size}")
+        size = min_size + fitting - 1
+        return size, attempt(size)
+
     @staticmethod
     def find_template_max_font(
         template: str,
@@ -279,29 +343,19 @@ class Paragraph(RenderObject):
         images: dict[str, RenderObject | RenderImage] | None = None,
         **kwargs: Unpack[BaseStyle],
     ) -> int:
-        min, current_size = font_size
-        max_width, max_height = max_size
-        while current_size >= min:
-            attempt_default = (default or {}).copy()
-            attempt_styles = {k: v.copy() for k, v in (styles or {}).items()}
-            Paragraph._adjust_absolute_size(
-                attempt_default, *attempt_styles.values(), target_size=current_size
-            )
-            para = Paragraph.from_template(
-                template,
-                values,
-                max_width=max_width,
-                alignment=alignment,
-                line_spacing=line_spacing,
-                default=attempt_default,
-                styles=attempt_styles,
-                images=images,
-                **kwargs,
-            )
-            if para.height <= max_height:
-                return current_size
-            current_size -= 1
-        raise ValueError(f"Cannot find fitting font size: min_font_size={min}")
+        size, _ = Paragraph._fit_template(
+            template,
+            values,
+            font_size=font_size,
+            max_size=max_size,
+            alignment=alignment,
+            line_spacing=line_spacing,
+            default=default,
+            styles=styles,
+            images=images,
+            **kwargs,
+        )
+        return size
 
     @classmethod
     def from_template_with_font_range(
@@ -318,7 +372,7 @@ class Paragraph(RenderObject):
         images: dict[str, RenderObject | RenderImage] | None = None,
         **kwargs: Unpack[BaseStyle],
     ) -> Self:
-        max_font_size = cls.find_template_max_font(
+        _, paragraph = cls._fit_template(
             template,
             values,
             font_size=font_size,
@@ -330,19 +384,4 @@ class Paragraph(RenderObject):
             images=images,
             **kwargs,
         )
-        overwrite_default = (default or {}).copy()
-        overwrite_styles = {k: v.copy() for k, v in (styles or {}).items()}
-        Paragraph._adjust_absolute_size(
-            overwrite_default, *overwrite_styles.values(), target_size=max_font_size
-        )
-        return cls.from_template(
-            template,
-            values,
-            max_width=max_size[0],
-            alignment=alignment,
-            line_spacing=line_spacing,
-            default=overwrite_default,
-            styles=overwrite_styles,
-            images=images,
-            **kwargs,
-        )
+        return paragraph
@@ -9,6 +9,7 @@ from ...base import (
     Direction,
     RenderImage,
     RenderObject,
+    RowReader,
     cached,
     volatile,
 )
@@ -44,16 +45,14 @@ class WaterfallContainer(Container):
         return cls(alignment, columns, children, spacing, ordered, **kwargs)
 
     @property
-    @cached
     @override
     def content_width(self) -> int:
-        return self.render_content().width
+        return self.layout()[0]
 
     @property
-    @cached
     @override
     def content_height(self) -> int:
-        return self.render_content().height
+        return self.layout()[1]
 
     def _split_columns_ordered(self) -> list[list[RenderObject]]:
         if not self.children:
@@ -90,9 +89,14 @@ class WaterfallContainer(Container):
         return columns
 
     @cached
-    def render_content(self) -> RenderImage:
+    def layout(self) -> tuple[int, int, list[tuple[int, int, RenderObject]]]:
+        """Return the content size and the position of every child.
+
+        Columns are stretched to the same height by spreading the spare
+        height between their children. Only child sizes are used.
+        """
         if not self.children:
-            return RenderImage.empty(0, 0)
+            return 0, 0, []
 
         if self.ordered:
             columns = self._split_columns_ordered()
@@ -102,22 +106,42 @@ class WaterfallContainer(Container):
         index, max_height = max(enumerate(heights), key=lambda x: x[1])
         max_height += (len(columns[index]) - 1) * self.spacing
 
-        rendered = []
-        for column, height in zip(columns, heights, strict=False):
+        placements: list[tuple[int, int, RenderObject]] = []
+        width = height = 0
+        x = 0
+        for column, column_height in zip(columns, heights, strict=False):
             if not column:
                 continue
             if len(column) > 1:
-                spacing = (max_height - height) // (len(column) - 1)
+                spacing = (max_height - column_height) // (len(column) - 1)
             else:
                 spacing = 0
-            rendered.append(
-                RenderImage.concat_vertical(
-                    [child.render() for child in column],
-                    alignment=self.alignment,
-                    spacing=spacing,
-                )
-            )
+            column_width = max(child.width for child in column)
+            y = 0
+            for child in column:
+                if self.alignment == Alignment.CENTER:
+                    dx = (column_width - child.width) // 2
+                elif self.alignment == Alignment.END:
+                    dx = column_width - child.width
+                else:
+                    dx = 0
+                placements.append((x + dx, y, child))
+                y += child.height + spacing
+            height = max(height, y - spacing)
+            width = x + column_width
+            x = width + self.spacing
+        return width, height, placements
 
-        return RenderImage.concat_horizontal(
-            rendered, alignment=Alignment.START, spacing=self.spacing
-        )
+    @override
+    def content_rows(self) -> RowReader | None:
+        # children are laid out in columns, not stacked like in `Container`
+        return None
+
+    @cached
+    @override
+    def render_content(self) -> RenderImage:
+        width, height, placements = self.layout()
+        canvas = RenderImage.empty(width, height)
+        for x, y, child in placements:
+            canvas.replace(x, y, child.render())
+        return canvas
@@ -1,8 +1,14 @@
 from heapq import heappop, heappush
-from itertools import combinations
+from itertools import combinations, pairwise
+
+import numpy as np
 
 
 def _brute_force(arr, k):
+    """Exhaustive search minimizing `max - min` of the segment sums.
+
+    Kept as a reference for the benchmark below.
+    """
     n = len(arr)
     k = k - 1
     best_diff = float("inf")
@@ -24,68 +30,87 @@ def _brute_force(arr, k):
     return list(best_split)
 
 
-def _approx(arr, k):
-
-    def can_split(max_sum_limit):
-        count = 1
-        curr_sum = 0
-        sub_sums = []
-        split_indices = []
-
-        for i in range(len(arr)):
-            if curr_sum + arr[i] > max_sum_limit:
-                sub_sums.append(curr_sum)
-                split_indices.append(i)
-                curr_sum = arr[i]
-                count += 1
-            else:
-                curr_sum += arr[i]
-
-        sub_sums.append(curr_sum)
-        return count, sub_sums, split_indices
-
-    left, right = max(arr), sum(arr)
-    best_diff = float("inf")
-    best_splits = []
+def _reachable(prefix: np.ndarray, k: int, low: int, high: int) -> list[np.ndarray]:
+    """`reach[j][i]`: whether `arr[:i]` splits into `j` non-empty segments
+    whose sums all lie in `[low, high]`.
+
+    Prefix sums are sorted, so the valid starts of a segment ending at `i`
+    form a window found by binary search, and each row is computed in O(n)
+    from a cumulative count of the previous row.
+    """
+    n = len(prefix) - 1
+    first = np.searchsorted(prefix, prefix - high, side="left")
+    last = np.minimum(
+        np.searchsorted(prefix, prefix - low, side="right") - 1,
+        np.arange(n + 1) - 1,  # segments are non-empty
+    )
+    reach = [np.zeros(n + 1, dtype=bool)]
+    reach[0][0] = True
+    for _ in range(k):
+        counts = np.concatenate(([0], np.cumsum(reach[-1])))
+        window = counts[np.maximum(last + 1, first)] - counts[first]
+        reach.append((last >= first) & (window > 0))
+    return reach
+
+
+def _partition(arr: list[int], k: int) -> list[int]:
+    """Split `arr` into `k` contiguous non-empty segments.
+
+    The largest segment sum is minimized first, then the smallest one is
+    maximized, both exactly by binary search on the bound. Each probe is an
+    O(n·k) reachability check, so the whole solve is O(n·k·log(sum)).
+
+    Returns:
+        The `k - 1` cut indices.
+    """
+    n = len(arr)
+    prefix = np.concatenate(([0], np.cumsum(arr, dtype=np.int64)))
 
-    while left <= right:
-        mid = (left + right) // 2
-        count, sub_sums, splits = can_split(mid)
+    def feasible(low: int, high: int) -> bool:
+        return bool(_reachable(prefix, k, low, high)[k][n])
 
-        if count > k:
-            left = mid + 1
+    lo, hi = max(arr), int(prefix[-1])
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if feasible(0, mid):
+            hi = mid
         else:
-            # Adjust if we have fewer than k subarrays
-            while count < k:
-                # Split the largest segment (most basic heuristic)
-                max_idx = max(range(len(sub_sums)), key=lambda i: sub_sums[i])
-                val = sub_sums.pop(max_idx)
-                val_half = val // 2
-                sub_sums.insert(max_idx, val_half)
-                sub_sums.insert(max_idx + 1, val - val_half)
-                # Not updating `splits` accurately here, approximate only
-                count += 1
-
-            curr_diff = max(sub_sums) - min(sub_sums)
-            if curr_diff < best_diff:
-                best_diff = curr_diff
-                best_splits = splits[:]
-
-            right = mid - 1
-
-    # Postprocess: enforce exactly k-1 splits
-    while len(best_splits) < k - 1:
-        best_splits.append(len(arr))  # pad with end (won’t affect result)
-
-    return best_splits[: k - 1]
+            lo = mid + 1
+    high = lo
+    lo, hi = 0, min(arr) if k == n else high
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if feasible(mid, high):
+            lo = mid
+        else:
+            hi = mid - 1
+    low = lo
+
+    # walk back through the reachability table, taking the latest valid start
+    reach = _reachable(prefix, k, low, high)
+    cuts = []
+    i = n
+    for j in range(k, 0, -1):
+        starts = np.flatnonzero(
+            reach[j - 1][:i]
+            & (prefix[:i] >= prefix[i] - high)
+            & (prefix[:i] <= prefix[i] - low)
+        )
+        i = int(starts[-1])
+        cuts.append(i)
+    cuts.pop()  # the first segment starts at 0
+    return cuts[::-1]
 
 
 def split_subarray(arr: list[int], num_subarrays: int) -> list[int]:
-    if num_subarrays <= 1:
-        return arr[:]
-    if len(arr) <= 200 and num_subarrays <= 4:
-        return _brute_force(arr, num_subarrays)
-    return _approx(arr, num_subarrays)
+    """Cut `arr` into `num_subarrays` balanced contiguous parts.
+
+    Returns:
+        The cut indices, `num_subarrays - 1` of them.
+    """
+    if num_subarrays <= 1 or not arr:
+        return []
+    return _partition(arr, min(num_subarrays, len(arr)))
 
 
 def _approx_unordered(arr, k):
@@ -129,4 +154,24 @@ if __name__ == "__main__":
             f"Sub Sums: {sub_sums}"
         )
 
+    def show_ordered(method: Callable, arr: list[int], k: int):
+        tik = time.perf_counter()
+        cuts = method(arr, k)
+        tok = time.perf_counter()
+        bounds = [0, *cuts, len(arr)]
+        sub_sums = [sum(arr[a:b]) for a, b in pairwise(bounds)]
+        print(f"{method.__name__} (n={len(arr)}, k={k})")
+        print(
+            f"Elapsed: {(tok - tik) * 1000:.1f}ms, "
+            f"Max: {max(sub_sums)}, "
+            f"Max Diff: {max(sub_sums) - min(sub_sums)}"
+        )
+
     show_unordered(_approx_unordered)
+    show_ordered(_brute_force, arr, k)
+    show_ordered(split_subarray, arr, k)
+    for n, k in [(60, 4), (2000, 8)]:
+        arr = [random.randint(5, 100) for _ in range(n)]
+        if n <= 60:
+            show_ordered(_brute_force, arr, k)
+        show_ordered(split_subarray, arr, k)
@@ -1,7 +1,8 @@
 from . import components
+from .components.utils.math import MathRenderer
 from .markdown import Markdown
 from .style import MarkdownStyle
 
 _ = components
 
-__all__ = ["Markdown", "MarkdownStyle"]
+__all__ = ["Markdown", "MarkdownStyle", "MathRenderer"]
@@ -1,25 +1,165 @@
+import asyncio
 import base64
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
 from io import BytesIO
 
 import requests
+from aiohttp import ClientSession, ClientTimeout
 from PIL import Image
 
+from src.utils.env import inject_env
+from src.utils.log import logger_wrapper
 from src.utils.render import RenderImage
 
+logger = logger_wrapper(__name__)
+
+REMOTE_SCHEMES = ("http://", "https://")
+
+
+class ImageTooLargeError(ValueError):
+    pass
+
+
+@inject_env()
+class ImageResolver:
+    """Downloads and decodes markdown images ahead of layout.
+
+    `prefetch` fetches every remote URL concurrently on the event loop,
+    rejecting bodies over `markdown_image_max_bytes` and images over
+    `markdown_image_max_pixels`, and downscales the rest so that their
+    longest side is at most `markdown_image_max_side`. Results (including
+    failures, for `markdown_image_failure_ttl` seconds) are cached by URL, so
+    the layout pass only ever reads decoded images from memory.
+    """
+
+    markdown_image_max_bytes: int = 8 * 1024 * 1024
+    markdown_image_max_pixels: int = 6000 * 6000
+    markdown_image_max_side: int = 2048
+    markdown_image_timeout: float = 10
+    markdown_image_concurrency: int = 8
+    markdown_image_cache_size: int = 64
+    markdown_image_failure_ttl: float = 60
+
+    _cache: OrderedDict[str, tuple[Image.Image | Exception, float]] = OrderedDict()
+
+    @classmethod
+    def decode(cls, data: bytes) -> Image.Image:
+        image = Image.open(BytesIO(data))
+        w, h = image.size
+        if w * h > cls.markdown_image_max_pixels:
+            raise ImageTooLargeError(f"Image too large: {w}x{h}")
+        side = cls.markdown_image_max_side
+        # let the JPEG decoder skip detail we would throw away anyway
+        image.draft("RGB", (side, side))
+        image.load()
+        if max(image.size) > side:
+            image.thumbnail((side, side), Image.Resampling.LANCZOS)
+        return image
+
+    @classmethod
+    def _remember(cls, url: str, result: Image.Image | Exception) -> None:
+        cls._cache[url] = (result, time.time())
+        cls._cache.move_to_end(url)
+        while len(cls._cache) > cls.markdown_image_cache_size:
+            cls._cache.popitem(last=False)
+
+    @classmethod
+    def cached(cls, url: str) -> Image.Image | Exception | None:
+        item = cls._cache.get(url)
+        if item is None:
+            return None
+        result, at = item
+        if (
+            isinstance(result, Exception)
+            and time.time() - at > cls.markdown_image_failure_ttl
+        ):
+            del cls._cache[url]
+            return None
+        cls._cache.move_to_end(url)
+        return result
+
+    @classmethod
+    async def _download(cls, session: ClientSession, url: str) -> bytes:
+        limit = cls.markdown_image_max_bytes
+        async with session.get(url) as resp:
+            resp.raise_for_status()
+            if (resp.content_length or 0) > limit:
+                raise ImageTooLargeError(f"Image body too large: {url}")
+            buffer = bytearray()
+            async for chunk in resp.content.iter_chunked(64 * 1024):
+                buffer += chunk
+                if len(buffer) > limit:
+                    raise ImageTooLargeError(f"Image body too large: {url}")
+            return bytes(buffer)
+
+    @classmethod
+    async def _resolve(
+        cls, session: ClientSession, semaphore: asyncio.Semaphore, url: str
+    ) -> None:
+        try:
+            async with semaphore:
+                data = await cls._download(session, url)
+            result = await asyncio.to_thread(cls.decode, data)
+        except Exception as e:
+            logger.debug(f"Markdown image failed [{url}]", exception=e)
+            result = e
+        cls._remember(url, result)
+
+    @classmethod
+    async def prefetch(cls, urls: Iterable[str]) -> None:
+        """Resolve every remote URL not already cached."""
+        pending = [
+            url
+            for url in dict.fromkeys(urls)
+            if url.startswith(REMOTE_SCHEMES) and cls.cached(url) is None
+        ]
+        if not pending:
+            return
+        semaphore = asyncio.Semaphore(cls.markdown_image_concurrency)
+        timeout = ClientTimeout(total=cls.markdown_image_timeout)
+        async with ClientSession(timeout=timeout) as session:
+            await asyncio.gather(
+                *(cls._resolve(session, semaphore, u) for u in pending)
+            )
+
+    @classmethod
+    def _download_sync(cls, url: str) -> bytes:
+        limit = cls.markdown_image_max_bytes
+        with requests.get(url, timeout=cls.markdown_image_timeout, stream=True) as resp:
+            resp.raise_for_status()
+            buffer = bytearray()
+            for chunk in resp.iter_content(64 * 1024):
+                buffer += chunk
+                if len(buffer) > limit:
+                    raise ImageTooLargeError(f"Image body too large: {url}")
+            return bytes(buffer)
+
+    @classmethod
+    def load(cls, url: str) -> Image.Image:
+        if url.startswith(REMOTE_SCHEMES):
+            result = cls.cached(url)
+            if result is None:
+                # not prefetched (e.g. rendered from sync code): fetch inline
+                try:
+                    result = cls.decode(cls._download_sync(url))
+                except Exception as e:
+                    result = e
+                cls._remember(url, result)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        if url.startswith("file://"):
+            with open(url.removeprefix("file://"), "rb") as f:
+                return cls.decode(f.read())
+        if url.startswith("data:image/"):
+            fmt, data = url.removeprefix("data:image/").split(",")
+            if not fmt.endswith(";base64"):
+                raise ValueError(f"Unsupported image format: {fmt}")
+            return cls.decode(base64.b64decode(data))
+        raise ValueError(f"Unsupported image URL: {url}")
+
 
 def fetch_image(url: str) -> RenderImage:
-    if url.startswith(("http://", "https://")):
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        image = Image.open(BytesIO(resp.content))
-        return RenderImage.from_pil(image)
-    if url.startswith("file://"):
-        image = Image.open(url.removeprefix("file://"))
-        return RenderImage.from_pil(image)
-    if url.startswith("data:image/"):
-        fmt, data = url.removeprefix("data:image/").split(",")
-        if not fmt.endswith(";base64"):
-            raise ValueError(f"Unsupported image format: {fmt}")
-        image = Image.open(BytesIO(base64.b64decode(data)))
-        return RenderImage.from_pil(image)
-    raise ValueError(f"Unsupported image URL: {url}")
+    return RenderImage.from_pil(ImageResolver.load(url))
@@ -1,11 +1,13 @@
 import io
 import re
+import threading
 import xml.sax
 from pathlib import Path
 from typing import Literal
 from xml.sax.handler import feature_namespaces
 
 from py_mini_racer import MiniRacer
+from py_mini_racer.py_mini_racer import JSOOMException
 
 from .svgmath import MathHandler, XMLGenerator
 
@@ -13,18 +15,31 @@ from .svgmath import MathHandler, XMLGenerator
 class KaTeX:
     """Wrapper around KaTeX to render TeX equations to SVG.
 
+    Each thread gets its own V8 context, so equations can be rendered in
+    parallel from a thread pool. A call running longer than `timeout` ms or
+    allocating more than `max_memory` bytes is terminated by V8, and the
+    context of a call that ran out of memory is discarded.
+
     https://github.com/KaTeX/KaTeX
     """
 
-    _ctx: MiniRacer
+    _local = threading.local()
     _katex_js = Path(__file__).parent / "katex.js"
 
-    def __init__(self):
-        if not hasattr(KaTeX, "_ctx"):
+    def __init__(self, timeout: int | None = None, max_memory: int | None = None):
+        ctx: MiniRacer | None = getattr(KaTeX._local, "ctx", None)
+        if ctx is None:
             ctx = MiniRacer()
             ctx.eval(self._katex_js.read_text(encoding="utf-8"))
-            KaTeX._ctx = ctx
-        self.ctx = KaTeX._ctx
+            KaTeX._local.ctx = ctx
+        self.ctx = ctx
+        self.timeout = timeout
+        self.max_memory = max_memory
+
+    @staticmethod
+    def reset() -> None:
+        """Drop the V8 context of the current thread."""
+        KaTeX._local.ctx = None
 
     def render_to_string(
         self,
@@ -32,9 +47,18 @@ class KaTeX:
         format: Literal["html", "mathml", "htmlAndMathml"] = "htmlAndMathml",
         inline: bool = False,
     ) -> str:
-        return self.ctx.call(
-            "katex.renderToString", tex, {"output": format, "displayMode": not inline}
-        )
+        try:
+            return self.ctx.call(
+                "katex.renderToString",
+                tex,
+                {"output": format, "displayMode": not inline},
+                timeout=self.timeout,
+                max_memory=self.max_memory,
+            )
+        except JSOOMException:
+            # the heap of the interrupted call stays at the limit
+            KaTeX.reset()
+            raise
 
     def render_pure_mathml(self, tex: str, inline: bool = False) -> str:
         katex_mathml = self.render_to_string(tex, format="mathml", inline=inline)
@@ -47,6 +71,8 @@ class KaTeX:
         Raises:
             py_mini_racer.JSEvalException:
                 If the rendering fails, most likely due to invalid TeX.
+            py_mini_racer.JSTimeoutException, py_mini_racer.JSOOMException:
+                If the rendering exceeds the time or memory limit.
             xml.sax.SAXException:
                 If svgmath fails to parse mathml.
         """
@@ -9,8 +9,14 @@ def svg_to_png(
     svg: str,
     background: tuple[int, ...] | None = None,
     dpi: int = 800,
+    scale: float = 1,
 ) -> Image.Image:
-    png_bytes = cairosvg.svg2png(bytestring=svg.encode("utf-8"), dpi=dpi)
+    # the stub types `scale` as int, but cairosvg multiplies it as a float
+    png_bytes = cairosvg.svg2png(
+        bytestring=svg.encode("utf-8"),
+        dpi=dpi,
+        scale=scale,  # pyright: ignore[reportArgumentType]
+    )
     buffer = io.BytesIO(cast(bytes, png_bytes))
     image = Image.open(buffer)
     image.load()
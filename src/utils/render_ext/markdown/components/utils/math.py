@@ -1,8 +1,199 @@
+import asyncio
+import io
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from src.utils.env import inject_env
+from src.utils.log import logger_wrapper
+from src.utils.persistence.blobcache import DiskTier
 from src.utils.render import Alignment, RenderImage
 
 from .katexsvg import KaTeX
 from .katexsvg.png import svg_to_png
 
+logger = logger_wrapper(__name__)
+
+MathKey = tuple[str, bool, float]  # (tex, inline, scale)
+
+
+class MathTimeoutError(TimeoutError):
+    pass
+
+
+@inject_env()
+class MathRenderer:
+    """Renders TeX equations to images, memoized by `(tex, inline, scale)`.
+
+    Equations are rasterized directly at the target size (`BASE_DPI` scaled
+    by `scale`) instead of at full DPI and shrunk afterwards. Results live in
+    an LRU of `math_cache_size` images, backed by PNGs under
+    `math_cache_dir` when it is set.
+
+    Rendering runs on a pool of `math_workers` threads, each owning its own
+    KaTeX V8 context. KaTeX is interrupted by V8 after `math_timeout`
+    seconds or `math_max_memory` bytes, and callers stop waiting after
+    `math_timeout` seconds whatever the stage. Equations longer than
+    `math_max_length` are rejected outright.
+
+    The LRU and the table of in-flight renders are shared with the pool
+    threads and guarded by `_lock`; results are only remembered by the
+    thread that waited for them.
+    """
+
+    math_cache_size: int = 512
+    math_cache_dir: str = ""
+    math_disk_cache_size: int = 64 * 1024 * 1024
+    math_workers: int = 2
+    math_timeout: float = 5
+    math_max_memory: int = 128 * 1024 * 1024
+    math_max_length: int = 4096
+
+    BASE_DPI = 800
+
+    _memory: OrderedDict[MathKey, RenderImage] = OrderedDict()
+    _disk: DiskTier | None = None
+    _pool: ThreadPoolExecutor | None = None
+    _inflight: dict[MathKey, Future[RenderImage]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def _disk_tier(cls) -> DiskTier | None:
+        if cls._disk is None and cls.math_cache_dir:
+            cls._disk = DiskTier(Path(cls.math_cache_dir), cls.math_disk_cache_size)
+        return cls._disk
+
+    @classmethod
+    def _katex(cls) -> KaTeX:
+        return KaTeX(
+            timeout=round(cls.math_timeout * 1000), max_memory=cls.math_max_memory
+        )
+
+    @classmethod
+    def _executor(cls) -> ThreadPoolExecutor:
+        if cls._pool is None:
+            cls._pool = ThreadPoolExecutor(
+                max_workers=cls.math_workers,
+                thread_name_prefix="katex",
+                initializer=cls._katex,  # warm the V8 context of each worker
+            )
+        return cls._pool
+
+    @classmethod
+    async def startup(cls):
+        """Start the pool and load KaTeX into every worker."""
+        pool = cls._executor()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(pool, cls._katex) for _ in range(cls.math_workers))
+        )
+
+    @classmethod
+    def shutdown(cls):
+        if cls._pool is not None:
+            cls._pool.shutdown(wait=False, cancel_futures=True)
+            cls._pool = None
+
+    @classmethod
+    def _remember(cls, key: MathKey, image: RenderImage) -> None:
+        with cls._lock:
+            cls._memory[key] = image
+            cls._memory.move_to_end(key)
+            while len(cls._memory) > cls.math_cache_size:
+                cls._memory.popitem(last=False)
+
+    @classmethod
+    def _rasterize(cls, key: MathKey) -> RenderImage:
+        """Runs on a pool worker."""
+        tex, inline, scale = key
+        disk = cls._disk_tier()
+        if disk is not None and (data := disk.get(repr(key))) is not None:
+            return RenderImage.from_pil(Image.open(io.BytesIO(data)))
+        svg = cls._katex().render_to_svg(tex, inline=inline)
+        image = svg_to_png(svg, dpi=cls.BASE_DPI, scale=scale)
+        if disk is not None:
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG")
+            disk.put(repr(key), buffer.getvalue())
+        return RenderImage.from_pil(image)
+
+    @classmethod
+    def _submit(cls, key: MathKey) -> Future[RenderImage]:
+        """Start (or join) the rendering of one equation on the pool."""
+        if len(key[0]) > cls.math_max_length:
+            raise ValueError(f"Equation too long: {len(key[0])} characters")
+        with cls._lock:
+            future = cls._inflight.get(key)
+            if future is not None:
+                return future
+            future = cls._executor().submit(cls._rasterize, key)
+            cls._inflight[key] = future
+
+        def _done(_: Future[RenderImage]):
+            with cls._lock:
+                cls._inflight.pop(key, None)
+
+        # outside the lock: a finished future runs the callback right away
+        future.add_done_callback(_done)
+        return future
+
+    @classmethod
+    def _cached(cls, key: MathKey) -> RenderImage | None:
+        with cls._lock:
+            image = cls._memory.get(key)
+            if image is not None:
+                cls._memory.move_to_end(key)
+        return image.copy() if image is not None else None
+
+    @classmethod
+    def get(cls, tex: str, inline: bool = False, scale: float = 0.2) -> RenderImage:
+        """Return a copy of the rendered equation, rendering it on a miss.
+
+        Raises:
+            MathTimeoutError: If rendering takes longer than `math_timeout`.
+        """
+        key = (tex, inline, scale)
+        if (image := cls._cached(key)) is not None:
+            return image
+        try:
+            image = cls._submit(key).result(cls.math_timeout)
+        except TimeoutError as e:
+            raise MathTimeoutError(f"Equation timed out: {tex[:64]!r}") from e
+        cls._remember(key, image)
+        return image.copy()
+
+    @classmethod
+    async def render_many(
+        cls, equations: Iterable[tuple[str, bool]], scale: float = 0.2
+    ) -> None:
+        """Render every distinct equation of a document into the cache.
+
+        Equations are rendered concurrently on the pool, each bounded by the
+        V8 limits. Failures are only logged; the layout reports them when it
+        renders them for real.
+        """
+        keys: list[MathKey] = []
+        futures = []
+        for tex, inline in dict.fromkeys(equations):
+            key = (tex, inline, scale)
+            if key in cls._memory:
+                continue
+            try:
+                futures.append(asyncio.wrap_future(cls._submit(key)))
+            except Exception:
+                continue
+            keys.append(key)
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        for key, result in zip(keys, results, strict=True):
+            if isinstance(result, RenderImage):
+                cls._remember(key, result)
+            elif isinstance(result, Exception):
+                logger.debug("Math rendering failed", exception=result)
+
 
 def render_math(
     equation: str,
@@ -10,9 +201,7 @@ def render_math(
     max_width: int | None = None,
     rescale: float = 0.2,
 ) -> RenderImage:
-    katex = KaTeX()
-    svg = katex.render_to_svg(equation, inline=inline)
-    im = RenderImage.from_pil(svg_to_png(svg)).rescale(rescale)
+    im = MathRenderer.get(equation, inline, rescale)
     if not inline and max_width:
         im = RenderImage.concat_vertical(
             [im, RenderImage.empty(max_width, 0)], alignment=Alignment.CENTER
@@ -1,4 +1,5 @@
-from typing import Unpack
+import asyncio
+from typing import Self, Unpack
 
 from src.utils.render import (
     BaseStyle,
@@ -7,11 +8,14 @@ from src.utils.render import (
     Container,
     RenderImage,
     RenderObject,
+    RowReader,
     Space,
     cached,
     volatile,
 )
 
+from .components.utils.image import ImageResolver
+from .components.utils.math import MathRenderer
 from .render import MarkdownRenderer
 from .style import MarkdownStyle
 
@@ -45,8 +49,22 @@ class Markdown(RenderObject):
     def _padding(self) -> Space:
         return Space.of_side(*(self.md_width // d for d in self.PAD_DIV))
 
+    async def prefetch(self) -> Self:
+        """Resolve images and equations without blocking the loop.
+
+        Call this before `render()` in async code; layout then reads the
+        decoded images and rendered equations from memory instead of
+        producing them inline.
+        """
+        md = MarkdownRenderer(self.text, self.style, content_width=self.md_width)
+        await asyncio.gather(
+            ImageResolver.prefetch(md.image_urls()),
+            MathRenderer.render_many(md.equations()),
+        )
+        return self
+
     @cached
-    def render_content(self) -> RenderImage:
+    def _document(self) -> RenderObject:
         md = MarkdownRenderer(self.text, self.style, content_width=self.md_width)
         main = md.render()
         return Container.from_children(
@@ -57,14 +75,22 @@ class Markdown(RenderObject):
             decorations=[
                 BoxShadow.of(blur_radius=91, spread=4, color=Color.of(0, 0, 0, 0.8))
             ],
-        ).render()
+        )
+
+    @cached
+    def render_content(self) -> RenderImage:
+        return self._document().render()
+
+    def content_rows(self) -> RowReader | None:
+        # the document is a container of blocks, which renders in bands
+        return self._document().rows()
 
     @property
     @cached
     def content_width(self) -> int:
-        return self.render_content().width
+        return self._document().width
 
     @property
     @cached
     def content_height(self) -> int:
-        return self.render_content().height
+        return self._document().height
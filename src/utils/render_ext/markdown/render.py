@@ -1,6 +1,9 @@
+from collections.abc import Iterator
+
 import mistletoe
 from mistletoe.ast_renderer import AstRenderer
 from mistletoe.block_token import BlockToken
+from mistletoe.span_token import Image
 from mistletoe.token import Token
 
 from src.utils.render import RenderObject, Spacer
@@ -38,6 +41,25 @@ class MarkdownRenderer:
         with AstRenderer(Emoji, Math):
             self.doc = mistletoe.Document(text)
 
+    def _walk(self) -> Iterator[Token]:
+        stack: list[Token] = [self.doc]
+        while stack:
+            token = stack.pop()
+            yield token
+            stack.extend(reversed(list(token.children or [])))
+
+    def image_urls(self) -> Iterator[str]:
+        """Yield the source of every image in the document."""
+        for token in self._walk():
+            if isinstance(token, Image):
+                yield token.src
+
+    def equations(self) -> Iterator[tuple[str, bool]]:
+        """Yield `(tex, inline)` for every equation in the document."""
+        for token in self._walk():
+            if isinstance(token, Math):
+                yield token.math, token.inline
+
     def render(self) -> RenderObject:
         return self._dispatch_render(
             self.doc,
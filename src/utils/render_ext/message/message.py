@@ -97,7 +97,9 @@ class MessageRender:
                     try:
                         filename = segment.extract_filename()
                         url = segment.extract_url()
-                        data = await storage.load_image(url, filename)
+                        data = await storage.load_thumbnail(
+                            url, filename, (max_image_dim, max_image_dim)
+                        )
                         if data is not None:
                             image = ImageObject.from_image(
                                 data,
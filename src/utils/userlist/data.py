@@ -1,4 +1,3 @@
-import asyncio
 import math
 from collections.abc import Awaitable, Iterable
 from datetime import datetime
@@ -40,6 +39,20 @@ class Pagination(NamedTuple):
     def enumerate(self):
         return enumerate(self.items, start=self.page_id * self.page_size)
 
+    @staticmethod
+    def locate(
+        num_items: int, page_id: int, page_size: int, strict: bool = False
+    ) -> tuple[int, int]:
+        """Clamp `page_id` (negative counts from the end); return it and the
+        number of pages."""
+        num_pages = max(math.ceil(num_items / page_size), 1)
+        if page_id < 0:
+            page_id = num_pages + page_id
+        if strict and not 0 <= page_id < num_pages:
+            raise IndexError(f"{page_id} out of page range")
+        page_id = max(0, min(page_id, num_pages - 1))
+        return page_id, num_pages
+
 
 class UserListMetadata(BaseModel):
     name: str
@@ -75,12 +88,9 @@ class UserList(BaseModel):
         return result
 
     def paginate(self, page_id: int, page_size: int, strict: bool = False):
-        num_pages = max(math.ceil(len(self.items) / page_size), 1)
-        if page_id < 0:
-            page_id = num_pages + page_id
-        if strict and not 0 <= page_id < num_pages:
-            raise IndexError(f"{page_id} out of page range")
-        page_id = max(0, min(page_id, num_pages - 1))
+        page_id, num_pages = Pagination.locate(
+            len(self.items), page_id, page_size, strict
+        )
         return Pagination(
             page_id,
             page_size,
@@ -90,26 +100,26 @@ class UserList(BaseModel):
 
     @property
     def expanded_items(self) -> Awaitable[list[Message]]:
-        collection = UserListCollection()
         raw = [i.content for i in self.items if isinstance(i, MessageItem)]
         ref = [
-            i
+            i.name
             for i in self.items
             if isinstance(i, ReferenceItem) and i.name != self.name
         ]
 
-        async def load_message(group_id: int, name: str):
-            lst = await collection.find(group_id, name)
-            return (
-                [i.content for i in lst.items if isinstance(i, MessageItem)]
-                if lst
-                else []
-            )
-
         async def result():
+            if not ref:
+                return raw
+            lists = {
+                lst.name: lst
+                for lst in await UserListCollection().find_many(self.group_id, ref)
+            }
+            # keep one copy per reference, in reference order
             return sum(
-                await asyncio.gather(
-                    *[load_message(self.group_id, i.name) for i in ref]
+                (
+                    [i.content for i in lists[name].items if isinstance(i, MessageItem)]
+                    for name in ref
+                    if name in lists
                 ),
                 raw,
             )
@@ -120,14 +130,11 @@ class UserList(BaseModel):
     def valid_references(self) -> Awaitable[list[str]]:
 
         async def result():
-            exists = await asyncio.gather(
-                *[
-                    UserListCollection().find(self.group_id, i.name)
-                    for i in self.items
-                    if isinstance(i, ReferenceItem)
-                ]
-            )
-            return [i.name for i in exists if i is not None]
+            names = [i.name for i in self.items if isinstance(i, ReferenceItem)]
+            if not names:
+                return []
+            exists = await UserListCollection().existing_names(self.group_id, names)
+            return [name for name in names if name in exists]
 
         return result()
 
@@ -184,9 +191,48 @@ class UserListCollection:
             }
         )
 
-    async def find_all(self, group_id: int) -> list[UserListMetadata]:
-        pipeline = [
-            {"$match": {"group_id": group_id, "deleted_at": None}},
+    async def find_many(self, group_id: int, names: Iterable[str]) -> list[UserList]:
+        """Load several lists of a group in one query."""
+        return [
+            doc
+            async for doc in self._collection.find_all(
+                {
+                    "group_id": group_id,
+                    "name": {"$in": list(set(names))},
+                    "deleted_at": None,
+                }
+            )
+        ]
+
+    async def existing_names(self, group_id: int, names: Iterable[str]) -> set[str]:
+        """Return which of `names` are lists of the group, without their items."""
+        cursor = self._collection.find(
+            {
+                "group_id": group_id,
+                "name": {"$in": list(set(names))},
+                "deleted_at": None,
+            },
+            projection={"_id": 0, "name": 1},
+        )
+        return {doc["name"] async for doc in cursor}
+
+    async def find_slice(
+        self, group_id: int, name: str, skip: int, limit: int
+    ) -> UserList | None:
+        """Load a list with only `items[skip : skip + limit]`."""
+        return await self._collection.find_one(
+            filter={
+                "group_id": group_id,
+                "name": name,
+                "deleted_at": None,
+            },
+            projection={"items": {"$slice": [skip, limit]}},
+        )
+
+    @staticmethod
+    def _metadata_pipeline(match: dict[str, Any]) -> list[dict[str, Any]]:
+        return [
+            {"$match": match},
             {
                 "$project": {
                     "name": 1,
@@ -213,6 +259,18 @@ class UserListCollection:
                 }
             },
         ]
+
+    async def find_metadata(self, group_id: int, name: str) -> UserListMetadata | None:
+        """Load the name, creator and item counts of a list, but not its items."""
+        pipeline = self._metadata_pipeline(
+            {"group_id": group_id, "name": name, "deleted_at": None}
+        )
+        cursor = await self._collection.aggregate(pipeline)
+        docs = await cursor.to_list(length=1)
+        return UserListMetadata(**docs[0]) if docs else None
+
+    async def find_all(self, group_id: int) -> list[UserListMetadata]:
+        pipeline = self._metadata_pipeline({"group_id": group_id, "deleted_at": None})
         cursor = await self._collection.aggregate(pipeline)
         return [UserListMetadata(**doc) async for doc in cursor]
 
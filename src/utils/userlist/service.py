@@ -3,10 +3,17 @@ import random
 from nonebot.adapters.onebot.v11 import Message
 
 from src.ext import MessageSegment
+from src.ext.message.comparator import ImagePHashComparator
 
 from ..log import logger_wrapper
 from ..persistence import FileStorage
-from .data import MessageItem, ReferenceItem, UserListCollection
+from .data import (
+    MessageItem,
+    Pagination,
+    ReferenceItem,
+    UserList,
+    UserListCollection,
+)
 from .exception import ListPermissionError, TooManyItemsError, TooManyListsError
 
 logger = logger_wrapper("userlist")
@@ -27,6 +34,11 @@ async def promote(*messages: Message):
                         await storage.increase_reference(filename)
                 except Exception as e:
                     exceptions.append(e)
+    try:
+        # hash at ingest so duplicate checks never need to read the blobs
+        await ImagePHashComparator.precompute(*messages)
+    except Exception as e:
+        exceptions.append(e)
     if exceptions:
         logger.warning(f"Promote failed: {exceptions}")
     return messages
@@ -59,6 +71,35 @@ class UserListService:
     async def find_list(cls, group_id: int, name: str):
         return await cls.collection.find(group_id, name)
 
+    @classmethod
+    async def find_lists(cls, group_id: int, names: list[str]):
+        return await cls.collection.find_many(group_id, names) if names else []
+
+    @classmethod
+    async def find_list_meta(cls, group_id: int, name: str):
+        return await cls.collection.find_metadata(group_id, name)
+
+    @classmethod
+    async def find_page(
+        cls, group_id: int, name: str, page_id: int, page_size: int, num_items: int
+    ) -> tuple[UserList, Pagination] | None:
+        """Load one page of a list; the returned list holds only that page.
+
+        `num_items` is the length of the list, usually from `find_list_meta`.
+        """
+        page_id, num_pages = Pagination.locate(num_items, page_id, page_size)
+        lst = await cls.collection.find_slice(
+            group_id, name, page_id * page_size, page_size
+        )
+        if lst is None:
+            return None
+        return lst, Pagination(page_id, page_size, num_pages, lst.items)
+
+    @classmethod
+    async def find_item(cls, group_id: int, name: str, index: int):
+        lst = await cls.collection.find_slice(group_id, name, index, 1)
+        return lst.items[0] if lst is not None and lst.items else None
+
     @classmethod
     async def find_all_list_meta(cls, group_id: int):
         return await cls.collection.find_all(group_id)
@@ -0,0 +1,45 @@
+import numpy as np
+
+from src.utils.render import Color, Palette, RenderImage
+
+
+def test_set_transparency():
+    im = RenderImage(
+        np.array(
+            [[[255, 255, 255, 255], [0, 0, 0, 255], [0, 0, 0, 0], [10, 200, 30, 128]]],
+            dtype=np.uint8,
+        )
+    )
+    im.set_transparency(Palette.BLACK, Palette.WHITE)
+    assert im.base_im.tolist() == [
+        [[0, 0, 0, 0], [0, 0, 0, 255], [0, 0, 0, 0], [10, 200, 30, 128]]
+    ]
+
+    # only the green channel differs, and it overshoots `end`
+    start, end = Color(10, 100, 10, 255), Color(10, 120, 10, 255)
+    im = RenderImage(np.array([[[0, 130, 0, 255], [0, 90, 0, 255]]], dtype=np.uint8))
+    im.set_transparency(start, end)
+    assert im.alpha.tolist() == [[0, 255]]
+
+    # with spill compensation, steps past `end` make up for other channels
+    start, end = Color(0, 0, 0, 255), Color(100, 100, 255, 255)
+    im = RenderImage(np.array([[[250, 100, 50, 255]]], dtype=np.uint8))
+    assert im.copy().set_transparency(start, end).alpha.tolist() == [[255]]
+    im.set_transparency(start, end, spill_compensation=True)
+    assert im.base_im.tolist() == [[[0, 0, 0, 0]]]
+
+
+def test_mask():
+    im = RenderImage.empty(3, 1, Palette.BLACK)
+    im.mask(np.array([[0, 128, 255]], dtype=np.uint8))
+    assert im.alpha.tolist() == [[0, 128, 255]]
+    im.mask(np.array([[True, False, True]]))
+    assert im.alpha.tolist() == [[0, 0, 255]]
+
+
+def test_from_raw():
+    bgr = np.array([[[1, 2, 3]]], dtype=np.uint8)
+    assert RenderImage.from_raw(bgr, bgr=True).base_im.tolist() == [[[3, 2, 1, 255]]]
+    assert RenderImage.from_raw(bgr).base_im.tolist() == [[[1, 2, 3, 255]]]
+    gray = np.array([[7]], dtype=np.uint8)
+    assert RenderImage.from_raw(gray).base_im.tolist() == [[[7, 7, 7, 255]]]
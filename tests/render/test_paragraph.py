@@ -4,7 +4,15 @@ import pytest
 
 from src.plugins.annual_report.render import AnnualReportRenderer
 from src.plugins.annual_report.statistics import AnnualStatistics
-from src.utils.render import Palette, Paragraph, RenderImage, TextStyle
+from src.utils.render import (
+    Alignment,
+    Palette,
+    Paragraph,
+    RenderImage,
+    RenderObject,
+    TextStyle,
+)
+from src.utils.render.objects.paragraph.layout import ImageElement
 
 out = Path("render-test/paragraph")
 out.mkdir(parents=True, exist_ok=True)
@@ -39,3 +47,70 @@ def test_paragraph_with_image():
             line_spacing=6,
             background=Palette.GRAY,
         ).render().save(out / f"test_paragraph_with_image_{max_width}.png")
+
+
+def test_paragraph_layout():
+    images = [RenderImage.empty(w, h, Palette.GRAY) for w, h in [(40, 20), (30, 10)]]
+    para = Paragraph(
+        [ImageElement(im, inline=True) for im in images],
+        max_width=50,
+        alignment=Alignment.CENTER,
+        line_spacing=5,
+    )
+    layout = para.layout()
+    assert (layout.width, layout.height) == (40, 35)
+    assert [(x, y) for x, y, _ in layout.placements] == [(0, 0), (5, 25)]
+    assert "render_content" not in para._cache_
+    im = para.render_content()
+    assert (im.width, im.height) == (40, 35)
+
+
+def test_find_max_font():
+    text = "The quick brown fox jumps over the lazy dog."
+    style = TextStyle(font="data/static/fonts/arial.ttf", size=40)
+    size = Paragraph.find_max_font(text, style, font_size=(8, 40), max_size=(120, 60))
+
+    def height(size: int) -> int:
+        style = TextStyle(font="data/static/fonts/arial.ttf", size=size)
+        return Paragraph.of(text, style, max_width=120).height
+
+    assert height(size) <= 60 < height(size + 1)
+    para = Paragraph.from_template_with_font_range(
+        "{text}", {"text": text}, (120, 60), (8, 40), default=style
+    )
+    assert para.height == height(size)
+    with pytest.raises(ValueError):
+        Paragraph.find_max_font(text, style, font_size=(30, 40), max_size=(120, 10))
+
+
+def test_compiled_template():
+    font = "data/static/fonts/arial.ttf"
+    default = TextStyle(font=font, size=20)
+    styles = {"b": TextStyle(bold=True, size=1.5), "red": TextStyle(color=Palette.RED)}
+    images: dict[str, RenderObject | RenderImage] = {
+        "dot": RenderImage.empty(6, 6, Palette.GRAY)
+    }
+    cases = [
+        ("<b>{name}</b> & {count:>4d} <dot:inline/>", {"name": "<x> & y", "count": 7}),
+        ("{a}{b}<red>{a!r}</red>", {"a": "", "b": "&lt;"}),
+        ("<b><red>{a}</red></b>{{literal}} x < y", {"a": "1"}),
+        ("{items:[, ]<b>{{name}}</b>}", {"items": [{"name": "p"}, {"name": "q"}]}),
+        ("<{tag}>x</{tag}>", {"tag": "b"}),
+    ]
+    for template, values in cases:
+        got = Paragraph.from_template(
+            template, values, default=default, styles=styles, images=images
+        )
+        expected = Paragraph.from_markup(
+            Paragraph.formatter.format(template, **values),
+            default=default,
+            styles=styles,
+            images=images,
+        )
+        assert [getattr(e, "text", None) for e in got.elements] == [
+            getattr(e, "text", None) for e in expected.elements
+        ]
+        assert (got.render().base_im == expected.render().base_im).all()
+
+    with pytest.raises(KeyError):
+        Paragraph.from_template("{missing}", {}, default=default)
@@ -0,0 +1,68 @@
+import numpy as np
+
+from src.utils.render import (
+    Alignment,
+    Border,
+    BoxShadow,
+    Color,
+    Container,
+    Direction,
+    Image,
+    Palette,
+    Paragraph,
+    RenderImage,
+    Space,
+    TextStyle,
+)
+
+
+def make_document(seed: int) -> Container:
+    rng = np.random.default_rng(seed)
+    style = TextStyle(font="data/static/fonts/arial.ttf", size=16, color=Palette.BLACK)
+    children = [
+        Paragraph.of("Stripes " * 20, style, max_width=200, margin=Space.all(3)),
+        Image.from_image(
+            RenderImage(rng.integers(0, 256, (90, 120, 4), np.uint8)),
+            border=Border.of(2, Color.of(200, 0, 0, 0.6)),
+        ),
+        Container.from_children(
+            [Image.from_color(30, int(h), Color.of(0, 128, 255, 0.5)) for h in (40, 7)],
+            alignment=Alignment.CENTER,
+            spacing=4,
+            padding=Space.all(5),
+            background=Color.of(255, 255, 0, 0.3),
+        ),
+    ]
+    document = Container.from_children(
+        children * 3,
+        alignment=Alignment.END,
+        direction=Direction.VERTICAL,
+        spacing=6,
+        padding=Space.all(10),
+        border=Border.of(3, Color.of(0, 100, 200, 0.8)),
+        background=Palette.WHITE,
+    )
+    return Container.from_children(
+        [document],
+        margin=Space.all(20),
+        decorations=[BoxShadow.of(blur_radius=31, spread=4, color=Color.of(0, 0, 0))],
+    )
+
+
+def test_render_strips():
+    for strip_height in (1, 17, 64, 10000):
+        full = make_document(0).render().base_im
+        strips = list(make_document(0).render_strips(strip_height))
+        assert all(strip.height <= strip_height for strip in strips)
+        assert np.array_equal(np.vstack([strip.base_im for strip in strips]), full)
+
+
+def test_render_strips_drops_caches():
+    document = make_document(1)
+    column = document.children[0]
+    assert isinstance(column, Container)
+    paragraph = column.children[0]
+    for _ in document.render_strips(32):
+        pass
+    assert "render_content" not in paragraph._cache_
+    assert "render_content" not in document._cache_
@@ -1,4 +1,5 @@
 import random
+from itertools import combinations, pairwise
 from pathlib import Path
 
 from src.utils.render import (
@@ -11,6 +12,7 @@ from src.utils.render import (
     TextStyle,
     WaterfallContainer,
 )
+from src.utils.render.objects.waterfall.utils import split_subarray
 
 out = Path("render-test/container")
 out.mkdir(parents=True, exist_ok=True)
@@ -60,3 +62,54 @@ def test_waterfall():
         spacing=10,
         background=Palette.WHITE,
     ).render().save(out / "waterfall-10.png")
+
+
+class _SizeOnly(FixedContainer):
+    def render_content(self):
+        raise AssertionError("measured objects must not be rendered")
+
+
+def test_waterfall_measure_without_render():
+    children = [
+        _SizeOnly(
+            50,
+            h,
+            JustifyContent.START,
+            Alignment.START,
+            Direction.VERTICAL,
+            [],
+        )
+        for h in (30, 60, 90, 20)
+    ]
+    container = WaterfallContainer.from_children(
+        children, alignment=Alignment.CENTER, columns=2, spacing=10
+    )
+    # columns [30, 60] and [90, 20] are stretched to the same height
+    assert (container.width, container.height) == (110, 120)
+    placements = container.layout()[2]
+    assert [(x, y) for x, y, _ in placements] == [(0, 0), (0, 60), (60, 0), (60, 100)]
+
+
+def test_split_subarray_exact():
+    def sub_sums(arr, cuts):
+        return [sum(arr[a:b]) for a, b in pairwise([0, *cuts, len(arr)])]
+
+    rng = random.Random(0)
+    for _ in range(500):
+        n = rng.randint(1, 9)
+        k = rng.randint(1, n)
+        arr = [rng.randint(0, 20) for _ in range(n)]
+        cuts = split_subarray(arr, k)
+        assert len(cuts) == k - 1
+        assert all(a < b for a, b in pairwise([0, *cuts, n]))
+        # tallest column first, then shortest, against every possible split
+        best = min(
+            (max(sums), -min(sums))
+            for c in combinations(range(1, n), k - 1)
+            for sums in [sub_sums(arr, c)]
+        )
+        sums = sub_sums(arr, cuts)
+        assert (max(sums), -min(sums)) == best
+
+    assert split_subarray([3, 1, 2], 1) == []
+    assert len(split_subarray([rng.randint(40, 400) for _ in range(5000)], 12)) == 11
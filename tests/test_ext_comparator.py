@@ -0,0 +1,79 @@
+import random
+from unittest.mock import AsyncMock
+
+import pytest
+from nonebot.adapters.onebot.v11 import Message, MessageSegment
+
+from src.ext.message.comparator import ImagePHashComparator
+from src.utils.bktree import BKTree, hamming
+from src.utils.persistence.filestore import FileStorage
+
+
+def test_bktree_matches_brute_force():
+    rng = random.Random(0)
+    keys = [rng.getrandbits(64) for _ in range(500)]
+    # plant some near-duplicates
+    keys += [keys[0] ^ (1 << b) for b in range(0, 64, 9)]
+    tree = BKTree((k, i) for i, k in enumerate(keys))
+    assert len(tree) == len(keys)
+
+    for query in keys[:20] + [rng.getrandbits(64) for _ in range(20)]:
+        for radius in (0, 4, 8, 20):
+            expected = sorted(
+                i for i, k in enumerate(keys) if hamming(query, k) <= radius
+            )
+            got = sorted(i for _, i in tree.query(query, radius))
+            assert got == expected
+
+
+def _image(filename: str) -> Message:
+    return Message(MessageSegment("image", {"file": filename, "filename": filename}))
+
+
+@pytest.mark.asyncio
+async def test_phash_comparator_find():
+    base = 0x8F3C_A1B2_0000_FFFF
+    ImagePHashComparator._memo.update(
+        {
+            "a.png": base,
+            "a-near.png": base ^ 0b111,
+            "b.png": ~base & (2**64 - 1),
+        }
+    )
+    comparator = ImagePHashComparator(threshold=8)
+    candidates = [
+        Message("text"),
+        _image("b.png"),
+        _image("a-near.png"),
+        _image("a-near.png") + MessageSegment.text("caption"),
+        _image("a.png"),
+    ]
+
+    assert await comparator.find(_image("a.png"), candidates) == [2, 4]
+    assert await comparator.find(Message("text"), candidates) == [0]
+
+
+@pytest.mark.asyncio
+async def test_phash_backfill_failures(monkeypatch):
+    calls = []
+
+    class Storage:
+        async def load_metadata_many(self, filenames, key):
+            return {}
+
+        async def get_or_compute_metadata(self, filename, key, processor):
+            calls.append(filename)
+            if filename == "broken.png":
+                raise OSError("cannot identify image file")
+            return "00ff00ff00ff00ff"
+
+    monkeypatch.setattr(FileStorage, "get_instance", AsyncMock(return_value=Storage()))
+    for name in ("broken.png", "legacy.png"):
+        ImagePHashComparator._memo.pop(name, None)
+        ImagePHashComparator._failed.pop(name, None)
+
+    hashes = await ImagePHashComparator.phashes("broken.png", "legacy.png")
+    assert hashes == {"legacy.png": 0x00FF00FF00FF00FF}
+    # the failure is remembered instead of retried on every lookup
+    assert await ImagePHashComparator.phashes("broken.png", "legacy.png") == hashes
+    assert sorted(calls) == ["broken.png", "legacy.png"]
@@ -5,9 +5,10 @@ from pathlib import Path
 
 import pytest
 
-from src.plugins.idiom.data import Diff, Idiom
+from src.plugins.idiom.data import Diff, Idiom, IdiomSampler
 from src.plugins.idiom.guess.game import RenderAttemptData, Status
 from src.plugins.idiom.guess.render import GuessRender
+from src.plugins.idiom.syllable import SyllableTrie
 
 
 def test_idiom_syllable():
@@ -36,6 +37,38 @@ def test_idiom_syllable():
     ]
 
 
+def test_syllable_segmentation():
+    trie = SyllableTrie(["xi", "xia", "xian", "xiao", "a", "an", "ao", "o"])
+    segmentation = trie.segment("xian")
+    assert list(segmentation) == [("xian",), ("xi", "an")]
+    assert segmentation.part_counts() == [1, 2]
+    assert segmentation.with_lengths([2, 2]) == ("xi", "an")
+    assert segmentation.with_lengths([3, 1]) is None
+    # separators force a boundary
+    assert trie.parse("xi'an") == [("xi", "an")]
+    assert not trie.segment("xiu")
+    assert not trie.segment("")
+
+    # ambiguous input is enumerated lazily, up to the limit
+    long = trie.segment("xiao" * 500)
+    assert long.part_counts()[0] == 500
+    assert trie.parse("xiao" * 500, limit=2) == [
+        ("xiao",) * 500,
+        ("xi", "ao") + ("xiao",) * 499,
+    ]
+
+
+def test_idiom_sampler():
+    sampler = IdiomSampler((i * 10, f"w{i}") for i in range(100))
+    ids = sampler.sample(100)
+    assert sorted(ids) == [i * 10 for i in range(100)]
+
+    excluded = sampler.mask(f"w{i}" for i in range(1, 100))
+    assert sampler.sample(1, excluded) == [0]
+    assert sampler.sample(3, excluded) == [0]
+    assert sampler.sample(1, sampler.mask(["w0", "unknown"])) != [0]
+
+
 def test_idiom_diff():
     N, Y, E = Diff.MISS, Diff.EXACT, Diff.EXIST
     t = "abcbc"
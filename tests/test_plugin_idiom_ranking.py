@@ -0,0 +1,71 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from pymongo import AsyncMongoClient, MongoClient
+
+from src.plugins.idiom.guess.data import (
+    GroupData,
+    Guess,
+    GuessIdiomData,
+    Rank,
+    init_ranking,
+)
+
+
+def _mongo_available():
+    try:
+        MongoClient(serverSelectionTimeoutMS=1000).server_info()
+        return True
+    except Exception:
+        return False
+
+
+def _history(*attempts: int) -> list[Guess]:
+    return [Guess(time=datetime.now(), word="", attempt=a) for a in attempts]
+
+
+@pytest.fixture
+def ranking_db(monkeypatch):
+    if not _mongo_available():
+        pytest.skip("MongoDB not available")
+    client = AsyncMongoClient()
+    db = uuid4().hex
+    monkeypatch.setattr(GuessIdiomData.data, "collection", client[db]["guess_idiom"])
+    monkeypatch.setattr(GuessIdiomData, "_ranking", None)
+    return client, db
+
+
+@pytest.mark.asyncio
+async def test_ranking(ranking_db):
+    client, db = ranking_db
+    try:
+        await GuessIdiomData.set(1, GroupData(1, history=_history(1, 3, -1, 6)))
+        await GuessIdiomData.set(2, GroupData(2, history=_history(-1, 2)))
+        await GuessIdiomData.set(3, GroupData(3, history=_history(4, -1, 5, -1)))
+        await GuessIdiomData.set_global(GroupData(0, history=_history(*[1] * 9)))
+        # written before scores were stored
+        await GuessIdiomData.data.collection.insert_one(
+            {
+                "group_id": 4,
+                "current": None,
+                "history": [
+                    {"time": datetime.now(), "word": "", "attempt": a}
+                    for a in (2, 2, -1, 3, 5)
+                ],
+            }
+        )
+        await init_ranking()
+
+        assert await GuessIdiomData.get_ranking(3) == [
+            Rank(group_id=4, score=4),
+            Rank(group_id=1, score=3),
+            Rank(group_id=3, score=2),
+        ]
+        assert [r.group_id for r in await GuessIdiomData.get_ranking(2)] == [4, 1]
+
+        # saving a group drops the cached ranking
+        await GuessIdiomData.set(2, GroupData(2, history=_history(*[1] * 5)))
+        assert (await GuessIdiomData.get_ranking(1)) == [Rank(group_id=2, score=5)]
+    finally:
+        await client.drop_database(db)
@@ -0,0 +1,40 @@
+import sqlite3
+
+from src.plugins.poetry.index import VerseIndex
+
+POEMS = [
+    "床前明月光，疑是地上霜。举头望明月，低头思故乡。",
+    "白日依山尽，黄河入海流。欲穷千里目，更上一层楼。",
+    "明月松间照，清泉石上流。举头望明月，低头思故乡。",
+]
+
+
+def _separate(content: str) -> list[str]:
+    return [s for s in content.replace("。", "，").split("，") if s]
+
+
+def _database() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE poetry (id INTEGER PRIMARY KEY, content TEXT)")
+    conn.executemany("INSERT INTO poetry (content) VALUES (?)", [(p,) for p in POEMS])
+    return conn
+
+
+def test_verse_index(tmp_path):
+    index = VerseIndex.from_database(_database(), _separate)
+    assert len(index) == 12
+
+    assert index.match(["床前明月光"]) == {1}
+    assert index.match(["举头望明月", "低头思故乡"]) == {1, 3}
+    assert index.match(["欲穷千里目", "更上一层楼"]) == {2}
+    # lines must be consecutive and in order
+    assert index.match(["低头思故乡", "举头望明月"]) == set()
+    assert index.match(["白日依山尽", "欲穷千里目"]) == set()
+    assert index.match(["今天天气不错"]) == set()
+    assert not index.might_contain("今天天气不错")
+
+    index.save(tmp_path, "v1")
+    assert VerseIndex.load(tmp_path, "v2") is None
+    loaded = VerseIndex.load(tmp_path, "v1")
+    assert loaded is not None
+    assert loaded.match(["举头望明月", "低头思故乡"]) == {1, 3}
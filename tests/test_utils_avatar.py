@@ -1,7 +1,13 @@
+import asyncio
+from io import BytesIO
+
 import numpy as np
 import pytest
+from PIL import Image
 
 from src.utils.image.avatar import Avatar
+from src.utils.image.avatar.cache import AvatarCache
+from src.utils.image.avatar.fetch import Fetcher
 
 
 @pytest.mark.asyncio
@@ -16,3 +22,97 @@ async def test_avatar():
     # since loaded from local cache, they are different objects
     assert (np.array(image1) == np.array(image2)).all()
     assert (np.array(image1) == np.array(image3)).all()
+
+
+class _FakeResponse:
+    def __init__(self, status: int, body: bytes = b"", headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self._body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+    async def read(self):
+        return self._body
+
+
+class _FakeSession:
+    closed = False
+
+    def __init__(self, png: bytes):
+        self.png = png
+        self.requests: list[tuple[str, dict]] = []
+
+    def get(self, url: str, headers=None):
+        headers = headers or {}
+        self.requests.append((url, headers))
+        if url == Fetcher.user_urls(1)[0]:
+            return _FakeResponse(503)
+        if headers.get("If-None-Match") == '"v1"':
+            return _FakeResponse(304, headers={"ETag": '"v1"'})
+        return _FakeResponse(200, self.png, {"ETag": '"v1"'})
+
+
+def test_avatar_urls_are_deterministic():
+    assert Fetcher.user_urls(123) == Fetcher.user_urls(123)
+    assert len(set(Fetcher.user_urls(123))) == 5
+    assert Fetcher.url(123, is_group=False) != Fetcher.url(124, is_group=False)
+
+
+@pytest.mark.asyncio
+async def test_avatar_cache_revalidation(tmp_path, monkeypatch):
+    monkeypatch.setattr(Fetcher, "LOCAL_FALLBACK_DIR", str(tmp_path))
+    AvatarCache.invalidate(id=1, is_group=False)
+    buffer = BytesIO()
+    Image.new("RGB", (8, 8), "red").save(buffer, format="PNG")
+    session = _FakeSession(buffer.getvalue())
+
+    # miss: primary host fails, the next one serves the image
+    image = await AvatarCache.get(session, id=1, is_group=False)  # type: ignore
+    assert image is not None and image.size == (8, 8)
+    assert len(session.requests) == 2
+    assert Fetcher.path(1, is_group=False).exists()
+
+    # fresh: served from memory without any request
+    await AvatarCache.get(session, id=1, is_group=False)  # type: ignore
+    assert len(session.requests) == 2
+
+    # stale: served immediately, revalidated in the background
+    entry = AvatarCache.peek(id=1, is_group=False)
+    assert entry is not None
+    entry.fetched_at -= AvatarCache.avatar_fresh_ttl + 1
+    image = await AvatarCache.get(session, id=1, is_group=False)  # type: ignore
+    assert image is not None
+    await asyncio.gather(*AvatarCache._inflight.values())
+    assert session.requests[-1][1] == {"If-None-Match": '"v1"'}
+    refreshed = AvatarCache.peek(id=1, is_group=False)
+    assert refreshed is not None and refreshed.age < 1
+
+    # disk tier survives a memory eviction
+    AvatarCache.invalidate(id=1, is_group=False)
+    count = len(session.requests)
+    assert await AvatarCache.get(session, id=1, is_group=False) is not None  # type: ignore
+    assert len(session.requests) == count
+
+
+@pytest.mark.asyncio
+async def test_avatar_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(Fetcher, "LOCAL_FALLBACK_DIR", str(tmp_path))
+    monkeypatch.setattr(Avatar, "session", None)
+    default = Image.new("RGB", (4, 4), "blue")
+    for id in (2, 3):
+        AvatarCache.invalidate(id=id, is_group=False)
+
+    images = await Avatar.users([2, 3, 2], default=default)
+    assert len(images) == 3
+    assert all(image.size == (4, 4) for image in images)
+    # repeated ids must not alias the same image object
+    assert images[0] is not images[2]
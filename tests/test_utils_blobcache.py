@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from src.utils.persistence.blobcache import BlobCache, MemoryTier, SingleFlight
+
+
+def test_memory_tier_lru_by_bytes():
+    tier = MemoryTier(max_bytes=10, max_item_bytes=10)
+    tier.put("a", b"1234")
+    tier.put("b", b"1234")
+    assert tier.get("a") == b"1234"  # "a" becomes most recently used
+    tier.put("c", b"1234")
+    assert "b" not in tier
+    assert "a" in tier and "c" in tier
+    assert tier.size == 8
+
+    assert not tier.put("big", b"x" * 11)
+    assert tier.pop("a") == b"1234"
+    assert tier.size == 4
+
+
+@pytest.mark.asyncio
+async def test_blob_cache_disk_tier(tmp_path):
+    cache = BlobCache("test", memory_bytes=1024, disk_dir=tmp_path, disk_bytes=1024)
+    await cache.put("file/with:odd?name", b"data")
+    cache.memory.clear()
+
+    assert await cache.get("file/with:odd?name") == b"data"
+    assert "file/with:odd?name" in cache.memory
+    assert cache.hits == 1
+
+    await cache.invalidate("file/with:odd?name")
+    assert await cache.get("file/with:odd?name") is None
+    assert cache.hit_ratio == 0.5
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces():
+    flight: SingleFlight[str, int] = SingleFlight("test")
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+    assert results == [1] * 5
+    assert "k" not in flight
+
+    assert await flight.do("k", work) == 2
@@ -0,0 +1,83 @@
+import threading
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.utils.image.encode import ImageEncoder
+from src.utils.render import Container, Direction, RenderImage
+from src.utils.render import Image as ImageObject
+
+
+def _decode(data: bytes) -> Image.Image:
+    image = Image.open(BytesIO(data))
+    image.load()
+    return image
+
+
+def test_palette_is_lossless():
+    rng = np.random.default_rng(0)
+    colors = rng.integers(0, 256, (100, 4), dtype=np.uint8)
+    pixels = colors[rng.integers(0, len(colors), (64, 48))]
+    data = ImageEncoder.encode(Image.fromarray(pixels, "RGBA"))
+    decoded = _decode(data)
+    assert decoded.mode == "P"
+    assert np.array_equal(np.asarray(decoded.convert("RGBA")), pixels)
+
+    rgb = Image.fromarray(pixels[..., :3], "RGB")
+    decoded = _decode(ImageEncoder.encode(rgb))
+    assert np.array_equal(np.asarray(decoded.convert("RGB")), pixels[..., :3])
+
+
+def test_photo_format(monkeypatch):
+    rng = np.random.default_rng(1)
+    photo = Image.fromarray(rng.integers(0, 256, (64, 64, 3), dtype=np.uint8))
+    translucent = photo.convert("RGBA")
+    translucent.putalpha(128)
+
+    assert _decode(ImageEncoder.encode(photo)).format == "PNG"
+    monkeypatch.setattr(ImageEncoder, "image_encode_photo_format", "jpeg")
+    assert _decode(ImageEncoder.encode(photo)).format == "JPEG"
+    assert _decode(ImageEncoder.encode(translucent)).format == "PNG"
+    monkeypatch.setattr(ImageEncoder, "image_encode_photo_format", "webp")
+    decoded = _decode(ImageEncoder.encode(photo))
+    assert decoded.format == "WEBP"
+    assert np.array_equal(np.asarray(decoded.convert("RGB")), np.asarray(photo))
+    # unknown formats fall back to lossless PNG instead of WebP
+    monkeypatch.setattr(ImageEncoder, "image_encode_photo_format", "jpg")
+    assert _decode(ImageEncoder.encode(photo)).format == "PNG"
+
+
+def test_encode_object_in_strips(monkeypatch):
+    rng = np.random.default_rng(2)
+    images = [rng.integers(0, 256, (37, 20, 4), dtype=np.uint8) for _ in range(5)]
+    document = Container.from_children(
+        [ImageObject.from_image(RenderImage(im)) for im in images],
+        direction=Direction.VERTICAL,
+    )
+    monkeypatch.setattr(ImageEncoder, "image_encode_stream_height", 100)
+    monkeypatch.setattr(ImageEncoder, "image_encode_strip_height", 16)
+    decoded = _decode(ImageEncoder.encode_object(document))
+    assert decoded.format == "PNG"
+    assert np.array_equal(np.asarray(decoded), document.render().base_im)
+
+
+@pytest.mark.asyncio
+async def test_encode_object_async_lays_out_on_caller():
+    layout_threads = []
+
+    class Recorded(Container):
+        @property
+        def content_height(self) -> int:
+            layout_threads.append(threading.get_ident())
+            return super().content_height
+
+    image = RenderImage(np.zeros((8, 8, 4), dtype=np.uint8))
+    document = Recorded.from_children(
+        [ImageObject.from_image(image)], direction=Direction.VERTICAL
+    )
+    data = await ImageEncoder.encode_object_async(document)
+    assert _decode(data).size == (8, 8)
+    # the first (uncached) layout happens before the worker thread starts
+    assert layout_threads[0] == threading.get_ident()
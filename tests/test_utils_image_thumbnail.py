@@ -0,0 +1,40 @@
+from collections import OrderedDict
+from io import BytesIO
+
+from PIL import Image
+
+from src.utils.image.thumbnail import ThumbnailCache, decode_thumbnail
+
+
+def _encode(image: Image.Image, format: str) -> bytes:
+    io = BytesIO()
+    image.save(io, format=format)
+    return io.getvalue()
+
+
+def test_decode_thumbnail():
+    photo = Image.linear_gradient("L").convert("RGB").resize((4000, 3000))
+    for format in ("JPEG", "PNG"):
+        image = decode_thumbnail(_encode(photo, format), (360, 360))
+        assert image.size == (360, 270)
+
+    small = Image.new("RGBA", (100, 50), (1, 2, 3, 4))
+    image = decode_thumbnail(_encode(small, "PNG"), (360, 360))
+    assert image.size == (100, 50)
+    assert image.getpixel((0, 0)) == (1, 2, 3, 4)
+
+
+def test_thumbnail_cache(monkeypatch):
+    monkeypatch.setattr(ThumbnailCache, "thumbnail_cache_size", 2)
+    monkeypatch.setattr(ThumbnailCache, "_memory", OrderedDict())
+    images = [Image.new("RGB", (1, 1)) for _ in range(3)]
+    ThumbnailCache.put("a", (10, 10), images[0])
+    ThumbnailCache.put("a", (20, 20), images[1])
+    assert ThumbnailCache.get("a", (10, 10)) is images[0]
+    ThumbnailCache.put("b", (10, 10), images[2])
+    # least recently used entry is evicted
+    assert ThumbnailCache.get("a", (20, 20)) is None
+    assert ThumbnailCache.get("a", (10, 10)) is images[0]
+    ThumbnailCache.invalidate("a")
+    assert ThumbnailCache.get("a", (10, 10)) is None
+    assert ThumbnailCache.get("b", (10, 10)) is images[2]
@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from src.utils.observability.loop import LoopMonitor
+
+
+def _sample(name: str, labels: dict[str, str] | None = None) -> float:
+    return REGISTRY.get_sample_value(name, labels or {}) or 0
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_reports_stall(monkeypatch):
+    monkeypatch.setattr(LoopMonitor, "loop_monitor_interval", 0.01)
+    monkeypatch.setattr(LoopMonitor, "loop_monitor_slow_threshold", 0.05)
+
+    async def blocking():
+        time.sleep(0.3)
+
+    label = {"matcher": f"task:{blocking.__qualname__}"}
+    stalls = _sample("xiaoxiao_event_loop_slow_callbacks_total", label)
+    lags = _sample("xiaoxiao_event_loop_lag_seconds_count")
+
+    LoopMonitor.start(asyncio.get_running_loop())
+    try:
+        await asyncio.sleep(0.1)
+        await asyncio.create_task(blocking())
+        await asyncio.sleep(0.1)
+        # the watchdog survives logging a stack with `<locals>` and `<module>`
+        await asyncio.create_task(blocking())
+        await asyncio.sleep(0.1)
+    finally:
+        LoopMonitor.stop()
+
+    assert _sample("xiaoxiao_event_loop_slow_callbacks_total", label) == stalls + 2
+    blocked = _sample("xiaoxiao_event_loop_blocked_seconds_total", label)
+    assert 0.4 < blocked < 2
+    assert _sample("xiaoxiao_event_loop_lag_seconds_count") > lags + 1
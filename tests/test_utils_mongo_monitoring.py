@@ -0,0 +1,54 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from prometheus_client import REGISTRY
+from pymongo import AsyncMongoClient, MongoClient
+
+from src.utils.persistence import Collection, Mongo
+from src.utils.persistence.monitoring import event_listeners, filter_shape
+
+
+def _mongo_available():
+    try:
+        MongoClient(serverSelectionTimeoutMS=1000).server_info()
+        return True
+    except Exception:
+        return False
+
+
+def test_filter_shape():
+    assert filter_shape(
+        {"user_id": 1, "time": {"$gt": datetime.now()}, "$or": [{"a": 1}, {"b": 2}]}
+    ) == {"user_id": "?", "time": {"$gt": "?"}, "$or": [{"a": "?"}, "..."]}
+    assert filter_shape({"id": {"$in": []}}) == {"id": {"$in": []}}
+
+
+@pytest.mark.asyncio
+async def test_command_metrics(monkeypatch):
+    if not _mongo_available():
+        pytest.skip("MongoDB not available")
+
+    client = AsyncMongoClient(event_listeners=event_listeners())
+    monkeypatch.setattr(Mongo, "_client", client)
+    name = uuid4().hex
+    db = uuid4().hex
+    collection: Collection[dict, dict] = Mongo.collection(name, db)
+
+    def count(command: str) -> float:
+        labels = {"db": db, "collection": name, "command": command}
+        value = REGISTRY.get_sample_value(
+            "xiaoxiao_mongo_command_duration_seconds_count",
+            {**labels, "status": "success"},
+        )
+        return value or 0
+
+    try:
+        result = await collection.insert_one({"value": 1})
+        assert await collection.get(result.inserted_id)
+        assert count("insert") == 1
+        assert count("find") == 1
+    finally:
+        await collection.drop()
+        await Mongo.drop_database(db)
+        await client.close()
@@ -0,0 +1,65 @@
+from io import BytesIO
+
+import pytest
+from aiohttp import ClientResponseError, web
+from aiohttp.test_utils import TestServer
+from PIL import Image
+
+from src.utils.render_ext.markdown import Markdown
+from src.utils.render_ext.markdown.components.utils.image import (
+    ImageResolver,
+    ImageTooLargeError,
+    fetch_image,
+)
+from src.utils.render_ext.markdown.render import MarkdownRenderer
+
+
+def _png(width: int, height: int) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_decode_limits(monkeypatch):
+    monkeypatch.setattr(ImageResolver, "markdown_image_max_side", 16)
+    monkeypatch.setattr(ImageResolver, "markdown_image_max_pixels", 100 * 100)
+    assert ImageResolver.decode(_png(64, 32)).size == (16, 8)
+    with pytest.raises(ImageTooLargeError):
+        ImageResolver.decode(_png(200, 200))
+
+
+def test_image_urls():
+    md = MarkdownRenderer("![a](http://x/a.png)\n\n> ![b](http://x/b.png)")
+    assert sorted(md.image_urls()) == ["http://x/a.png", "http://x/b.png"]
+
+
+@pytest.mark.asyncio
+async def test_prefetch(monkeypatch):
+    monkeypatch.setattr(ImageResolver, "markdown_image_max_bytes", 1024)
+    hits = []
+
+    async def handler(request: web.Request):
+        hits.append(request.path)
+        if request.path == "/ok.png":
+            return web.Response(body=_png(8, 8))
+        if request.path == "/big.png":
+            return web.Response(body=b"\0" * 4096)
+        return web.Response(status=404)
+
+    app = web.Application()
+    app.router.add_get("/{name}", handler)
+    async with TestServer(app) as server:
+        urls = {
+            name: str(server.make_url(f"/{name}"))
+            for name in ("ok.png", "big.png", "404.png")
+        }
+        markdown = "\n\n".join(f"![{name}]({url})" for name, url in urls.items())
+        await Markdown(markdown).prefetch()
+        await Markdown(markdown).prefetch()
+
+    # every url is requested once, failures included
+    assert sorted(hits) == ["/404.png", "/big.png", "/ok.png"]
+    assert fetch_image(urls["ok.png"]).width == 8
+    assert isinstance(ImageResolver.cached(urls["big.png"]), ImageTooLargeError)
+    with pytest.raises(ClientResponseError):
+        fetch_image(urls["404.png"])
@@ -0,0 +1,53 @@
+import pytest
+from py_mini_racer.py_mini_racer import JSOOMException
+
+from src.utils.render_ext.markdown.components.utils import math
+from src.utils.render_ext.markdown.components.utils.katexsvg import KaTeX
+from src.utils.render_ext.markdown.components.utils.math import (
+    MathRenderer,
+    render_math,
+)
+from src.utils.render_ext.markdown.render import MarkdownRenderer
+
+
+def test_math_is_memoized(tmp_path, monkeypatch):
+    monkeypatch.setattr(MathRenderer, "math_cache_dir", str(tmp_path))
+    monkeypatch.setattr(MathRenderer, "_disk", None)
+    MathRenderer._memory.clear()
+
+    first = render_math(r"\frac{a}{b}", inline=True)
+    second = render_math(r"\frac{a}{b}", inline=True)
+    assert first is not second
+    assert (first.base_im == second.base_im).all()
+    assert len(MathRenderer._memory) == 1
+
+    # the disk tier survives a memory eviction
+    def fail(*args, **kwargs):
+        raise AssertionError("rasterized again")
+
+    monkeypatch.setattr(math, "svg_to_png", fail)
+    MathRenderer._memory.clear()
+    third = render_math(r"\frac{a}{b}", inline=True)
+    assert (third.width, third.height) == (first.width, first.height)
+
+
+@pytest.mark.asyncio
+async def test_render_many():
+    MathRenderer._memory.clear()
+    md = MarkdownRenderer("$x$ and $x$\n\n$$\\sum_i i$$\n\n$\\invalid{$")
+    await MathRenderer.render_many(md.equations())
+    assert (r"x", True, 0.2) in MathRenderer._memory
+    assert len(MathRenderer._memory) == 2
+
+
+def test_math_limits(monkeypatch):
+    monkeypatch.setattr(MathRenderer, "math_max_length", 16)
+    with pytest.raises(ValueError):
+        render_math("x" * 17)
+
+
+def test_katex_context_dropped_after_oom():
+    katex = KaTeX(max_memory=2 * 1024 * 1024)
+    with pytest.raises(JSOOMException):
+        katex.render_to_string(r"\frac{a}{b}" * 5000)
+    assert KaTeX().ctx is not katex.ctx
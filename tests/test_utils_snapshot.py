@@ -0,0 +1,46 @@
+import sqlite3
+
+from src.utils.persistence.snapshot import Snapshot
+
+
+def test_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(Snapshot, "snapshot_dir", str(tmp_path / "snapshots"))
+    source = tmp_path / "words.txt"
+    source.write_text("a\nb\n")
+    builds = []
+
+    def build(conn: sqlite3.Connection):
+        builds.append(1)
+        conn.execute("CREATE TABLE word (text TEXT)")
+        conn.executemany(
+            "INSERT INTO word VALUES (?)", [(w,) for w in source.read_text().split()]
+        )
+
+    snapshot = Snapshot("words", 1, build, [source])
+    assert not snapshot.is_current()
+    path = snapshot.ensure()
+    assert path.name == "words-v1.db"
+    assert len(snapshot.checksum) == 64
+    assert snapshot.ensure() == path
+    assert len(builds) == 1
+
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    assert conn.execute("SELECT COUNT(*) FROM word").fetchone() == (2,)
+    conn.close()
+
+    # changing a source or the version invalidates the snapshot
+    source.write_text("a\nb\nc\n")
+    assert not snapshot.is_current()
+    snapshot.ensure()
+    assert len(builds) == 2
+    assert not Snapshot("words", 2, build, [source]).is_current()
+
+    # a damaged snapshot is rebuilt when a new instance first opens it
+    path = snapshot.ensure()
+    with path.open("r+b") as f:
+        f.seek(100)
+        f.write(b"\xff" * 16)
+    assert snapshot.is_current() and not snapshot.is_intact()
+    reopened = Snapshot("words", 1, build, [source])
+    assert reopened.ensure() == path
+    assert len(builds) == 3 and reopened.is_intact()
@@ -0,0 +1,37 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from src.utils.persistence import SQLitePool
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "test.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO item (name) VALUES (?)", [("a",), ("b",), ("c",)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.mark.asyncio
+async def test_sqlite_pool(database):
+    pool = SQLitePool(database, size=2)
+    try:
+        row = await pool.fetchone("SELECT name FROM item WHERE id = ?", (2,))
+        assert row == ("b",)
+        rows = await asyncio.gather(
+            *(pool.fetchall("SELECT name FROM item ORDER BY id") for _ in range(8))
+        )
+        assert all(r == [("a",), ("b",), ("c",)] for r in rows)
+        assert len(pool._connections) <= 2
+
+        # connections are read-only
+        with pytest.raises(sqlite3.OperationalError):
+            await pool.run(lambda conn: conn.execute("DELETE FROM item"))
+    finally:
+        pool.close()
+    assert not pool._connections
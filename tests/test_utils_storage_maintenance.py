@@ -0,0 +1,75 @@
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import gridfs
+import pytest
+from pymongo import AsyncMongoClient, MongoClient
+
+from src.utils.persistence.maintenance import StorageMaintenance
+
+
+def _mongo_available():
+    try:
+        MongoClient(serverSelectionTimeoutMS=1000).server_info()
+        return True
+    except Exception:
+        return False
+
+
+@pytest.fixture
+def database():
+    if not _mongo_available():
+        pytest.skip("MongoDB not available")
+    name = uuid4().hex
+    yield AsyncMongoClient()[name]
+    MongoClient().drop_database(name)
+
+
+async def _store(db, filename: str, expire_at: datetime | None) -> None:
+    bucket = gridfs.AsyncGridFSBucket(db, chunk_size_bytes=4)
+    metadata = {"storage_type": "persistent", "references": 1}
+    if expire_at is not None:
+        metadata = {"storage_type": "ephemeral", "expire_at": expire_at}
+    await bucket.upload_from_stream(filename, b"0123456789", metadata=metadata)
+
+
+@pytest.mark.asyncio
+async def test_sweep_expired(database):
+    now = datetime.now(UTC)
+    for i in range(7):
+        await _store(database, f"expired-{i}", now - timedelta(days=1))
+    await _store(database, "fresh", now + timedelta(days=1))
+    await _store(database, "persistent", None)
+
+    invalidated = []
+
+    async def on_delete(filenames: list[str]):
+        invalidated.extend(filenames)
+
+    maintenance = StorageMaintenance(
+        database, batch_size=3, pause=0, on_delete=on_delete
+    )
+    result = await maintenance.sweep_expired()
+
+    assert result.files == 7
+    assert result.chunks == 7 * 3
+    assert result.batches == 3
+    assert sorted(invalidated) == [f"expired-{i}" for i in range(7)]
+    assert await database.fs.files.count_documents({}) == 2
+    assert await database.fs.chunks.count_documents({}) == 2 * 3
+
+
+@pytest.mark.asyncio
+async def test_sweep_orphans(database):
+    await _store(database, "kept", None)
+    await _store(database, "orphan", None)
+    await database.fs.files.delete_one({"filename": "orphan"})
+
+    maintenance = StorageMaintenance(database, pause=0)
+    assert await maintenance.count_orphans() == 1
+
+    result = await maintenance.sweep_orphans()
+    assert result.files == 1
+    assert result.chunks == 3
+    assert await maintenance.count_orphans() == 0
+    assert await database.fs.chunks.count_documents({}) == 3
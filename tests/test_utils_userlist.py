@@ -7,8 +7,10 @@ from nonebot.adapters.onebot.v11 import Message
 from pymongo import MongoClient
 
 from src.utils.persistence import Mongo
+from src.utils.userlist import UserListPagination
 from src.utils.userlist.data import (
     MessageItem,
+    ReferenceItem,
     UserList,
     UserListCollection,
 )
@@ -301,3 +303,58 @@ class TestSoftDeleteServiceLayer:
             {"group_id": test_group_id, "name": test_list.name}
         )
         assert raw_after is None
+
+
+def test_pagination_locate():
+    assert UserListPagination.locate(0, 0, 10) == (0, 1)
+    assert UserListPagination.locate(25, 2, 10) == (2, 3)
+    assert UserListPagination.locate(25, -1, 10) == (2, 3)
+    assert UserListPagination.locate(25, 9, 10) == (2, 3)
+    with pytest.raises(IndexError):
+        UserListPagination.locate(25, 9, 10, strict=True)
+
+
+class TestPartialReads:
+    @pytest.mark.asyncio
+    async def test_find_page_reads_only_the_page(self, test_collection, test_group_id):
+        col = UserListCollection()
+        await col.create(test_group_id, 111, "big")
+        items = [
+            MessageItem(content=Message(str(i)), creator_id=111) for i in range(25)
+        ]
+        await col.append(test_group_id, "big", *items)
+
+        page = await UserListService.find_page(test_group_id, "big", -1, 10, 25)
+        assert page is not None
+        lst, pagination = page
+        assert (pagination.page_id, pagination.num_pages) == (2, 3)
+        assert [str(i) for i in lst.items] == [str(i) for i in range(20, 25)]
+        assert [i for i, _ in pagination.enumerate()] == list(range(20, 25))
+
+        item = await UserListService.find_item(test_group_id, "big", 7)
+        assert item is not None and item.uuid == items[7].uuid
+        assert await UserListService.find_item(test_group_id, "big", 25) is None
+
+        meta = await col.find_metadata(test_group_id, "big")
+        assert meta is not None and meta.num_items == 25
+        assert await col.find_metadata(test_group_id, "missing") is None
+
+    @pytest.mark.asyncio
+    async def test_references_resolved_in_batch(self, test_collection, test_group_id):
+        col = UserListCollection()
+        await col.create(test_group_id, 111, "a")
+        await col.create(test_group_id, 111, "b")
+        await col.append(
+            test_group_id, "a", MessageItem(content=Message("x"), creator_id=111)
+        )
+        await col.append(
+            test_group_id,
+            "b",
+            MessageItem(content=Message("y"), creator_id=111),
+            ReferenceItem(name="a", creator_id=111),
+            ReferenceItem(name="gone", creator_id=111),
+        )
+        lst = await col.find(test_group_id, "b")
+        assert lst is not None
+        assert await lst.valid_references == ["a"]
+        assert [str(m) for m in await lst.expanded_items] == ["y", "x"]